@@ -12,6 +12,13 @@ import numpy as np
 from agents.insight import analyze_user
 from agents.coach import motivate_user
 from agents.planner import plan_next_day
+from scoring import fitness_scores
+from progress_metrics import DEFAULT_PATH as PROGRESS_METRICS_PATH, TRACKED_LIFTS, ProgressMetrics
+from training_load import TrainingLoad, get_training_load_store, session_volume
+from strength_engine import current_max_lifts, normalize_lift
+
+# Same single user as fitness_tracker, so its notification checks see this app's training load
+USER_ID = "streamlit_user"
 
 # Page config
 st.set_page_config(
@@ -334,12 +341,33 @@ def initialize_advanced_state():
             'sleep': [7 + np.random.normal(0, 1) for i in range(len(dates))]
         })
 
+    if 'progress_metrics' not in st.session_state:
+        # Restore the saved snapshot (replay the history only when there is none);
+        # logged workouts are then ingested one day at a time
+        st.session_state.progress_metrics = load_progress_metrics(st.session_state.workout_history)
+
+    if 'training_load' not in st.session_state:
+        # Persisted per user so notification checks see the same readiness
+        st.session_state.training_load = get_training_load_store().get(USER_ID) or TrainingLoad(USER_ID)
+
     if 'notifications' not in st.session_state:
         st.session_state.notifications = []
 
     if 'current_workout' not in st.session_state:
         st.session_state.current_workout = None
 
+def load_progress_metrics(history):
+    """Saved progress metrics, or metrics replayed from the history if none are saved"""
+    try:
+        return ProgressMetrics.load(PROGRESS_METRICS_PATH)
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Warning: Could not load progress metrics, replaying history: {e}")
+    metrics = ProgressMetrics.from_history(history)
+    metrics.save(PROGRESS_METRICS_PATH)
+    return metrics
+
 def main():
     initialize_advanced_state()
 
@@ -374,11 +402,11 @@ def main():
 
         # Quick stats in sidebar
         st.markdown("### ⚡ Quick Stats")
-        recent_data = st.session_state.workout_history.iloc[-7:]  # Last 7 days
-        workouts_this_week = recent_data['workout_done'].sum()
-        avg_intensity = recent_data['workout_intensity'].mean()
+        metrics = st.session_state.progress_metrics
+        workouts_this_week = metrics.rolling_sum('workout_done', 7)
+        avg_intensity = metrics.rolling_mean('workout_intensity', 7)  # Last 7 days
 
-        st.metric("This Week", f"{workouts_this_week} workouts")
+        st.metric("This Week", f"{workouts_this_week:.0f} workouts")
         st.metric("Avg Intensity", f"{avg_intensity:.1f}/10")
 
     # Route to pages
@@ -402,6 +430,7 @@ def enhanced_dashboard():
     # Key metrics dashboard
     history = st.session_state.workout_history
     profile = st.session_state.user_profile
+    metrics = st.session_state.progress_metrics
 
     col1, col2, col3, col4, col5 = st.columns(5)
 
@@ -409,9 +438,9 @@ def enhanced_dashboard():
     current_bench = history['bench_press'].iloc[-1]
     bench_progress = ((current_bench / profile['target_bench']) * 100)
     workouts_this_month = history['workout_done'].sum()
-    current_streak = calculate_streak(history)
+    current_streak = metrics.streak
     fitness_score = calculate_fitness_score(history)
-    pr_this_month = count_prs(history)
+    pr_this_month = metrics.prs_within(30)
 
     with col1:
         st.markdown(f"""
@@ -597,10 +626,10 @@ def plan_workout_tab():
         st.markdown("#### 🎯 Quick Stats")
 
         # Display current maxes
-        profile = st.session_state.user_profile
-        st.metric("Bench Max", f"{185} lbs")
-        st.metric("Squat Max", f"{225} lbs")
-        st.metric("Deadlift Max", f"{275} lbs")
+        max_lifts = current_max_lifts(st.session_state.get('logged_workouts'))
+        st.metric("Bench Max", f"{max_lifts['bench_press']} lbs")
+        st.metric("Squat Max", f"{max_lifts['squat']} lbs")
+        st.metric("Deadlift Max", f"{max_lifts['deadlift']} lbs")
         st.markdown('</div>', unsafe_allow_html=True)
 
     if st.button("🤖 Generate AI Workout Plan", type="primary", use_container_width=True):
@@ -615,12 +644,7 @@ def generate_advanced_workout_plan(workout_type, time_available, energy, equipme
         'available_time': time_available,
         'energy_level': energy,
         'equipment': equipment,
-        'max_lifts': {
-            'bench_press': 185,
-            'squat': 225,
-            'deadlift': 275,
-            'overhead_press': 115
-        },
+        'max_lifts': current_max_lifts(st.session_state.get('logged_workouts')),
         'body_weight': st.session_state.user_profile['weight'] * 2.2,
         'workout_done': False,
         'sleep_hours': 7.5,
@@ -629,6 +653,9 @@ def generate_advanced_workout_plan(workout_type, time_available, energy, equipme
         'calories': 2200,
         'water_oz': 80
     }
+    if st.session_state.training_load.last_date:
+        # As of today: rest days since the last logged session lower fatigue
+        user_data['training_load'] = st.session_state.training_load.summary(as_of=datetime.date.today())
 
     # Progress container
     progress_container = st.container()
@@ -785,6 +812,7 @@ def log_session_tab():
         workout_log = {
             'date': datetime.date.today(),
             'exercises': exercise_data,
+            'volume': session_volume(exercise_data),
             'duration': duration,
             'intensity': intensity,
             'fatigue': fatigue,
@@ -796,6 +824,17 @@ def log_session_tab():
         if 'logged_workouts' not in st.session_state:
             st.session_state.logged_workouts = []
         st.session_state.logged_workouts.append(workout_log)
+        st.session_state.training_load.update(workout_log['date'], workout_log['volume'])
+        get_training_load_store().save(st.session_state.training_load)
+
+        # O(1) update of streaks, PRs and rolling trends (heaviest working set per tracked lift)
+        day = {'date': workout_log['date'], 'workout_done': True, 'workout_intensity': intensity}
+        for name, data in exercise_data.items():
+            lift = normalize_lift(name)
+            if lift in TRACKED_LIFTS and data['weight']:
+                day[lift] = max(day.get(lift, 0), data['weight'])
+        st.session_state.progress_metrics.ingest(day)
+        st.session_state.progress_metrics.save(PROGRESS_METRICS_PATH)
 
         st.markdown("""
         <div class="success-message">
@@ -834,7 +873,7 @@ def get_quick_ai_coaching():
     sample_data = {
         'workout_done': True,
         'workout_type': 'upper_body',
-        'max_lifts': {'bench_press': 185, 'squat': 225, 'deadlift': 275},
+        'max_lifts': current_max_lifts(st.session_state.get('logged_workouts')),
         'protein_grams': 120,
         'sleep_hours': 7.5,
         'energy': 'high',
@@ -903,36 +942,9 @@ def display_ai_insights():
             </div>
             """, unsafe_allow_html=True)
 
-def calculate_streak(history):
-    """Calculate current workout streak"""
-    streak = 0
-    for i in range(len(history)-1, -1, -1):
-        if history.iloc[i]['workout_done']:
-            streak += 1
-        else:
-            break
-    return streak
-
 def calculate_fitness_score(history):
     """Calculate overall fitness score"""
-    recent = history.tail(7)
-    consistency = recent['workout_done'].mean() * 100
-    avg_intensity = recent['workout_intensity'].mean() * 10
-    sleep_quality = recent['sleep'].mean() * 12
-    return int((consistency + avg_intensity + sleep_quality) / 3)
-
-def count_prs(history):
-    """Count personal records this month"""
-    # Simplified - count days where lifts increased
-    recent = history.tail(30)
-    prs = 0
-    for col in ['bench_press', 'squat', 'deadlift']:
-        if len(recent) > 1:
-            max_recent = recent[col].max()
-            max_previous = history[col].iloc[:-30].max() if len(history) > 30 else 0
-            if max_recent > max_previous:
-                prs += 1
-    return prs
+    return fitness_scores(history)
 
 def profile_setup():
     """Profile setup page - simplified for space"""
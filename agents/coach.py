@@ -2,9 +2,16 @@
 Coach Agent - Provides motivational feedback and actionable advice
 """
 import os
+import sys
 import requests
 from dotenv import load_dotenv
 
+if __package__ in (None, ""):
+    # Run as a script (python agents/coach.py): make the project's shared modules importable
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rate_limiter import get_api_limiter
+
 # Load environment variables
 load_dotenv()
 
@@ -46,12 +53,13 @@ def call_nemotron(prompt, system_prompt=""):
 
     try:
         # Try primary model first
-        r = requests.post(
-            f"{endpoint}/chat/completions",
-            headers=headers,
-            json=body,
-            timeout=45
-        )
+        with get_api_limiter():
+            r = requests.post(
+                f"{endpoint}/chat/completions",
+                headers=headers,
+                json=body,
+                timeout=45
+            )
         r.raise_for_status()
         response_data = r.json()
         return response_data.get("choices", [{}])[0].get("message", {}).get("content", "No response")
@@ -60,12 +68,13 @@ def call_nemotron(prompt, system_prompt=""):
         # Try fallback model if primary fails
         try:
             body["model"] = fallback_model
-            r = requests.post(
-                f"{endpoint}/chat/completions",
-                headers=headers,
-                json=body,
-                timeout=30
-            )
+            with get_api_limiter():
+                r = requests.post(
+                    f"{endpoint}/chat/completions",
+                    headers=headers,
+                    json=body,
+                    timeout=30
+                )
             r.raise_for_status()
             response_data = r.json()
             return response_data.get("choices", [{}])[0].get("message", {}).get("content", "No response")
@@ -2,21 +2,30 @@
 Insight Agent - Analyzes user data to identify patterns and improvement areas
 """
 import os
+import sys
 import requests
 import json
 from dotenv import load_dotenv
 
+if __package__ in (None, ""):
+    # Run as a script (python agents/insight.py): make the project's shared modules importable
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from llm_cache import get_llm_cache
+from rate_limiter import get_api_limiter
+
 # Load environment variables
 load_dotenv()
 
 
-def call_nemotron(prompt, system_prompt=""):
+def call_nemotron(prompt, system_prompt="", knowledge_version=None):
     """
     Call NVIDIA NIM API with recommended fitness coaching model
 
     Args:
         prompt: The user prompt
         system_prompt: Optional system instruction
+        knowledge_version: Knowledge version the prompt was built from (part of the cache key)
 
     Returns:
         str: The model's response
@@ -45,19 +54,30 @@ def call_nemotron(prompt, system_prompt=""):
         "top_p": 0.9
     }
 
+    cache = get_llm_cache()
+    cache_key = cache.key(body, knowledge_version)
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return cached
+
     try:
         # Try primary model first
-        r = requests.post(
-            f"{endpoint}/chat/completions",
-            headers=headers,
-            json=body,
-            timeout=45
-        )
+        with get_api_limiter():
+            r = requests.post(
+                f"{endpoint}/chat/completions",
+                headers=headers,
+                json=body,
+                timeout=45
+            )
         r.raise_for_status()
         response_data = r.json()
 
         # Extract response from NVIDIA API format
-        return response_data.get("choices", [{}])[0].get("message", {}).get("content", "No response")
+        content = response_data.get("choices", [{}])[0].get("message", {}).get("content")
+        if not content:
+            return "No response"  # not cached: the next call should ask again
+        cache.put(cache_key, content)
+        return content
 
     except requests.exceptions.RequestException as e:
         return f"⚠️  API Error: {str(e)}"
@@ -74,16 +94,20 @@ def analyze_user(data):
         str: Analysis insights
     """
     # Import knowledge base for better analysis
+    knowledge_version = None
     try:
-        from knowledge_base import PROGRESSIVE_OVERLOAD, RECOVERY_NUTRITION
+        from knowledge_selector import select_knowledge
+        from knowledge_store import get_knowledge_store
+        # One snapshot for both the text and the cache key, even if a reload lands mid-request
+        snapshot = get_knowledge_store().current()
+        knowledge = select_knowledge(data, snapshot)
+        knowledge_version = snapshot.version if knowledge else None
         knowledge_context = f"""
 EXPERT KNOWLEDGE FOR ANALYSIS:
-{PROGRESSIVE_OVERLOAD}
-
-{RECOVERY_NUTRITION}
+{knowledge}
 
 Use these scientific principles to analyze the user's readiness for training.
-"""
+""" if knowledge else ""
     except:
         knowledge_context = ""
 
@@ -127,7 +151,7 @@ Focus on:
 
 Keep it concise, specific, and actionable."""
 
-    return call_nemotron(prompt, system_prompt)
+    return call_nemotron(prompt, system_prompt, knowledge_version)
 
 
 if __name__ == "__main__":
@@ -2,20 +2,29 @@
 Planner Agent - Creates actionable next-day plans based on insights
 """
 import os
+import sys
 import requests
 from dotenv import load_dotenv
 
+if __package__ in (None, ""):
+    # Run as a script (python agents/planner.py): make the project's shared modules importable
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from llm_cache import get_llm_cache
+from rate_limiter import get_api_limiter
+
 # Load environment variables
 load_dotenv()
 
 
-def call_nemotron(prompt, system_prompt=""):
+def call_nemotron(prompt, system_prompt="", knowledge_version=None):
     """
     Call NVIDIA NIM API with recommended workout planning model
 
     Args:
         prompt: The user prompt
         system_prompt: Optional system instruction
+        knowledge_version: Knowledge version the prompt was built from (part of the cache key)
 
     Returns:
         str: The model's response
@@ -44,17 +53,28 @@ def call_nemotron(prompt, system_prompt=""):
         "top_p": 0.9
     }
 
+    cache = get_llm_cache()
+    cache_key = cache.key(body, knowledge_version)
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return cached
+
     try:
         # Try primary model first
-        r = requests.post(
-            f"{endpoint}/chat/completions",
-            headers=headers,
-            json=body,
-            timeout=45
-        )
+        with get_api_limiter():
+            r = requests.post(
+                f"{endpoint}/chat/completions",
+                headers=headers,
+                json=body,
+                timeout=45
+            )
         r.raise_for_status()
         response_data = r.json()
-        return response_data.get("choices", [{}])[0].get("message", {}).get("content", "No response")
+        content = response_data.get("choices", [{}])[0].get("message", {}).get("content")
+        if not content:
+            return "No response"  # not cached: the next call should ask again
+        cache.put(cache_key, content)
+        return content
 
     except requests.exceptions.RequestException as e:
         return f"⚠️  API Error: {str(e)}"
@@ -73,7 +93,8 @@ def plan_next_day(insights, user_data=None):
     """
     # Import knowledge base
     try:
-        from knowledge_base import get_relevant_knowledge, PROGRESSIVE_OVERLOAD, RECOVERY_NUTRITION
+        from knowledge_selector import select_knowledge
+        from knowledge_store import get_knowledge_store
         has_knowledge = True
     except:
         has_knowledge = False
@@ -97,16 +118,25 @@ Current Stats:
 - Sleep: {user_data.get('sleep_hours', 'unknown')} hours
 - Soreness: {user_data.get('soreness', 'unknown')}/10
 - Energy: {user_data.get('energy', 'unknown')}
+"""
+        training_load = user_data.get('training_load')
+        if training_load:
+            user_context += f"""- Training readiness (load model): {training_load['readiness']}/100 (acute:chronic workload {training_load['acwr']})
 """
 
     # Add expert knowledge to prompt
     knowledge_context = ""
-    if has_knowledge:
+    knowledge_version = None
+    knowledge = ""
+    if has_knowledge and user_data:
+        # One snapshot for both the text and the cache key, even if a reload lands mid-request
+        snapshot = get_knowledge_store().current()
+        knowledge = select_knowledge(user_data, snapshot)
+        knowledge_version = snapshot.version if knowledge else None
+    if knowledge:
         knowledge_context = f"""
 EXPERT KNOWLEDGE BASE:
-{PROGRESSIVE_OVERLOAD}
-
-{RECOVERY_NUTRITION}
+{knowledge}
 
 Use this expert knowledge to create scientifically-backed recommendations.
 """
@@ -140,7 +170,7 @@ Create a detailed plan with:
 
 Make it specific, measurable, and progressive. If suggesting weight increases, explain why they're ready."""
 
-    return call_nemotron(prompt, system_prompt)
+    return call_nemotron(prompt, system_prompt, knowledge_version)
 
 
 if __name__ == "__main__":
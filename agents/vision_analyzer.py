@@ -2,9 +2,27 @@
 Vision Analyzer Agent - Analyzes body photos to assess physique and create personalized plans
 """
 import os
+import sys
+import json
 import base64
+import hashlib
 import requests
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+if __package__ in (None, ""):
+    # Run as a script (python agents/vision_analyzer.py): make the project's shared modules importable
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from image_preprocessing import PreparedImage, prepare_image, prepare_images
+from rate_limiter import get_api_limiter
+from vision_cache import get_vision_cache
+from video_frames import DEFAULT_MAX_FRAMES, extract_keyframes
+
+
+POSES = ("front", "side", "back")
+# One request carrying every pose (the endpoint accepts several images); "0" sends one request per pose
+MULTI_IMAGE_POSES = os.getenv("VISION_MULTI_IMAGE", "1") != "0"
 
 
 def encode_image_to_base64(image_path):
@@ -21,7 +39,44 @@ def encode_image_to_base64(image_path):
         return base64.b64encode(image_file.read()).decode('utf-8')
 
 
-def call_nemotron_vision(prompt, image_path=None, image_base64=None, system_prompt=""):
+class StreamingJSONBody:
+    """
+    Chat request body that streams its images as base64 chunks
+
+    The JSON is serialised once with placeholder(i) standing in for each
+    image URL; sending walks the text around the placeholders and each image's
+    base64 chunks, so the full base64 string (and the full body) never exist
+    in memory. The length is known up front, so requests sends a plain
+    Content-Length body.
+    """
+
+    @staticmethod
+    def placeholder(index):
+        return f"@@image-{index}@@"
+
+    def __init__(self, body, images):
+        text = json.dumps(body).encode("utf-8")
+        self._parts = []
+        for i, image in enumerate(images):
+            before, text = text.split(f'"{self.placeholder(i)}"'.encode("ascii"), 1)
+            self._parts.extend((before + b'"' + image.data_url_prefix, image, b'"'))
+        self._parts.append(text)
+        self._length = sum(part.base64_size if hasattr(part, "iter_base64") else len(part)
+                           for part in self._parts)
+
+    def __len__(self):
+        return self._length
+
+    def __iter__(self):
+        for part in self._parts:
+            if hasattr(part, "iter_base64"):
+                yield from part.iter_base64()
+            else:
+                yield part
+
+
+def call_nemotron_vision(prompt, image_path=None, image_base64=None, system_prompt="",
+                         image_file=None, images=None, raise_errors=False):
     """
     Call NVIDIA NIM API with Nemotron vision model
 
@@ -30,6 +85,9 @@ def call_nemotron_vision(prompt, image_path=None, image_base64=None, system_prom
         image_path: Path to image file (optional)
         image_base64: Base64 encoded image (optional)
         system_prompt: Optional system instruction
+        image_file: File-like image, e.g. a Streamlit upload (optional, read without copying)
+        images: List of images (paths, files, bytes, base64 or PreparedImage), sent in order
+        raise_errors: Raise request errors instead of returning them as a warning string
 
     Returns:
         str: The model's response
@@ -43,19 +101,14 @@ def call_nemotron_vision(prompt, image_path=None, image_base64=None, system_prom
         "Content-Type": "application/json"
     }
 
-    # Prepare image
-    if image_path and not image_base64:
-        image_base64 = encode_image_to_base64(image_path)
-
-    # Build message content with image
-    content = []
-    if image_base64:
-        content.append({
-            "type": "image_url",
-            "image_url": {
-                "url": f"data:image/jpeg;base64,{image_base64}"
-            }
-        })
+    # Prepare images: upright, downscaled to the model's input size, real MIME type
+    single = image_file if image_file is not None else (image_base64 or image_path)
+    sources = ([single] if single else []) + list(images or [])
+    prepared = [source if isinstance(source, PreparedImage) else prepare_image(source) for source in sources]
+
+    # Build message content with images (placeholders, streamed in by StreamingJSONBody)
+    content = [{"type": "image_url", "image_url": {"url": StreamingJSONBody.placeholder(i)}}
+               for i in range(len(prepared))]
     content.append({
         "type": "text",
         "text": prompt
@@ -72,21 +125,83 @@ def call_nemotron_vision(prompt, image_path=None, image_base64=None, system_prom
     }
 
     try:
-        r = requests.post(
-            "https://integrate.api.nvidia.com/v1/chat/completions",
-            headers=headers,
-            json=body,
-            timeout=45
-        )
+        with get_api_limiter():
+            r = requests.post(
+                "https://integrate.api.nvidia.com/v1/chat/completions",
+                headers=headers,
+                data=StreamingJSONBody(body, prepared),
+                timeout=45
+            )
         r.raise_for_status()
         response_data = r.json()
         return response_data.get("choices", [{}])[0].get("message", {}).get("content", "No response")
 
     except requests.exceptions.RequestException as e:
+        if raise_errors:
+            raise
         return f"⚠️  API Error: {str(e)}"
 
 
-def analyze_physique(image_path=None, image_base64=None, user_goals="build muscle"):
+def prompt_version(prompt, system_prompt=""):
+    """Short hash of a prompt, so editing a prompt retires the analyses it produced"""
+    return hashlib.sha256(f"{system_prompt}\0{prompt}".encode("utf-8")).hexdigest()[:16]
+
+
+def cached_vision_call(kind, goal, prompt, image, system_prompt="", user_id=None):
+    """
+    call_nemotron_vision for one image, answered from the vision cache when the
+    same user already had the same (or a near-identical) photo analysed for
+    this goal and prompt
+
+    Args:
+        kind: Analysis kind, e.g. 'physique'
+        goal: Goal (or exercise) the analysis is written for
+        prompt: The user prompt
+        image: Image source or PreparedImage
+        system_prompt: Optional system instruction
+        user_id: Whose cached analyses may answer it
+
+    Returns:
+        str: The model's response
+    """
+    image = image if isinstance(image, PreparedImage) else prepare_image(image)
+    cache = get_vision_cache()
+    version = prompt_version(prompt, system_prompt)
+    fingerprint = cache.fingerprint(image)
+    cached = cache.get(image, kind, goal, version, fingerprint, user_id=user_id)
+    if cached is not None:
+        return cached
+    result = call_nemotron_vision(prompt, images=[image], system_prompt=system_prompt)
+    if not result.startswith("⚠️"):
+        cache.put(image, kind, goal, version, result, fingerprint, user_id=user_id)
+    return result
+
+
+def _physique_prompt(user_goals):
+    """(prompt, system_prompt) of a single-photo physique analysis"""
+    system_prompt = """You are an expert personal trainer and body composition specialist.
+    Analyze physique photos professionally and provide constructive, actionable feedback.
+    Focus on muscle development, body composition, posture, and areas for improvement."""
+
+    prompt = f"""Analyze this physique photo and provide a comprehensive assessment:
+
+User's Goal: {user_goals}
+
+Please analyze:
+1. **Current Body Composition**: Estimated body fat percentage range, muscle mass distribution
+2. **Muscle Development**: Which muscle groups are well-developed, which need focus
+3. **Symmetry & Balance**: Any muscle imbalances or asymmetries to address
+4. **Posture & Form**: Any postural issues that could affect training
+5. **Starting Point Classification**: Beginner/Intermediate/Advanced lifter assessment
+6. **Key Strengths**: What they're doing right
+7. **Priority Areas**: Top 3 muscle groups to focus on for their goal
+
+Be encouraging but honest. Provide specific, actionable insights."""
+    return prompt, system_prompt
+
+
+def analyze_physique(image_path=None, image_base64=None, user_goals="build muscle", image_file=None, image=None,
+                     user_id=None):
     """
     Analyze body photo to assess current physique and fitness level
 
@@ -94,30 +209,141 @@ def analyze_physique(image_path=None, image_base64=None, user_goals="build muscl
         image_path: Path to body photo
         image_base64: Base64 encoded image
         user_goals: User's fitness goals
+        image_file: File-like body photo, e.g. a Streamlit upload
+        image: Body photo in any form, including an already prepared image
+        user_id: Whose photo it is (cached analyses are never shared between users)
 
     Returns:
         str: Detailed physique analysis
     """
+    prompt, system_prompt = _physique_prompt(user_goals)
+
+    source = next((s for s in (image, image_file) if s is not None), None) or image_base64 or image_path
+    if not source:
+        return call_nemotron_vision(prompt, system_prompt=system_prompt)
+    return cached_vision_call('physique', user_goals, prompt, source, system_prompt, user_id)
+
+
+def analyze_physique_poses(poses, user_goals="build muscle", multi_image=None, user_id=None):
+    """
+    Analyze a pose set (front, side, back) into one physique assessment
+
+    The poses are preprocessed concurrently. By default they go to the model
+    together in one multi-image request, so symmetry and posture are judged
+    from every angle at once in about the time of a single-photo analysis.
+    With multi_image off, or if the endpoint rejects the multi-image request
+    (a 4xx other than 429; timeouts and rate limits are reported, not retried
+    pose by pose), each pose is analysed on its own, in parallel and through
+    the vision cache, and one text-only call merges the per-pose analyses.
+
+    Args:
+        poses: Dict of pose name ('front', 'side', 'back') to image in any form
+        user_goals: User's fitness goals
+        multi_image: Send all poses in one request (defaults to VISION_MULTI_IMAGE)
+        user_id: Whose photos they are
+
+    Returns:
+        str: Combined physique analysis
+    """
+    names = [pose for pose in POSES if poses.get(pose) is not None]
+    names += [pose for pose in poses if pose not in POSES and poses[pose] is not None]
+    if not names:
+        return "⚠️  No pose photos provided."
+    images = prepare_images([poses[pose] for pose in names])
+    if len(names) == 1:
+        return analyze_physique(image=images[0], user_goals=user_goals, user_id=user_id)
+
+    if multi_image is None:
+        multi_image = MULTI_IMAGE_POSES
+    if multi_image:
+        result = _analyze_pose_set(names, images, user_goals, user_id)
+        if result is not None:
+            return result
+
+    workers = min(len(images), get_api_limiter().max_concurrent)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="poses") as pool:
+        analyses = list(pool.map(
+            lambda image: analyze_physique(image=image, user_goals=user_goals, user_id=user_id), images
+        ))
+    sections = [f"### {pose.title()} View\n\n{analysis}" for pose, analysis in zip(names, analyses)]
+    if all(analysis.startswith("⚠️") for analysis in analyses):
+        return "\n\n".join(sections)
+
+    # One text-only call turns the per-pose notes into a single assessment
+    _, system_prompt = _pose_set_prompts(names, user_goals)
+    prompt = f"""Below are physique analyses of the same person from {len(sections)} angles.
+
+User's Goal: {user_goals}
+
+{chr(10).join(sections)}
+
+Merge them into one comprehensive assessment:
+1. **Current Body Composition**: Estimated body fat percentage range, muscle mass distribution
+2. **Muscle Development**: Which muscle groups are well-developed, which need focus (use every angle)
+3. **Symmetry & Balance**: Left/right and front/back imbalances visible across the views
+4. **Posture & Form**: Postural issues, especially those visible from the side and back
+5. **Starting Point Classification**: Beginner/Intermediate/Advanced lifter assessment
+6. **Key Strengths**: What they're doing right
+7. **Priority Areas**: Top 3 muscle groups to focus on for their goal
+
+Don't repeat per-view detail that doesn't change the advice."""
+    merged = call_nemotron_vision(prompt, system_prompt=system_prompt)
+    if merged.startswith("⚠️"):
+        return "\n\n".join(sections)
+    return merged
+
+
+def _pose_set_prompts(names, user_goals):
+    """(prompt, system_prompt) of a multi-image pose set analysis"""
     system_prompt = """You are an expert personal trainer and body composition specialist.
     Analyze physique photos professionally and provide constructive, actionable feedback.
     Focus on muscle development, body composition, posture, and areas for improvement."""
 
-    prompt = f"""Analyze this physique photo and provide a comprehensive assessment:
+    views = ", ".join(f"image {i} is the {pose.upper()} view" for i, pose in enumerate(names, 1))
+    prompt = f"""These {len(names)} photos show the same person from different angles: {views}.
+Analyze them together and provide one comprehensive assessment:
 
 User's Goal: {user_goals}
 
 Please analyze:
 1. **Current Body Composition**: Estimated body fat percentage range, muscle mass distribution
-2. **Muscle Development**: Which muscle groups are well-developed, which need focus
-3. **Symmetry & Balance**: Any muscle imbalances or asymmetries to address
-4. **Posture & Form**: Any postural issues that could affect training
+2. **Muscle Development**: Which muscle groups are well-developed, which need focus (use every angle)
+3. **Symmetry & Balance**: Left/right and front/back imbalances visible across the views
+4. **Posture & Form**: Postural issues, especially those visible from the side and back
 5. **Starting Point Classification**: Beginner/Intermediate/Advanced lifter assessment
 6. **Key Strengths**: What they're doing right
 7. **Priority Areas**: Top 3 muscle groups to focus on for their goal
 
 Be encouraging but honest. Provide specific, actionable insights."""
+    return prompt, system_prompt
+
 
-    return call_nemotron_vision(prompt, image_path, image_base64, system_prompt)
+def _analyze_pose_set(names, images, user_goals, user_id=None):
+    """
+    One multi-image request for a pose set, cached under every pose's content hash
+
+    Returns:
+        str, or None if the endpoint rejected the multi-image request
+    """
+    prompt, system_prompt = _pose_set_prompts(names, user_goals)
+    cache = get_vision_cache()
+    version = prompt_version(prompt, system_prompt)
+    pose_set = (":".join(f"{pose}={image.sha256()}" for pose, image in zip(names, images)), None)
+    cached = cache.get(None, 'physique_poses', user_goals, version, fingerprint=pose_set, user_id=user_id)
+    if cached is not None:
+        return cached
+    try:
+        result = call_nemotron_vision(prompt, images=images, system_prompt=system_prompt, raise_errors=True)
+    except requests.exceptions.HTTPError as e:
+        status = e.response.status_code if e.response is not None else None
+        if status is not None and 400 <= status < 500 and status != 429:
+            return None
+        return f"⚠️  API Error: {str(e)}"
+    except requests.exceptions.RequestException as e:
+        return f"⚠️  API Error: {str(e)}"
+    if not result.startswith("⚠️"):
+        cache.put(None, 'physique_poses', user_goals, version, result, fingerprint=pose_set, user_id=user_id)
+    return result
 
 
 def create_visual_workout_plan(physique_analysis, user_data):
@@ -162,14 +388,22 @@ Make it specific, progressive, and directly address the physique assessment find
     return call_nemotron_vision(prompt, system_prompt=system_prompt)
 
 
-def assess_progress_from_photos(before_image, after_image, weeks_between):
+def assess_progress_from_photos(before_image, after_image, weeks_between, user_goals=None, user_id=None):
     """
     Compare before/after photos to assess progress
 
+    Both photos go to the model in one multi-image request. If the "before"
+    photo (or a near-duplicate) was already analysed for this user and goal
+    with the current physique prompt, that analysis rides
+    along as text so the model only has to describe what changed. The
+    comparison itself is cached under both photos' content hashes.
+
     Args:
-        before_image: Path or base64 of before photo
-        after_image: Path or base64 of after photo
+        before_image: Path, file, bytes or base64 of before photo
+        after_image: Path, file, bytes or base64 of after photo
         weeks_between: Number of weeks between photos
+        user_goals: User's fitness goals (optional)
+        user_id: Whose photos they are
 
     Returns:
         str: Progress assessment
@@ -177,11 +411,17 @@ def assess_progress_from_photos(before_image, after_image, weeks_between):
     system_prompt = """You are an expert at assessing fitness transformation progress.
     Compare before/after photos objectively and provide encouraging, specific feedback."""
 
-    # For now, analyze the after image with context
-    # In future, could send both images if API supports multiple images
-    prompt = f"""Analyze this progress photo taken {weeks_between} weeks into a training program.
+    before, after = prepare_images([before_image, after_image])
+    cache = get_vision_cache()
+    before_fingerprint = cache.fingerprint(before)
+    # Only an analysis this user got for the same goal from the current physique prompt
+    before_analysis = cache.find(before, 'physique', user_goals, prompt_version(*_physique_prompt(user_goals)),
+                                 fingerprint=before_fingerprint, user_id=user_id)
 
-Assess the following:
+    prompt = f"""The first image is the BEFORE photo and the second image is the AFTER photo,
+taken {weeks_between} weeks apart during a training program.{f" User's Goal: {user_goals}" if user_goals else ""}
+
+Compare them and assess:
 1. **Visible Changes**: What muscle groups show noticeable development?
 2. **Body Composition**: Any visible fat loss or muscle gain?
 3. **Overall Progress**: Rate the transformation (considering the timeframe)
@@ -191,20 +431,33 @@ Assess the following:
 Timeframe: {weeks_between} weeks
 Be specific and motivating. Celebrate wins and give actionable advice for continued improvement."""
 
-    # Analyze the after image
-    if isinstance(after_image, str) and os.path.exists(after_image):
-        return call_nemotron_vision(prompt, image_path=after_image, system_prompt=system_prompt)
-    else:
-        return call_nemotron_vision(prompt, image_base64=after_image, system_prompt=system_prompt)
+    # The comparison is keyed by the pair and the prompt, not by the optional context
+    version = prompt_version(prompt, system_prompt)
+    pair = (f"{before_fingerprint[0]}:{after.sha256()}", None)
+    cached = cache.get(None, 'progress', user_goals, version, fingerprint=pair, user_id=user_id)
+    if cached is not None:
+        return cached
+
+    if before_analysis:
+        prompt += f"""
+
+Earlier analysis of the BEFORE photo (the starting point; don't repeat it, focus on what changed):
+{before_analysis}"""
 
+    result = call_nemotron_vision(prompt, images=[before, after], system_prompt=system_prompt)
+    if not result.startswith("⚠️"):
+        cache.put(None, 'progress', user_goals, version, result, fingerprint=pair, user_id=user_id)
+    return result
 
-def suggest_form_corrections(exercise_image, exercise_name):
+
+def suggest_form_corrections(exercise_image, exercise_name, user_id=None):
     """
     Analyze exercise form from photo/video frame
 
     Args:
         exercise_image: Path or base64 of exercise photo
         exercise_name: Name of the exercise being performed
+        user_id: Whose photo it is
 
     Returns:
         str: Form analysis and corrections
@@ -223,10 +476,66 @@ Assess:
 
 Be specific about body positioning, joint angles, and movement patterns."""
 
-    if isinstance(exercise_image, str) and os.path.exists(exercise_image):
-        return call_nemotron_vision(prompt, image_path=exercise_image, system_prompt=system_prompt)
-    else:
-        return call_nemotron_vision(prompt, image_base64=exercise_image, system_prompt=system_prompt)
+    return cached_vision_call('form', exercise_name, prompt, exercise_image, system_prompt, user_id)
+
+
+def analyze_form_video(video, exercise_name, max_frames=DEFAULT_MAX_FRAMES, user_id=None):
+    """
+    Analyze exercise form from a video of a set
+
+    Only the distinct phase keyframes (turnarounds, mid-rep) are analysed, so
+    the number of model calls is bounded by max_frames however long the clip;
+    frames are analysed in parallel under the shared rate limit and merged
+    into one report.
+
+    Args:
+        video: Path, file object or bytes of the video (mp4/mov, or animated GIF/WebP)
+        exercise_name: Name of the exercise being performed
+        max_frames: Most frames analysed
+        user_id: Whose video it is
+
+    Returns:
+        str: Merged form analysis and corrections
+    """
+    try:
+        keyframes = extract_keyframes(video, max_frames=max_frames)
+    except (ImportError, ValueError, OSError) as e:
+        return f"⚠️  Could not read video: {str(e)}"
+    if not keyframes:
+        return "⚠️  No frames could be read from the video."
+
+    workers = min(len(keyframes), get_api_limiter().max_concurrent)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="form-video") as pool:
+        analyses = list(pool.map(
+            lambda frame: suggest_form_corrections(frame['image'], exercise_name, user_id), keyframes
+        ))
+
+    sections = [
+        f"### Frame at {frame['time']:.1f}s ({frame['phase']})\n\n{analysis}"
+        for frame, analysis in zip(keyframes, analyses)
+    ]
+    if len(sections) == 1 or all(analysis.startswith("⚠️") for analysis in analyses):
+        return "\n\n".join(sections)
+
+    # One text-only call turns the per-frame notes into a single set of cues
+    system_prompt = """You are a certified strength and conditioning coach specializing in
+    proper exercise form and injury prevention."""
+    prompt = f"""Below are form analyses of {len(sections)} keyframes, in time order, from one video
+of someone performing a {exercise_name}.
+
+{chr(10).join(sections)}
+
+Merge them into one form check:
+1. **Overall Form**: What they do well across the set
+2. **Form Issues**: Problems, and the phase of the rep where each shows up
+3. **Injury Risks**: Potential injury risks from current form
+4. **Corrections**: The 3-5 most important cues, in priority order
+
+Don't repeat per-frame detail that doesn't change the advice."""
+    merged = call_nemotron_vision(prompt, system_prompt=system_prompt)
+    if merged.startswith("⚠️"):
+        return "\n\n".join(sections)
+    return merged
 
 
 if __name__ == "__main__":
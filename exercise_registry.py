@@ -0,0 +1,242 @@
+"""
+Exercise Registry - Typed exercise records with alias lookup
+Each main lift is a compact record (muscles, form cues, numeric progression
+tiers, assistance lifts, common issues, aliases). Local engines read the
+numbers directly, any spelling of a lift ('Bench Press', 'bench_press', 'BP')
+resolves in one dict lookup, and knowledge_base renders its prose from here.
+"""
+import re
+import math
+
+
+class ProgressionTier:
+    """One progression band: lifts in [lower, upper) add `increment` every `sessions_per_step` sessions"""
+
+    __slots__ = ('tier', 'lower', 'upper', 'increment', 'sessions_per_step', 'band', 'rule')
+
+    def __init__(self, tier, lower, upper, increment, sessions_per_step, band, rule):
+        self.tier = tier
+        self.lower = lower
+        self.upper = upper
+        self.increment = increment
+        self.sessions_per_step = sessions_per_step
+        self.band = band
+        self.rule = rule
+
+    def as_dict(self):
+        return {'tier': self.tier, 'upper': self.upper, 'increment': self.increment,
+                'sessions_per_step': self.sessions_per_step}
+
+
+class Exercise:
+    """A main lift and everything the coach knows about it"""
+
+    __slots__ = ('key', 'name', 'primary', 'secondary', 'cues', 'progression',
+                 'assistance', 'issues', 'aliases')
+
+    def __init__(self, key, name, primary, secondary, cues, progression, assistance, issues, aliases):
+        self.key = key
+        self.name = name
+        self.primary = primary
+        self.secondary = secondary
+        self.cues = tuple(cues)
+        self.progression = tuple(progression)
+        self.assistance = tuple(assistance)
+        self.issues = tuple(issues)
+        self.aliases = tuple(aliases)
+
+    def tier_for(self, weight):
+        """ProgressionTier for a (estimated) max"""
+        for tier in self.progression:
+            if weight < tier.upper:
+                return tier
+        return self.progression[-1]
+
+    def render(self):
+        """Knowledge-base prose for prompts"""
+        lines = [
+            "", f"{self.name}:", f"Primary: {self.primary}", f"Secondary: {self.secondary}",
+            "", "FORM CUES:", *(f"- {cue}" for cue in self.cues),
+            "", "PROGRESSION:", *(f"- {t.tier.title()} ({t.band}): {t.rule}" for t in self.progression),
+            "", "ASSISTANCE EXERCISES:", *(f"- {name} ({purpose})" for name, purpose in self.assistance),
+            "", "COMMON ISSUES:", *(f"- {issue} → {fix}" for issue, fix in self.issues),
+        ]
+        return "\n".join(lines) + "\n"
+
+
+def normalize_alias(name):
+    """'Bench Press' / 'bench_press' / ' bench-press ' → 'bench press'"""
+    return re.sub(r"[\s_\-]+", " ", str(name).strip().lower())
+
+
+EXERCISES = [
+    Exercise(
+        key="bench_press",
+        name="BENCH PRESS",
+        primary="Chest (pectoralis major)",
+        secondary="Triceps, anterior deltoids",
+        cues=[
+            "Retract and depress scapula (pull shoulder blades down and back)",
+            "Maintain arch in lower back",
+            "Feet flat on floor, drive through heels",
+            "Bar path: Straight down to nipple line, press up and slightly back",
+            "Elbows: 45-degree angle from torso (not flared to 90 degrees)",
+            "Grip: Slightly wider than shoulder width",
+            "Lower to touch chest, press explosively",
+        ],
+        progression=[
+            ProgressionTier('beginner', 0, 135, 5.0, 1.0, "<135lbs", "Add 5lbs every session"),
+            ProgressionTier('intermediate', 135, 225, 2.5, 1.5, "135-225lbs", "Add 2.5lbs every 1-2 sessions"),
+            ProgressionTier('advanced', 225, math.inf, 2.5, 7.5, "225+",
+                            "Wave loading, add weight every 2-3 weeks"),
+        ],
+        assistance=[
+            ("Close-grip bench", "triceps"),
+            ("Incline press", "upper chest"),
+            ("Dips", "overall pressing strength"),
+            ("Face pulls", "shoulder health"),
+        ],
+        issues=[
+            ("Bouncing bar off chest", "Control descent, pause"),
+            ("Elbows flaring", "Keep at 45 degrees"),
+            ("Butt lifting off bench", "Engage core, maintain arch"),
+            ("Uneven press", "Check grip width, practice with pause reps"),
+        ],
+        aliases=["bench", "bp", "flat bench", "barbell bench press"],
+    ),
+    Exercise(
+        key="squat",
+        name="SQUAT",
+        primary="Quadriceps, glutes",
+        secondary="Hamstrings, core, adductors",
+        cues=[
+            "Bar position: High bar (traps) or low bar (rear delts)",
+            "Stance: Shoulder-width or slightly wider",
+            "Toes: Slightly pointed out (10-30 degrees)",
+            "Depth: Hip crease below knee (parallel or deeper)",
+            "Knees: Track over toes, don't cave inward",
+            "Chest: Up and proud throughout",
+            "Core: Brace hard, valsalva maneuver",
+            "Bar path: Straight vertical line over mid-foot",
+        ],
+        progression=[
+            ProgressionTier('beginner', 0, 185, 5.0, 1.0, "<185lbs", "Add 5-10lbs every session"),
+            ProgressionTier('intermediate', 185, 315, 5.0, 1.5, "185-315lbs", "Add 5lbs every 1-2 sessions"),
+            ProgressionTier('advanced', 315, math.inf, 5.0, 3.0, "315+", "Wave loading, weekly progression"),
+        ],
+        assistance=[
+            ("Front squats", "quad emphasis, core"),
+            ("Bulgarian split squats", "unilateral"),
+            ("Leg press", "volume without CNS fatigue"),
+            ("Pause squats", "strength out of hole"),
+        ],
+        issues=[
+            ("Knees caving (valgus)", 'Cue "knees out", strengthen glutes'),
+            ("Forward lean", "Work on ankle mobility, try high bar"),
+            ("Not hitting depth", "Goblet squats for mobility, box squats"),
+            ("Butt wink", "Improve hip mobility, adjust stance width"),
+        ],
+        aliases=["squats", "back squat", "barbell squat", "low bar", "high bar"],
+    ),
+    Exercise(
+        key="deadlift",
+        name="DEADLIFT",
+        primary="Erectors, glutes, hamstrings",
+        secondary="Lats, traps, grip, core",
+        cues=[
+            "Stance: Hip-width, toes under bar",
+            "Grip: Just outside legs, mixed or double overhand",
+            "Setup: Bar over mid-foot, shins touch bar",
+            "Back: Neutral spine, chest up",
+            "Hinge: Push hips back, maintain back angle until bar passes knees",
+            "Drive: Push floor away, hips and shoulders rise together",
+            "Lockout: Stand tall, squeeze glutes",
+        ],
+        progression=[
+            ProgressionTier('beginner', 0, 225, 10.0, 1.0, "<225lbs", "Add 10lbs every session"),
+            ProgressionTier('intermediate', 225, 405, 5.0, 1.0, "225-405lbs", "Add 5-10lbs every session"),
+            ProgressionTier('advanced', 405, math.inf, 5.0, 3.0, "405+",
+                            "Weekly progression, consider sumo variant"),
+        ],
+        assistance=[
+            ("Romanian deadlifts", "hamstrings"),
+            ("Deficit deadlifts", "off the floor strength"),
+            ("Rack pulls", "lockout strength"),
+            ("Barbell rows", "back thickness"),
+        ],
+        issues=[
+            ("Rounded back", 'Reduce weight, cue "chest up"'),
+            ("Bar drifting away", "Keep bar close, engage lats"),
+            ("Weak lockout", "Rack pulls, hip thrusts"),
+            ("Weak off floor", "Deficit deadlifts, pause deadlifts"),
+        ],
+        aliases=["deadlifts", "deads", "dl", "conventional deadlift", "sumo", "sumo deadlift"],
+    ),
+    Exercise(
+        key="overhead_press",
+        name="OVERHEAD PRESS (OHP)",
+        primary="Anterior deltoids, triceps",
+        secondary="Upper chest, core, traps",
+        cues=[
+            "Stance: Hip-width, slight stagger optional",
+            "Grip: Just outside shoulders",
+            "Starting position: Clavicles, elbows slightly forward",
+            "Press: Straight overhead, push head through at top",
+            "Lockout: Shrug shoulders up, full extension",
+            "Core: Brace hard, squeeze glutes (prevent arch)",
+        ],
+        progression=[
+            ProgressionTier('beginner', 0, 95, 2.5, 1.0, "<95lbs", "Add 2.5lbs every session"),
+            ProgressionTier('intermediate', 95, 135, 2.5, 1.5, "95-135lbs", "Add 2.5lbs every 1-2 sessions"),
+            ProgressionTier('advanced', 135, math.inf, 1.25, 3.0, "135+",
+                            "Use microplates (1.25lbs), weekly progression"),
+        ],
+        assistance=[
+            ("Push press", "overload lockout"),
+            ("Seated DB press", "isolate shoulders"),
+            ("Lateral raises", "side delts"),
+            ("Face pulls", "rear delts, shoulder health"),
+        ],
+        issues=[
+            ("Excessive back arch", "Brace core harder, squeeze glutes"),
+            ("Bar drifts forward", "Press back into shrug"),
+            ("Stalling", "Most sensitive to fatigue, ensure recovery"),
+            ("Elbow pain", "Check grip width, add face pulls"),
+        ],
+        aliases=["ohp", "military press", "shoulder press", "strict press"],
+    ),
+]
+
+REGISTRY = {exercise.key: exercise for exercise in EXERCISES}
+
+
+def _alias_table(exercises):
+    table = {}
+    for exercise in exercises:
+        for name in (exercise.key, exercise.name, exercise.name.split(' (')[0], *exercise.aliases):
+            table[normalize_alias(name)] = exercise.key
+    return table
+
+
+# Every spelling → key; built once and bound in one assignment (safe across a
+# hot reload), each lookup is a single dict hit
+_ALIASES = _alias_table(EXERCISES)
+
+
+def resolve(name):
+    """Registry key for any alias ('Bench Press', 'OHP', 'bench_press'), or None"""
+    return _ALIASES.get(normalize_alias(name))
+
+
+def get_exercise(name):
+    """Exercise record for any alias, or None"""
+    key = resolve(name)
+    return REGISTRY[key] if key else None
+
+
+def aliases():
+    """key -> every normalised alias (for multi-pattern matchers)"""
+    table = {}
+    for alias, key in _ALIASES.items():
+        table.setdefault(key, []).append(alias)
+    return table
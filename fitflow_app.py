@@ -11,6 +11,8 @@ import time
 from agents.insight import analyze_user
 from agents.coach import motivate_user
 from agents.planner import plan_next_day
+from strength_engine import current_max_lifts
+from progression_simulator import PROGRAM_MODELS, simulate_progression
 
 # Page config
 st.set_page_config(
@@ -356,10 +358,11 @@ def workout_planner_page():
         workout_type = st.selectbox("Workout Type", ["Upper Body", "Lower Body", "Full Body", "Cardio", "Rest Day"])
 
         st.markdown("#### 💪 Current Max Lifts")
-        bench_max = st.number_input("Bench Press (lbs)", min_value=0, value=185, step=5)
-        squat_max = st.number_input("Squat (lbs)", min_value=0, value=225, step=5)
-        deadlift_max = st.number_input("Deadlift (lbs)", min_value=0, value=275, step=5)
-        ohp_max = st.number_input("Overhead Press (lbs)", min_value=0, value=115, step=5)
+        max_lifts = current_max_lifts(st.session_state.get('logged_workouts'))
+        bench_max = st.number_input("Bench Press (lbs)", min_value=0, value=max_lifts['bench_press'], step=5)
+        squat_max = st.number_input("Squat (lbs)", min_value=0, value=max_lifts['squat'], step=5)
+        deadlift_max = st.number_input("Deadlift (lbs)", min_value=0, value=max_lifts['deadlift'], step=5)
+        ohp_max = st.number_input("Overhead Press (lbs)", min_value=0, value=max_lifts['overhead_press'], step=5)
         st.markdown('</div>', unsafe_allow_html=True)
 
     with col2:
@@ -474,7 +477,7 @@ def generate_ai_coaching():
     sample_data = {
         'workout_done': True,
         'workout_type': 'upper_body',
-        'max_lifts': {'bench_press': 185, 'squat': 225},
+        'max_lifts': current_max_lifts(st.session_state.get('logged_workouts')),
         'protein_grams': 120,
         'sleep_hours': 7.5,
         'energy': 'high'
@@ -581,22 +584,35 @@ def analytics_page():
         target_squat = st.number_input("Target Squat (lbs)", min_value=0, value=250)
         target_deadlift = st.number_input("Target Deadlift (lbs)", min_value=0, value=300)
         target_date = st.date_input("Target Date", datetime.date.today() + datetime.timedelta(days=90))
+        program = st.selectbox("Training Program", list(PROGRAM_MODELS), index=1)
 
     with col2:
         st.markdown("#### Body Goals")
         target_weight = st.number_input("Target Weight (kg)", min_value=0.0, value=72.0, step=0.5)
         target_bf = st.slider("Target Body Fat %", 5, 30, 15)
 
-        # Progress rings
-        current_bench_progress = (185 / target_bench) * 100
+        # Odds of hitting each strength goal by the target date (Monte Carlo)
+        # Starting maxes and attendance come from the user's logged sessions
+        goals = {'bench_press': target_bench, 'squat': target_squat, 'deadlift': target_deadlift}
+        days = max((target_date - datetime.date.today()).days, 0)
+        odds = simulate_progression(st.session_state.get('logged_workouts'), goals, days, program)
+
         st.markdown(f"""
         <div class="metric-card">
-            <div class="metric-label">Bench Press Progress</div>
-            <div class="metric-value">{current_bench_progress:.0f}%</div>
-            <div class="metric-label">185/{target_bench} lbs</div>
+            <div class="metric-label">Chance of Hitting All Goals</div>
+            <div class="metric-value">{odds['all'] * 100:.0f}%</div>
+            <div class="metric-label">{program} · {days} days · {odds['attendance'] * 100:.0f}% attendance</div>
         </div>
         """, unsafe_allow_html=True)
 
+        for lift, probability in odds['probability'].items():
+            st.metric(
+                f"{lift.replace('_', ' ').title()}: {odds['start'][lift]:g} → {goals[lift]} lbs",
+                f"{probability * 100:.0f}%",
+                f"median {odds['percentiles'][lift]['p50']:.0f} lbs",
+                delta_color="off"
+            )
+
     # AI Recommendations
     st.markdown("### 🤖 AI Recommendations")
 
@@ -57,6 +57,9 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+USER_ID = "streamlit_user"
+NOTIFICATIONS_PER_PAGE = 10
+
 def initialize_fitness_profile():
     """Initialize user fitness profile"""
     if 'fitness_profile' not in st.session_state:
@@ -109,15 +112,19 @@ def main():
             # Auto-generate notifications in background
             if st.button("🔄 Refresh Notifications"):
                 from notification_system import NotificationManager
+                from strength_engine import current_max_lifts
                 user_data = {
+                    'user_id': USER_ID,
                     'body_weight': st.session_state.fitness_profile.get('weight', 70) * 2.2,
                     'sleep_hours': 7.5,
                     'soreness': 5,
                     'energy': 'moderate',
-                    'max_lifts': {'bench_press': 185, 'squat': 225, 'deadlift': 275}
+                    'max_lifts': current_max_lifts(st.session_state.get('logged_workouts')),
+                    'previous_max_lifts': st.session_state.get('notified_max_lifts')
                 }
                 notif_manager = NotificationManager(user_data)
                 notif_manager.run_notification_check()
+                st.session_state.notified_max_lifts = notif_manager.settled_max_lifts
                 st.session_state.active_notifications = notif_manager.notifications
                 st.rerun()
         else:
@@ -150,14 +157,28 @@ def photo_analysis_page():
     a personalized workout plan based on your current development.
     """)
 
-    # Photo upload
-    uploaded_file = st.file_uploader("Upload Body Photo", type=['jpg', 'jpeg', 'png'])
+    # Photo upload: one photo, or front/side/back for symmetry and posture from every angle
+    mode = st.radio("Photos", ["Single photo", "Pose set (front, side, back)"], horizontal=True)
+    if mode == "Single photo":
+        uploaded_file = st.file_uploader("Upload Body Photo", type=['jpg', 'jpeg', 'png'])
+        pose_files = {}
+    else:
+        pose_columns = st.columns(3)
+        pose_files = {
+            pose: column.file_uploader(f"{pose.title()} view", type=['jpg', 'jpeg', 'png'], key=f"pose_{pose}")
+            for pose, column in zip(["front", "side", "back"], pose_columns)
+        }
+        pose_files = {pose: f for pose, f in pose_files.items() if f is not None}
+        uploaded_file = next(iter(pose_files.values()), None)
 
     col1, col2 = st.columns([1, 1])
 
     with col1:
         if uploaded_file is not None:
-            st.image(uploaded_file, caption="Your Photo", use_column_width=True)
+            if pose_files:
+                st.image(list(pose_files.values()), caption=[pose.title() for pose in pose_files], width=150)
+            else:
+                st.image(uploaded_file, caption="Your Photo", use_column_width=True)
 
             # Fitness goal selection
             goal = st.selectbox(
@@ -167,15 +188,13 @@ def photo_analysis_page():
 
             if st.button("🔍 Analyze Physique", type="primary", use_container_width=True):
                 with st.spinner("AI analyzing your physique... This may take 10-15 seconds"):
-                    import base64
-                    from agents.vision_analyzer import analyze_physique
+                    from agents.vision_analyzer import analyze_physique, analyze_physique_poses
 
-                    # Convert uploaded file to base64
-                    bytes_data = uploaded_file.getvalue()
-                    base64_image = base64.b64encode(bytes_data).decode()
-
-                    # Analyze
-                    analysis = analyze_physique(image_base64=base64_image, user_goals=goal.lower())
+                    # Analyze (the upload is read in place and streamed, never copied whole)
+                    if pose_files:
+                        analysis = analyze_physique_poses(pose_files, user_goals=goal.lower(), user_id=USER_ID)
+                    else:
+                        analysis = analyze_physique(image_file=uploaded_file, user_goals=goal.lower(), user_id=USER_ID)
 
                     # Store in session state
                     st.session_state['physique_analysis'] = analysis
@@ -287,6 +306,10 @@ def user_profile_page():
             'preferred_time': str(preferred_time),
             'meal_times': [str(breakfast), str(lunch), str(dinner)]
         })
+
+        # Reminders fire from the background scheduler, no polling needed
+        from reminder_scheduler import get_reminder_scheduler
+        get_reminder_scheduler().schedule_profile(USER_ID, st.session_state.fitness_profile)
         st.success("Profile saved! 💪")
 
 def workout_plan_page():
@@ -308,7 +331,7 @@ def generate_workout_plan():
 
     # Create proper user data format for agents
     user_data = {
-        "user_id": "streamlit_user",
+        "user_id": USER_ID,
         "date": str(datetime.date.today()),
         "workout_done": False,
         "workout_type": "planning",
@@ -482,6 +505,36 @@ def progress_tracking_page():
         </div>
         """, unsafe_allow_html=True)
 
+def render_notification_card(notif):
+    """Render one notification as an HTML card"""
+    priority_colors = {
+        'high': '#ff9a9e',
+        'medium': '#a8edea',
+        'low': '#fed6e3'
+    }
+
+    color = priority_colors.get(notif['priority'], '#e0e0e0')
+    opacity = 0.6 if notif.get('read') else 1.0
+
+    st.markdown(f"""
+    <div style="
+        background: linear-gradient(135deg, {color} 0%, #fecfef 100%);
+        padding: 1.5rem;
+        border-radius: 10px;
+        border-left: 5px solid #f44336;
+        margin: 1rem 0;
+        box-shadow: 0 2px 8px rgba(0,0,0,0.1);
+        animation: slideIn 0.3s ease-out;
+        opacity: {opacity};
+    ">
+        <h4 style="margin: 0; color: #333;">{notif['title']}</h4>
+        <p style="margin: 0.5rem 0; color: #555;">{notif['message']}</p>
+        <p style="margin: 0; font-size: 0.9rem; color: #666;"><strong>Priority:</strong> {notif['priority'].upper()}</p>
+        {f'<p style="margin: 0; font-size: 0.9rem; color: #666;"><strong>Action:</strong> {notif["action"].replace("_", " ").title()}</p>' if notif['action'] != 'none' else ''}
+        <p style="margin-top: 0.5rem; font-size: 0.8rem; color: #999;">{notif['timestamp'][:19]}</p>
+    </div>
+    """, unsafe_allow_html=True)
+
 def notifications_page():
     """Real-time notifications and reminders using NotificationManager"""
     st.header("🔔 Smart Notifications")
@@ -496,36 +549,46 @@ def notifications_page():
     Notifications are updated automatically based on your profile and activity.
     """)
 
-    # Display active notifications from sidebar
-    if st.session_state.active_notifications:
-        st.subheader(f"📬 Active Notifications ({len(st.session_state.active_notifications)})")
-
-        for notif in st.session_state.active_notifications:
-            priority_colors = {
-                'high': '#ff9a9e',
-                'medium': '#a8edea',
-                'low': '#fed6e3'
-            }
-
-            color = priority_colors.get(notif['priority'], '#e0e0e0')
-
-            st.markdown(f"""
-            <div style="
-                background: linear-gradient(135deg, {color} 0%, #fecfef 100%);
-                padding: 1.5rem;
-                border-radius: 10px;
-                border-left: 5px solid #f44336;
-                margin: 1rem 0;
-                box-shadow: 0 2px 8px rgba(0,0,0,0.1);
-                animation: slideIn 0.3s ease-out;
-            ">
-                <h4 style="margin: 0; color: #333;">{notif['title']}</h4>
-                <p style="margin: 0.5rem 0; color: #555;">{notif['message']}</p>
-                <p style="margin: 0; font-size: 0.9rem; color: #666;"><strong>Priority:</strong> {notif['priority'].upper()}</p>
-                {f'<p style="margin: 0; font-size: 0.9rem; color: #666;"><strong>Action:</strong> {notif["action"].replace("_", " ").title()}</p>' if notif['action'] != 'none' else ''}
-                <p style="margin-top: 0.5rem; font-size: 0.8rem; color: #999;">{notif['timestamp'][:19]}</p>
-            </div>
-            """, unsafe_allow_html=True)
+    # Serve this user's inbox from the indexed notification store
+    from notification_store import get_notification_store
+    store = get_notification_store()
+
+    # Live feed: the browser subscribes to the SSE stream and prepends only new
+    # cards; the cursor is pinned so reruns keep the same component mounted
+    import streamlit.components.v1 as components
+    from notification_stream import live_feed_html
+    if 'stream_after_id' not in st.session_state:
+        st.session_state.stream_after_id = store.latest_id(USER_ID)
+    feed = live_feed_html(USER_ID, st.session_state.stream_after_id)
+    if feed:
+        st.subheader("📡 Live")
+        components.html(feed, height=300, scrolling=True)
+    else:
+        st.caption("Live updates unavailable; the inbox below refreshes on every rerun.")
+
+    col1, col2, col3 = st.columns([2, 1, 1])
+    with col1:
+        unread_only = st.checkbox("Unread only", value=False)
+    total = store.unread_count(USER_ID) if unread_only else store.total_count(USER_ID)
+    pages = max(1, -(-total // NOTIFICATIONS_PER_PAGE))
+    with col2:
+        page = st.number_input("Page", min_value=1, max_value=pages, value=1)
+    with col3:
+        if st.button("✅ Mark all read"):
+            store.mark_all_read(USER_ID)
+            st.rerun()
+
+    inbox = store.inbox(USER_ID, unread_only=unread_only, limit=NOTIFICATIONS_PER_PAGE,
+                        offset=(page - 1) * NOTIFICATIONS_PER_PAGE)
+
+    if inbox:
+        st.subheader(f"📬 Notifications ({store.unread_count(USER_ID)} unread, page {page}/{pages})")
+
+        for notif in inbox:
+            render_notification_card(notif)
+            if not notif['read'] and st.button("✓ Mark read", key=f"read_{notif['id']}"):
+                store.mark_read(notif['id'])
+                st.rerun()
     else:
         st.info("🔕 No active notifications. Click 'Refresh Notifications' in the sidebar to generate alerts.")
 
@@ -0,0 +1,343 @@
+"""
+Image Preprocessing - Shrink photos before they are sent to the vision model
+Phone photos arrive as 4-12 MB JPEGs (or PNGs) at 12+ megapixels, far above
+what the vision model actually looks at. Each image is rotated upright from its
+EXIF orientation, downscaled to the model's effective input resolution and
+re-encoded as JPEG at a tuned quality, and labelled with its real MIME type.
+Batches run on a process pool so decoding never blocks the UI thread.
+
+Images are never copied whole: paths are memory-mapped, uploads are read
+through their own BytesIO buffer, and the base64 for a request is produced
+chunk by chunk (PreparedImage.iter_base64), so peak memory per vision request
+is bounded by the decoded thumbnail, not the upload.
+"""
+import io
+import os
+import mmap
+import base64
+import binascii
+import hashlib
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow missing: images are sent as uploaded, with a sniffed MIME type
+    Image = ImageOps = None
+
+
+# Longest edge the vision model resolves detail at; larger images only cost upload and prefill
+MAX_EDGE = int(os.getenv("VISION_MAX_EDGE", "1024"))
+JPEG_QUALITY = int(os.getenv("VISION_JPEG_QUALITY", "85"))
+POOL_WORKERS = int(os.getenv("VISION_POOL_WORKERS", str(min(4, os.cpu_count() or 1))))
+BASE64_CHUNK = 3 * 16 * 1024  # raw bytes per base64 chunk (multiple of 3: no padding mid-stream)
+
+_SIGNATURES = [
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+    (b"BM", "image/bmp"),
+]
+
+
+def sniff_mime(data):
+    """MIME type from an image's magic bytes (None if unrecognised)"""
+    head = bytes(data[:16])
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    return next((mime for magic, mime in _SIGNATURES if head.startswith(magic)), None)
+
+
+class PreparedImage:
+    """Encoded image bytes ready for a vision request"""
+
+    __slots__ = ('data', 'mime', 'width', 'height', 'original_size')
+
+    def __init__(self, data, mime, width=None, height=None, original_size=None):
+        self.data = data
+        self.mime = mime
+        self.width = width
+        self.height = height
+        self.original_size = original_size if original_size is not None else len(data)
+
+    def base64(self):
+        return base64.b64encode(self.data).decode("ascii")
+
+    def data_url(self):
+        return f"data:{self.mime};base64,{self.base64()}"
+
+    @property
+    def data_url_prefix(self):
+        return f"data:{self.mime};base64,".encode("ascii")
+
+    @property
+    def base64_size(self):
+        return 4 * -(-len(self.data) // 3)
+
+    def iter_base64(self, chunk_size=BASE64_CHUNK):
+        """Base64 of the image in chunks (ASCII bytes), encoded from zero-copy slices"""
+        view = memoryview(self.data)
+        for start in range(0, len(view), chunk_size):
+            yield base64.b64encode(view[start:start + chunk_size])
+
+    def sha256(self):
+        """Content hash of the normalised (preprocessed) image"""
+        return hashlib.sha256(self.data).hexdigest()
+
+    @property
+    def ratio(self):
+        """How many times smaller than the upload"""
+        return self.original_size / max(1, len(self.data))
+
+
+def _is_path(source):
+    return isinstance(source, os.PathLike) or (
+        isinstance(source, str) and len(source) < 4096 and os.path.exists(source))
+
+
+def _map_file(f):
+    try:
+        return memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+    except ValueError:  # empty file
+        return memoryview(b"")
+
+
+def open_image_buffer(source):
+    """
+    Zero-copy view of an image given as a path, file object, bytes or base64 string
+
+    Paths and real files are memory-mapped, BytesIO uploads (e.g. Streamlit's
+    UploadedFile) expose their own buffer; only base64 input has to be decoded.
+
+    Returns:
+        memoryview
+    """
+    if isinstance(source, PreparedImage):
+        return memoryview(source.data)
+    if isinstance(source, (bytes, bytearray, memoryview, mmap.mmap)):
+        return memoryview(source)
+    if isinstance(source, io.BytesIO):
+        return source.getbuffer()
+    if _is_path(source):
+        with open(source, "rb") as f:
+            return _map_file(f)
+    if hasattr(source, "read"):
+        try:
+            return _map_file(source)
+        except (AttributeError, OSError, io.UnsupportedOperation):
+            source.seek(0)
+            return memoryview(source.read())
+    text = str(source)
+    if text.startswith("data:"):
+        text = text.split(",", 1)[1]
+    try:
+        return memoryview(base64.b64decode(text, validate=False))
+    except (binascii.Error, ValueError) as e:
+        raise ValueError(f"Not an image path or base64 image: {e}")
+
+
+def read_image_bytes(source):
+    """Raw bytes of an image given as a path, file object, bytes or base64 string"""
+    return bytes(open_image_buffer(source))
+
+
+class _BufferReader(io.RawIOBase):
+    """Seekable read-only file over a memoryview, so PIL decodes without copying the upload"""
+
+    def __init__(self, view):
+        self._view = view
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, b):
+        n = max(0, min(len(b), len(self._view) - self._pos))
+        b[:n] = self._view[self._pos:self._pos + n]
+        self._pos += n
+        return n
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._pos, io.SEEK_END: len(self._view)}[whence]
+        self._pos = max(0, base + offset)
+        return self._pos
+
+    def tell(self):
+        return self._pos
+
+
+def prepare_image(source, max_edge=MAX_EDGE, quality=JPEG_QUALITY):
+    """
+    EXIF-orient, downscale and re-encode one image
+
+    Args:
+        source: Image path, file object (e.g. an upload), raw bytes or base64 string
+            (a PreparedImage is returned as is)
+        max_edge: Longest edge in pixels after downscaling
+        quality: JPEG quality for the re-encode
+
+    Returns:
+        PreparedImage (its data is a view of the source when no re-encode was needed)
+    """
+    if isinstance(source, PreparedImage):
+        return source
+    data = open_image_buffer(source)
+    mime = sniff_mime(data) or "image/jpeg"
+    if Image is None:
+        return PreparedImage(data, mime)
+
+    try:
+        with Image.open(_BufferReader(data)) as image:
+            orig_size = image.size  # before draft() shrinks the decode
+            # JPEG decodes straight to a reduced scale (DCT scaling), far cheaper than full size
+            image.draft("RGB", (max_edge, max_edge))
+            rotated = image.getexif().get(0x0112, 1) != 1  # EXIF Orientation tag
+            small = max(orig_size) <= max_edge
+            if small and mime == "image/jpeg" and not rotated:
+                return PreparedImage(data, mime, *orig_size)  # already small and upright
+            oriented = ImageOps.exif_transpose(image) if rotated else image
+            if oriented.mode not in ("RGB", "L"):
+                rgba = oriented.convert("RGBA")
+                oriented = Image.new("RGB", rgba.size, (255, 255, 255))
+                oriented.paste(rgba, mask=rgba.getchannel("A"))
+            if max(oriented.size) > max_edge:
+                oriented.thumbnail((max_edge, max_edge), Image.LANCZOS)
+
+            buffer = io.BytesIO()
+            oriented.save(buffer, format="JPEG", quality=quality, optimize=True, progressive=True)
+            width, height = oriented.size
+    except (OSError, ValueError, Image.DecompressionBombError) as e:
+        print(f"Warning: Could not preprocess image, sending as uploaded: {e}")
+        return PreparedImage(data, mime)
+
+    encoded = buffer.getvalue()
+    # The original bytes only stand in for the re-encode when they are no larger in pixels either
+    if small and len(encoded) >= len(data) and mime == "image/jpeg" and not rotated:
+        return PreparedImage(data, mime, *orig_size)
+    return PreparedImage(encoded, "image/jpeg", width, height, original_size=len(data))
+
+
+def _dct_matrix(n):
+    k = np.arange(n)
+    matrix = np.cos(np.pi * (2 * k[None, :] + 1) * k[:, None] / (2 * n)) * np.sqrt(2 / n)
+    matrix[0] /= np.sqrt(2)
+    return matrix
+
+
+_DCT32 = _dct_matrix(32)
+
+
+def perceptual_hash(source):
+    """
+    64-bit DCT perceptual hash (pHash)
+
+    The image is reduced to 32x32 grayscale and the lowest 8x8 DCT frequencies
+    are compared against their median, so re-encodes, resizes and small crops
+    land within a few bits of each other.
+
+    Args:
+        source: PreparedImage, path, file object, raw bytes or base64 string
+
+    Returns:
+        int or None (unreadable image, or Pillow missing)
+    """
+    if Image is None:
+        return None
+    try:
+        with Image.open(_BufferReader(open_image_buffer(source))) as image:
+            image.draft("L", (64, 64))
+            pixels = np.asarray(image.convert("L").resize((32, 32), Image.LANCZOS), dtype=np.float64)
+    except (OSError, ValueError) as e:
+        print(f"Warning: Could not hash image: {e}")
+        return None
+    low = (_DCT32 @ pixels @ _DCT32.T)[:8, :8].ravel()
+    bits = low > np.median(low[1:])
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def hamming_distances(hashes, target):
+    """Bit distance from target to each 64-bit hash (vectorised)"""
+    diff = np.asarray(hashes, dtype=np.uint64) ^ np.uint64(target)
+    return np.unpackbits(diff.view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1)
+
+
+def _prepare_detached(source, max_edge, quality):
+    """prepare_image for pool workers: results must own their bytes to be pickled back"""
+    image = prepare_image(source, max_edge, quality)
+    if not isinstance(image.data, bytes):
+        image.data = bytes(image.data)
+    return image
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Never fork: the app process runs threads (delivery workers, file watchers, timers)
+            # whose locks a forked child would inherit held
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            _pool = ProcessPoolExecutor(max_workers=POOL_WORKERS, mp_context=multiprocessing.get_context(method))
+        return _pool
+
+
+def prepare_images(sources, max_edge=MAX_EDGE, quality=JPEG_QUALITY):
+    """
+    Preprocess a batch of images in parallel (process pool)
+
+    Args:
+        sources: Image paths, file objects, raw bytes, base64 strings or
+            PreparedImage (passed through)
+        max_edge: Longest edge in pixels after downscaling
+        quality: JPEG quality for the re-encode
+
+    Returns:
+        list: PreparedImage per source, in order
+    """
+    global _pool
+    results = list(sources)
+    todo = [i for i, source in enumerate(results) if not isinstance(source, PreparedImage)]
+    if len(todo) < 2 or POOL_WORKERS < 2 or Image is None:
+        for i in todo:
+            results[i] = prepare_image(results[i], max_edge, quality)
+        return results
+    # Paths are read in the workers; everything else is shipped as bytes
+    payloads = [results[i] if _is_path(results[i]) else read_image_bytes(results[i]) for i in todo]
+    try:
+        pool = _get_pool()
+        prepared = list(pool.map(_prepare_detached, payloads, [max_edge] * len(payloads), [quality] * len(payloads)))
+    except (BrokenProcessPool, OSError, RuntimeError) as e:
+        print(f"Warning: Image pool unavailable, preprocessing inline: {e}")
+        with _pool_lock:
+            _pool = None
+        prepared = [prepare_image(payload, max_edge, quality) for payload in payloads]
+    for i, image in zip(todo, prepared):
+        results[i] = image
+    return results
+
+
+if __name__ == "__main__":
+    # Self-check: a JPEG larger than MAX_EDGE must come back downscaled, never as the original bytes
+    if Image is None:
+        raise SystemExit("Pillow is required for the self-check")
+    noise = np.random.default_rng(0).integers(0, 256, (MAX_EDGE * 2, MAX_EDGE * 2, 3), dtype=np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(noise).save(buffer, format="JPEG", quality=95)
+    prepared = prepare_image(buffer.getvalue())
+    with Image.open(io.BytesIO(bytes(prepared.data))) as check:
+        actual = check.size
+    assert actual == (prepared.width, prepared.height), (actual, prepared.width, prepared.height)
+    assert max(actual) <= MAX_EDGE, actual
+    assert len(prepared.data) < len(buffer.getvalue())
+    print(f"OK: {MAX_EDGE * 2}px JPEG -> {actual[0]}x{actual[1]}, {prepared.ratio:.1f}x smaller")
@@ -2,6 +2,7 @@
 Fitness Knowledge Base - Enhanced context for better AI responses
 No training needed - just better prompts with expert knowledge!
 """
+from exercise_registry import EXERCISES as _EXERCISE_RECORDS
 
 # Progressive Overload Principles
 PROGRESSIVE_OVERLOAD = """
@@ -23,136 +24,8 @@ PR ATTEMPT GUIDELINES:
 - Rest 3-5 minutes between max attempts
 """
 
-# Exercise-Specific Knowledge
-EXERCISES = {
-    "bench_press": """
-BENCH PRESS:
-Primary: Chest (pectoralis major)
-Secondary: Triceps, anterior deltoids
-
-FORM CUES:
-- Retract and depress scapula (pull shoulder blades down and back)
-- Maintain arch in lower back
-- Feet flat on floor, drive through heels
-- Bar path: Straight down to nipple line, press up and slightly back
-- Elbows: 45-degree angle from torso (not flared to 90 degrees)
-- Grip: Slightly wider than shoulder width
-- Lower to touch chest, press explosively
-
-PROGRESSION:
-- Beginner (<135lbs): Add 5lbs every session
-- Intermediate (135-225lbs): Add 2.5lbs every 1-2 sessions
-- Advanced (225+): Wave loading, add weight every 2-3 weeks
-
-ASSISTANCE EXERCISES:
-- Close-grip bench (triceps)
-- Incline press (upper chest)
-- Dips (overall pressing strength)
-- Face pulls (shoulder health)
-
-COMMON ISSUES:
-- Bouncing bar off chest → Control descent, pause
-- Elbows flaring → Keep at 45 degrees
-- Butt lifting off bench → Engage core, maintain arch
-- Uneven press → Check grip width, practice with pause reps
-""",
-
-    "squat": """
-SQUAT:
-Primary: Quadriceps, glutes
-Secondary: Hamstrings, core, adductors
-
-FORM CUES:
-- Bar position: High bar (traps) or low bar (rear delts)
-- Stance: Shoulder-width or slightly wider
-- Toes: Slightly pointed out (10-30 degrees)
-- Depth: Hip crease below knee (parallel or deeper)
-- Knees: Track over toes, don't cave inward
-- Chest: Up and proud throughout
-- Core: Brace hard, valsalva maneuver
-- Bar path: Straight vertical line over mid-foot
-
-PROGRESSION:
-- Beginner (<185lbs): Add 5-10lbs every session
-- Intermediate (185-315lbs): Add 5lbs every 1-2 sessions
-- Advanced (315+): Wave loading, weekly progression
-
-ASSISTANCE EXERCISES:
-- Front squats (quad emphasis, core)
-- Bulgarian split squats (unilateral)
-- Leg press (volume without CNS fatigue)
-- Pause squats (strength out of hole)
-
-COMMON ISSUES:
-- Knees caving (valgus) → Cue "knees out", strengthen glutes
-- Forward lean → Work on ankle mobility, try high bar
-- Not hitting depth → Goblet squats for mobility, box squats
-- Butt wink → Improve hip mobility, adjust stance width
-""",
-
-    "deadlift": """
-DEADLIFT:
-Primary: Erectors, glutes, hamstrings
-Secondary: Lats, traps, grip, core
-
-FORM CUES:
-- Stance: Hip-width, toes under bar
-- Grip: Just outside legs, mixed or double overhand
-- Setup: Bar over mid-foot, shins touch bar
-- Back: Neutral spine, chest up
-- Hinge: Push hips back, maintain back angle until bar passes knees
-- Drive: Push floor away, hips and shoulders rise together
-- Lockout: Stand tall, squeeze glutes
-
-PROGRESSION:
-- Beginner (<225lbs): Add 10lbs every session
-- Intermediate (225-405lbs): Add 5-10lbs every session
-- Advanced (405+): Weekly progression, consider sumo variant
-
-ASSISTANCE EXERCISES:
-- Romanian deadlifts (hamstrings)
-- Deficit deadlifts (off the floor strength)
-- Rack pulls (lockout strength)
-- Barbell rows (back thickness)
-
-COMMON ISSUES:
-- Rounded back → Reduce weight, cue "chest up"
-- Bar drifting away → Keep bar close, engage lats
-- Weak lockout → Rack pulls, hip thrusts
-- Weak off floor → Deficit deadlifts, pause deadlifts
-""",
-
-    "overhead_press": """
-OVERHEAD PRESS (OHP):
-Primary: Anterior deltoids, triceps
-Secondary: Upper chest, core, traps
-
-FORM CUES:
-- Stance: Hip-width, slight stagger optional
-- Grip: Just outside shoulders
-- Starting position: Clavicles, elbows slightly forward
-- Press: Straight overhead, push head through at top
-- Lockout: Shrug shoulders up, full extension
-- Core: Brace hard, squeeze glutes (prevent arch)
-
-PROGRESSION:
-- Beginner (<95lbs): Add 2.5lbs every session
-- Intermediate (95-135lbs): Add 2.5lbs every 1-2 sessions
-- Advanced (135+): Use microplates (1.25lbs), weekly progression
-
-ASSISTANCE EXERCISES:
-- Push press (overload lockout)
-- Seated DB press (isolate shoulders)
-- Lateral raises (side delts)
-- Face pulls (rear delts, shoulder health)
-
-COMMON ISSUES:
-- Excessive back arch → Brace core harder, squeeze glutes
-- Bar drifts forward → Press back into shrug
-- Stalling → Most sensitive to fatigue, ensure recovery
-- Elbow pain → Check grip width, add face pulls
-"""
-}
+# Exercise-Specific Knowledge (rendered from the typed records in exercise_registry)
+EXERCISES = {exercise.key: exercise.render() for exercise in _EXERCISE_RECORDS}
 
 # Recovery and Nutrition
 RECOVERY_NUTRITION = """
@@ -283,36 +156,20 @@ WARM-UP PROTOCOL:
 4. Mobility: Focus on tight areas (hips, shoulders, ankles)
 """
 
-def get_relevant_knowledge(user_query, user_data=None):
+def get_relevant_knowledge(user_query, user_data=None, k=4, token_budget=600):
     """
     Retrieve relevant knowledge based on user query and data
-    This is like RAG (Retrieval Augmented Generation)
+    This is like RAG (Retrieval Augmented Generation): the best-ranked
+    paragraphs (BM25 over knowledge_index chunks) that fit the token budget
     """
-    knowledge_chunks = []
-
-    # Always include progressive overload
-    knowledge_chunks.append(PROGRESSIVE_OVERLOAD)
-
-    # Check which exercises are mentioned
-    query_lower = user_query.lower()
-    for exercise, info in EXERCISES.items():
-        if exercise.replace("_", " ") in query_lower:
-            knowledge_chunks.append(info)
+    from knowledge_index import get_knowledge_index, render
 
+    query = user_query
     # Include recovery if relevant
-    if user_data:
-        if user_data.get('sleep_hours') or user_data.get('soreness'):
-            knowledge_chunks.append(RECOVERY_NUTRITION)
-
-    # Check for program-related queries
-    if any(word in query_lower for word in ['program', 'routine', 'plan', 'schedule']):
-        knowledge_chunks.append(PROGRAMS)
-
-    # Check for injury-related queries
-    if any(word in query_lower for word in ['pain', 'injury', 'hurt', 'sore']):
-        knowledge_chunks.append(INJURY_PREVENTION)
+    if user_data and (user_data.get('sleep_hours') or user_data.get('soreness')):
+        query += " recovery sleep soreness"
 
-    return "\n\n".join(knowledge_chunks)
+    return render(get_knowledge_index().search(query, k=k, token_budget=token_budget))
 
 
 def enhance_prompt_with_knowledge(base_prompt, user_data=None):
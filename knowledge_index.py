@@ -0,0 +1,203 @@
+"""
+Knowledge Index - Section-level BM25 retrieval over the fitness knowledge base
+Splits every knowledge_base block into paragraph-sized chunks, indexes them in
+an inverted index and ranks them with BM25 (plus a boost for exercises named
+by any of their aliases), so prompts carry only the few relevant paragraphs
+that fit a token budget instead of whole multi-kilobyte blocks.
+"""
+import re
+import math
+from collections import Counter, defaultdict
+
+import knowledge_base
+import exercise_registry
+
+
+STOPWORDS = frozenset("""
+a an and are as at be by for from how i in is it me my of on or should the this to what when
+with you your do does can any more than per into up down not if
+""".split())
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+ALIAS_BOOST = 4.0
+
+_TOKEN = re.compile(r"[a-z0-9]+(?:\.[0-9]+)?")
+
+
+def tokenize(text):
+    """Lowercase word tokens without stopwords; plural 's' folded ('squats' -> 'squat')"""
+    tokens = []
+    for token in _TOKEN.findall(text.lower()):
+        if token in STOPWORDS:
+            continue
+        if len(token) > 4 and token.endswith('s') and not token.endswith('ss'):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+def estimate_tokens(text):
+    """Rough LLM token count (about 4 characters per token)"""
+    return -(-len(text) // 4)
+
+
+def knowledge_sources():
+    """Every knowledge block as (source, exercise_or_None, text)"""
+    sources = [
+        ('PROGRESSIVE_OVERLOAD', None, knowledge_base.PROGRESSIVE_OVERLOAD),
+        ('RECOVERY_NUTRITION', None, knowledge_base.RECOVERY_NUTRITION),
+        ('PROGRAMS', None, knowledge_base.PROGRAMS),
+        ('INJURY_PREVENTION', None, knowledge_base.INJURY_PREVENTION),
+    ]
+    sources += [(f"EXERCISES.{name}", name, text) for name, text in knowledge_base.EXERCISES.items()]
+    return sources
+
+
+def _is_heading(line):
+    letters = [c for c in line if c.isalpha()]
+    return line.endswith(':') and letters and all(c.isupper() for c in letters)
+
+
+def build_chunks(sources=None):
+    """
+    Split knowledge blocks into paragraph chunks
+
+    Paragraphs are separated by blank lines. A paragraph under an ALL-CAPS or
+    heading-only line (e.g. 'Soreness (DOMS):' under 'RECOVERY INDICATORS:') is
+    prefixed with that heading, and exercise paragraphs with the exercise name,
+    so each chunk reads on its own.
+
+    Returns:
+        list: Chunk dicts (id, source, exercise, heading, text, tokens)
+    """
+    chunks = []
+    for source, exercise, text in (sources if sources is not None else knowledge_sources()):
+        title = None
+        heading = None
+        for paragraph in re.split(r"\n\s*\n", text.strip()):
+            lines = [line.rstrip() for line in paragraph.strip().splitlines() if line.strip()]
+            if not lines:
+                continue
+            first = lines[0].strip()
+            if exercise and title is None:
+                title = first.rstrip(':')
+            if len(lines) == 1 and first.endswith(':'):
+                heading = first.rstrip(':')  # heading-only paragraph introduces the next ones
+                continue
+            if _is_heading(first):
+                heading = first.rstrip(':')
+            elif heading:
+                lines.insert(0, f"{heading}:")
+            if title and not first.startswith(title):
+                lines.insert(0, f"[{title}]")
+            body = "\n".join(lines)
+            chunks.append({
+                'id': len(chunks),
+                'source': source,
+                'exercise': exercise,
+                'heading': first.rstrip(':'),
+                'text': body,
+                'tokens': estimate_tokens(body),
+            })
+    return chunks
+
+
+class KnowledgeIndex:
+    """Inverted index with BM25 ranking over knowledge chunks"""
+
+    def __init__(self, chunks=None, aliases=None):
+        self.chunks = chunks if chunks is not None else build_chunks()
+        self.postings = defaultdict(list)  # term -> [(chunk id, term frequency)]
+        self.lengths = []
+        for chunk in self.chunks:
+            terms = Counter(tokenize(chunk['text']))
+            self.lengths.append(sum(terms.values()))
+            for term, tf in terms.items():
+                self.postings[term].append((chunk['id'], tf))
+        self.postings = dict(self.postings)
+
+        n = len(self.chunks)
+        self.average_length = sum(self.lengths) / n if n else 0.0
+        self.idf = {
+            term: math.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+            for term, docs in self.postings.items()
+        }
+
+        # Exercise key → aliases (registry); one compiled alternation matches all of them in one pass
+        self._init_aliases(aliases if aliases is not None else exercise_registry.aliases())
+        self.exercise_chunks = defaultdict(list)
+        for chunk in self.chunks:
+            if chunk['exercise']:
+                self.exercise_chunks[chunk['exercise']].append(chunk['id'])
+
+    def _init_aliases(self, aliases):
+        self.alias_lookup = {alias: key for key, names in aliases.items() for alias in names}
+        self.alias_pattern = re.compile(
+            r"\b(" + "|".join(re.escape(a) for a in sorted(self.alias_lookup, key=len, reverse=True)) + r")\b"
+        )
+
+    def match_exercises(self, text):
+        """Exercise keys mentioned in text by any alias (one regex pass)"""
+        return {self.alias_lookup[m] for m in self.alias_pattern.findall(text.lower())}
+
+    def _postings(self, term):
+        return self.postings[term]
+
+    def _chunk(self, chunk_id):
+        return self.chunks[chunk_id]
+
+    def score(self, query):
+        """BM25 score per chunk id for a query (chunks sharing a term, plus those of any exercise it names)"""
+        scores = defaultdict(float)
+        for term in set(tokenize(query)):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for chunk_id, tf in self._postings(term):
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[chunk_id] / self.average_length)
+                scores[chunk_id] += idf * tf * (BM25_K1 + 1) / (tf + norm)
+        # The boost applies even where no query term matched: 'bp' or 'deads' never appear in the text
+        for exercise in self.match_exercises(query):
+            for chunk_id in self.exercise_chunks.get(exercise, ()):
+                scores[chunk_id] += ALIAS_BOOST
+        return scores
+
+    def search(self, query, k=4, token_budget=600):
+        """
+        Top-k chunks for a query that fit within a token budget
+
+        Args:
+            query: Free-text query
+            k: Maximum number of chunks
+            token_budget: Maximum total estimated tokens of the returned chunks
+
+        Returns:
+            list: Chunk dicts, best first
+        """
+        ranked = sorted(self.score(query).items(), key=lambda item: (-item[1], item[0]))
+        results, used = [], 0
+        for chunk_id, _ in ranked:
+            chunk = self._chunk(chunk_id)
+            if used + chunk['tokens'] > token_budget:
+                continue
+            results.append(chunk)
+            used += chunk['tokens']
+            if len(results) == k:
+                break
+        return results
+
+
+def render(chunks):
+    """Join chunks into a prompt context string"""
+    return "\n\n".join(chunk['text'] for chunk in chunks)
+
+
+def get_knowledge_index():
+    """
+    Process-wide index for the current knowledge version (see knowledge_store:
+    the memory-mapped pack when it matches, otherwise built in memory, and
+    rebuilt whenever the knowledge base is edited)
+    """
+    from knowledge_store import get_knowledge_store
+    return get_knowledge_store().current().index
@@ -0,0 +1,181 @@
+"""
+Knowledge Pack - Compiled, memory-mapped knowledge base and retrieval index
+`python knowledge_pack.py` compiles the knowledge_base chunks, their metadata
+and the BM25 inverted index into one versioned binary file. Worker processes
+memory-map it read-only, so every worker shares one page-cache copy and starts
+without chunking or indexing anything.
+
+Layout (little-endian):
+    header   magic, format version, chunk count, knowledge version (sha256),
+             then (offset, length) of each section below
+    meta     JSON: chunk metadata (text offsets), term -> (start, count, idf),
+             average length, aliases
+    text     UTF-8 chunk texts, back to back
+    postings int32 chunk ids, int32 term frequencies, float32 chunk lengths
+             (read through memoryview casts, no copies)
+"""
+import os
+import sys
+import json
+import mmap
+import struct
+import hashlib
+from array import array
+from pathlib import Path
+
+import exercise_registry
+from knowledge_index import KnowledgeIndex, build_chunks, knowledge_sources
+
+
+MAGIC = b"FFKP"
+FORMAT_VERSION = 1
+DEFAULT_PATH = os.getenv("KNOWLEDGE_PACK", "data/knowledge.pack")
+
+_HEADER = struct.Struct("<4sII32s" + "QQ" * 4)
+
+
+def knowledge_version(sources=None, aliases=None):
+    """sha256 of the pack format, the exercise aliases and every knowledge block (hex)"""
+    aliases = aliases if aliases is not None else exercise_registry.aliases()
+    digest = hashlib.sha256(f"format={FORMAT_VERSION}".encode())
+    digest.update(json.dumps(aliases, sort_keys=True).encode("utf-8"))
+    for source, exercise, text in (sources if sources is not None else knowledge_sources()):
+        digest.update(f"\0{source}\0{exercise or ''}\0".encode())
+        digest.update(text.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def build_pack(path=DEFAULT_PATH, sources=None):
+    """
+    Compile the knowledge base into a pack file (written atomically)
+
+    Returns:
+        str: Knowledge version stored in the pack
+    """
+    sources = sources if sources is not None else knowledge_sources()
+    aliases = exercise_registry.aliases()
+    version = knowledge_version(sources, aliases)
+    index = KnowledgeIndex(build_chunks(sources), aliases)
+
+    text = bytearray()
+    chunks = []
+    for chunk in index.chunks:
+        encoded = chunk['text'].encode("utf-8")
+        chunks.append({**{k: v for k, v in chunk.items() if k != 'text'},
+                       'offset': len(text), 'length': len(encoded)})
+        text += encoded
+
+    ids, tfs, terms = [], [], {}
+    for term in sorted(index.postings):
+        postings = index.postings[term]
+        terms[term] = [len(ids), len(postings), index.idf[term]]
+        ids.extend(chunk_id for chunk_id, _ in postings)
+        tfs.extend(tf for _, tf in postings)
+
+    meta = json.dumps({
+        'chunks': chunks,
+        'terms': terms,
+        'average_length': index.average_length,
+        'aliases': aliases,
+    }, ensure_ascii=False).encode("utf-8")
+    postings = array('i', ids).tobytes() + array('i', tfs).tobytes() + array('f', index.lengths).tobytes()
+
+    offset = _HEADER.size
+    sections = []
+    for blob in (meta, bytes(text), postings):
+        sections.extend((offset, len(blob)))
+        offset += len(blob)
+    sections.extend((len(ids), 0))  # number of postings (second slot reserved)
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, len(chunks), bytes.fromhex(version), *sections))
+        f.write(meta)
+        f.write(text)
+        f.write(postings)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    return version
+
+
+class PackedKnowledgeIndex(KnowledgeIndex):
+    """KnowledgeIndex backed by a read-only memory-mapped pack"""
+
+    def __init__(self, path=DEFAULT_PATH):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        header = _HEADER.unpack_from(self._mmap, 0)
+        magic, format_version, n_chunks, version = header[:4]
+        if magic != MAGIC or format_version != FORMAT_VERSION:
+            raise ValueError(f"{path} is not a version {FORMAT_VERSION} knowledge pack")
+        if sys.byteorder != 'little':
+            raise ValueError("knowledge packs are little-endian; rebuilding in memory")
+        (meta_offset, meta_length, self._text_offset, _,
+         postings_offset, _, n_postings, _) = header[4:12]
+
+        self.path = str(path)
+        self.version = version.hex()
+        meta = json.loads(self._mmap[meta_offset:meta_offset + meta_length])
+        self._meta_chunks = meta['chunks']
+        self._terms = meta['terms']
+        self.idf = {term: entry[2] for term, entry in self._terms.items()}
+        self.average_length = meta['average_length']
+
+        # Zero-copy views into the mapped file
+        view = memoryview(self._mmap)
+        ids_end = postings_offset + 4 * n_postings
+        self._ids = view[postings_offset:ids_end].cast('i')
+        self._tfs = view[ids_end:ids_end + 4 * n_postings].cast('i')
+        self.lengths = view[ids_end + 4 * n_postings:ids_end + 4 * n_postings + 4 * n_chunks].cast('f')
+
+        self._init_aliases(meta['aliases'])
+        self.exercise_chunks = {}
+        for chunk in self._meta_chunks:
+            if chunk['exercise']:
+                self.exercise_chunks.setdefault(chunk['exercise'], []).append(chunk['id'])
+        self._chunk_cache = {}
+
+    @property
+    def chunks(self):
+        return [self._chunk(i) for i in range(len(self._meta_chunks))]
+
+    def _postings(self, term):
+        start, count, _ = self._terms[term]
+        return zip(self._ids[start:start + count], self._tfs[start:start + count])
+
+    def _chunk(self, chunk_id):
+        chunk = self._chunk_cache.get(chunk_id)
+        if chunk is None:
+            meta = self._meta_chunks[chunk_id]
+            start = self._text_offset + meta['offset']
+            chunk = {k: v for k, v in meta.items() if k not in ('offset', 'length')}
+            chunk['text'] = self._mmap[start:start + meta['length']].decode("utf-8")
+            self._chunk_cache[chunk_id] = chunk
+        return chunk
+
+
+def load_pack(path=DEFAULT_PATH, version=None):
+    """
+    Memory-map a pack if it exists and matches the current knowledge base
+
+    Returns:
+        PackedKnowledgeIndex or None (missing or stale pack)
+    """
+    if not Path(path).exists():
+        return None
+    try:
+        index = PackedKnowledgeIndex(path)
+    except (ValueError, struct.error) as e:
+        print(f"Warning: Ignoring knowledge pack: {e}")
+        return None
+    if index.version != (version or knowledge_version()):
+        return None
+    return index
+
+
+if __name__ == "__main__":
+    target = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_PATH
+    print(f"Built {target} (knowledge version {build_pack(target)[:12]})")
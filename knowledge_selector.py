@@ -0,0 +1,173 @@
+"""
+Knowledge Selector - Prompt knowledge chosen from concrete user_data signals
+Maps each signal (sleep, soreness, energy, recovery score, lift maxes, goal) to
+the one knowledge_base rule that applies, e.g. soreness 7/10 to the '7-8/10'
+line or a 185lb bench to the intermediate bench progression. Contexts are
+memoised per signal bucket and knowledge version, so users in the same buckets
+share one string and an edited knowledge base is picked up without a restart.
+"""
+import re
+import math
+import functools
+
+from knowledge_store import get_knowledge_store
+from scoring import PR_READY_RECOVERY, recovery_from_user_data
+from strength_engine import PROGRESSION, normalize_lift, progression_tier
+
+
+_NUMBER = re.compile(r"\d+(?:\.\d+)?")
+
+
+@functools.lru_cache(maxsize=4)
+def _sections(snapshot):
+    """(source, heading) -> bullet lines, for every heading in a knowledge snapshot"""
+    sections = {}
+    for source, _, text in snapshot.sources:
+        heading = None
+        for line in text.strip().splitlines():
+            line = line.strip()
+            if line.endswith(':') and not line.startswith('-'):
+                heading = line.rstrip(':')
+                sections.setdefault((source, heading), [])
+            elif line.startswith('-') and heading:
+                sections[source, heading].append(line)
+    return sections
+
+
+def _bullets(snapshot, source, heading):
+    return _sections(snapshot).get((source, heading), [])
+
+
+def _band(line):
+    """'- 7-8/10 = High, ...' -> (7, 8); '<6 hours' -> (-inf, 6); '8+ hours' -> (8, inf)"""
+    label = line.lstrip('- ').split('=')[0].strip()
+    numbers = [float(n) for n in _NUMBER.findall(label)]
+    if label.startswith('<'):
+        return -math.inf, numbers[0]
+    if label.split()[0].endswith('+'):
+        return numbers[0], math.inf
+    return numbers[0], numbers[1] if len(numbers) > 1 else numbers[0]
+
+
+def _pick_band(lines, value):
+    """Index of the band containing value (or the nearest one)"""
+    def distance(line):
+        low, high = _band(line)
+        return 0 if low <= value <= high else min(abs(value - low), abs(value - high))
+    return min(range(len(lines)), key=lambda i: distance(lines[i])) if lines else None
+
+
+def _pick_prefix(lines, prefix):
+    prefix = prefix.lower()
+    return next((i for i, line in enumerate(lines) if line.lstrip('- ').lower().startswith(prefix)), None)
+
+
+def _number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def signal_buckets(user_data, snapshot=None):
+    """
+    Which knowledge line each user_data signal selects
+
+    Args:
+        user_data: User metrics dict
+        snapshot: Knowledge snapshot (defaults to the current one)
+
+    Returns:
+        tuple: Hashable (source, heading, line index) triples, in prompt order
+    """
+    snapshot = snapshot or get_knowledge_store().current()
+    buckets = []
+
+    def bullets(source, heading):
+        return _bullets(snapshot, source, heading)
+
+    def add(source, heading, index):
+        if index is not None:
+            buckets.append((source, heading, index))
+
+    sleep = _number(user_data.get('sleep_hours'))
+    soreness = _number(user_data.get('soreness'))
+    energy = str(user_data.get('energy') or '').lower().replace('medium', 'moderate')
+
+    if sleep is not None:
+        add('RECOVERY_NUTRITION', 'Sleep Quality', _pick_band(bullets('RECOVERY_NUTRITION', 'Sleep Quality'), sleep))
+    if soreness is not None:
+        add('RECOVERY_NUTRITION', 'Soreness (DOMS)',
+            _pick_band(bullets('RECOVERY_NUTRITION', 'Soreness (DOMS)'), soreness))
+    if energy:
+        add('RECOVERY_NUTRITION', 'Energy Levels', _pick_prefix(bullets('RECOVERY_NUTRITION', 'Energy Levels'), energy))
+
+    if sleep is not None or soreness is not None:
+        # Same three cases as the READINESS TO INCREASE WEIGHT lines
+        sleep_value = sleep if sleep is not None else 7
+        soreness_value = soreness if soreness is not None else 5
+        if sleep_value < 6 or soreness_value > 7:
+            readiness = 2
+        elif sleep_value > 7.5 and soreness_value < 4:
+            readiness = 0
+        else:
+            readiness = 1
+        add('PROGRESSIVE_OVERLOAD', 'READINESS TO INCREASE WEIGHT', readiness)
+
+        recovery = recovery_from_user_data(user_data)
+        add('RECOVERY_NUTRITION', 'RECOVERY SCORE CALCULATION',
+            _pick_band(bullets('RECOVERY_NUTRITION', 'RECOVERY SCORE CALCULATION'), recovery))
+        if recovery >= PR_READY_RECOVERY:
+            for index in range(len(bullets('PROGRESSIVE_OVERLOAD', 'PR ATTEMPT GUIDELINES'))):
+                add('PROGRESSIVE_OVERLOAD', 'PR ATTEMPT GUIDELINES', index)
+
+    for lift, weight in sorted((user_data.get('max_lifts') or {}).items()):
+        lift = normalize_lift(lift)
+        weight = _number(weight)
+        if lift in PROGRESSION and weight:
+            tier = progression_tier(lift, weight)['tier']
+            source = f"EXERCISES.{lift}"
+            add(source, 'PROGRESSION', _pick_prefix(bullets(source, 'PROGRESSION'), tier))
+
+    goal = str(user_data.get('goal') or '').lower()
+    if goal or user_data.get('protein_grams'):
+        cut = any(word in goal for word in ('fat', 'lose', 'lean', 'cut'))
+        protein = bullets('RECOVERY_NUTRITION', 'Protein')
+        add('RECOVERY_NUTRITION', 'Protein', _pick_prefix(protein, 'fat loss' if cut else 'muscle gain'))
+        add('RECOVERY_NUTRITION', 'Protein', _pick_prefix(protein, 'timing'))
+
+    return tuple(buckets)
+
+
+def _section_title(source, heading):
+    if source.startswith('EXERCISES.'):
+        return f"{source.split('.', 1)[1].replace('_', ' ').upper()} {heading}"
+    return heading
+
+
+@functools.lru_cache(maxsize=1024)
+def render_buckets(buckets, snapshot):
+    """Pre-rendered context for a bucket tuple in one knowledge snapshot (memoised)"""
+    blocks = {}
+    for source, heading, index in buckets:
+        blocks.setdefault((source, heading), []).append(_bullets(snapshot, source, heading)[index])
+    return "\n\n".join(
+        f"{_section_title(source, heading)}:\n" + "\n".join(lines)
+        for (source, heading), lines in blocks.items()
+    )
+
+
+def select_knowledge(user_data, snapshot=None):
+    """
+    Only the knowledge rules that match this user's signals, as prompt text
+
+    Args:
+        user_data: User metrics dict
+        snapshot: Knowledge snapshot to read (defaults to the current one);
+            pass the one whose version goes into the LLM cache key
+
+    Returns:
+        str: Prompt context ('' when no signal applies)
+    """
+    snapshot = snapshot or get_knowledge_store().current()
+    return render_buckets(signal_buckets(user_data or {}, snapshot), snapshot)
@@ -0,0 +1,207 @@
+"""
+Knowledge Store - Hot-reloadable, versioned knowledge base
+Watches knowledge_base.py and exercise_registry.py. When either changes on
+disk, running processes re-import them, build the retrieval index off to the
+side and swap in a new immutable snapshot with one assignment, so an edited
+coaching rule goes live without restarting any worker. Each snapshot carries
+its knowledge version (sha256 of its contents); LLM cache keys include it, so
+an edit only invalidates the answers that were built from knowledge.
+"""
+import os
+import sys
+import time
+import importlib
+import threading
+
+from knowledge_index import KnowledgeIndex, build_chunks, knowledge_sources
+from knowledge_pack import DEFAULT_PATH, knowledge_version, load_pack
+
+
+# Reloaded in this order (knowledge_base renders its exercise prose from the registry)
+WATCHED_MODULES = ("exercise_registry", "knowledge_base")
+
+DEFAULT_INTERVAL = float(os.getenv("KNOWLEDGE_RELOAD_INTERVAL", "2.0"))
+
+
+def refresh_derived():
+    """Rebuild module-level tables computed from the knowledge modules at import time"""
+    import strength_engine
+
+    strength_engine.refresh_progression()
+
+
+class KnowledgeSnapshot:
+    """One consistent version of the knowledge base: blocks, retrieval index and version"""
+
+    __slots__ = ('version', 'sources', 'aliases', 'index', 'loaded_at')
+
+    def __init__(self, version, sources, aliases, index):
+        self.version = version
+        self.sources = tuple(sources)
+        self.aliases = aliases
+        self.index = index
+        self.loaded_at = time.time()
+
+
+def build_snapshot(pack_path=None):
+    """Snapshot of the knowledge modules as currently imported (pack-backed when it matches)"""
+    import exercise_registry
+
+    sources = knowledge_sources()
+    aliases = exercise_registry.aliases()
+    version = knowledge_version(sources, aliases)
+    index = load_pack(pack_path or DEFAULT_PATH, version) or KnowledgeIndex(build_chunks(sources), aliases)
+    return KnowledgeSnapshot(version, sources, aliases, index)
+
+
+class KnowledgeStore:
+    """Current knowledge snapshot plus a background watcher that reloads on edit"""
+
+    def __init__(self, modules=WATCHED_MODULES, interval=DEFAULT_INTERVAL, pack_path=None):
+        """
+        Args:
+            modules: Module names to watch and reload, in dependency order
+            interval: Seconds between file checks (0 disables the watcher)
+            pack_path: Knowledge pack to try before indexing in memory
+        """
+        self.modules = tuple(modules)
+        self.interval = interval
+        self.pack_path = pack_path
+        self.reloads = 0
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+        for name in self.modules:
+            importlib.import_module(name)
+        self._stamps = self._file_stamps()
+        self._snapshot = build_snapshot(pack_path)
+
+    def current(self):
+        """Current snapshot (lock-free; hold on to it for one request to stay consistent)"""
+        return self._snapshot
+
+    @property
+    def version(self):
+        return self._snapshot.version
+
+    def _file_stamps(self):
+        stamps = {}
+        for name in self.modules:
+            path = getattr(sys.modules.get(name), '__file__', None)
+            try:
+                stat = os.stat(path)
+                stamps[name] = (path, stat.st_mtime_ns, stat.st_size)
+            except (TypeError, OSError):
+                stamps[name] = (path, None, None)
+        return stamps
+
+    def check(self):
+        """
+        Reload if any watched file changed since the last check
+
+        Returns:
+            bool: True when a new snapshot was swapped in
+        """
+        stamps = self._file_stamps()
+        if stamps == self._stamps:
+            return False
+        return self.reload(stamps)
+
+    def reload(self, stamps=None):
+        """
+        Re-import the watched modules and swap in a new snapshot
+
+        A file that does not compile (e.g. saved mid-edit) leaves the current
+        snapshot in place; it is retried when the file changes again.
+
+        Returns:
+            bool: True when a new snapshot was swapped in
+        """
+        with self._lock:
+            stamps = stamps or self._file_stamps()
+            try:
+                for name in self.modules:
+                    path = stamps[name][0]
+                    with open(path, "rb") as f:
+                        compile(f.read(), path, "exec")
+                for name in self.modules:
+                    importlib.reload(sys.modules[name])
+                refresh_derived()
+                snapshot = build_snapshot(self.pack_path)
+            except Exception as e:
+                print(f"Warning: Keeping knowledge version {self._snapshot.version[:12]}: {e}")
+                self._stamps = stamps
+                return False
+            self._stamps = stamps
+            changed = snapshot.version != self._snapshot.version
+            if changed:
+                self._snapshot = snapshot
+                self.reloads += 1
+            return changed
+
+    def _loop(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                print(f"Warning: Knowledge watcher error: {e}")
+
+    def start(self):
+        """Watch the knowledge files from a background daemon thread"""
+        if self.interval > 0 and (self._thread is None or not self._thread.is_alive()):
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._loop, name="knowledge-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+
+
+_default_store = None
+_default_lock = threading.Lock()
+
+
+def get_knowledge_store():
+    """Process-wide knowledge store, watching for edits from first use"""
+    global _default_store
+    if _default_store is None:
+        with _default_lock:
+            if _default_store is None:
+                _default_store = KnowledgeStore().start()
+    return _default_store
+
+
+if __name__ == "__main__":
+    # Self-check: an edited progression band reaches the snapshot and the tier lookups, and reverting restores both.
+    # Edits a temporary copy of the registry (found first on sys.path), never the source file.
+    import shutil
+    import tempfile
+    import strength_engine
+
+    workdir = tempfile.mkdtemp(prefix="knowledge-reload-")
+    for name in WATCHED_MODULES:
+        shutil.copy(sys.modules[name].__file__, workdir)
+    sys.path.insert(0, workdir)
+    store = KnowledgeStore(interval=0)
+    store.reload()
+    registry = os.path.join(workdir, "exercise_registry.py")
+    with open(registry, encoding="utf-8") as f:
+        original = f.read()
+    edited = original.replace('135, 225, 2.5, 1.5, "135-225lbs"', '135, 250, 2.5, 1.5, "135-250lbs"', 1)
+    edited = edited.replace("ProgressionTier('advanced', 225, math.inf, 2.5, 7.5, \"225+\"",
+                            "ProgressionTier('advanced', 250, math.inf, 2.5, 7.5, \"250+\"", 1)
+    assert edited != original, "bench press bands not found"
+
+    try:
+        for text, tier, band in ((edited, 'intermediate', "135-250lbs"), (original, 'advanced', "225+")):
+            with open(registry, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.utime(registry, ns=(time.time_ns(), time.time_ns()))
+            assert store.check(), "edit not picked up"
+            assert strength_engine.progression_tier('bench', 240)['tier'] == tier
+            assert band in dict((s, t) for s, _, t in store.current().sources)["EXERCISES.bench_press"]
+            print(f"OK: 240 lb bench is {tier} ({band}) at version {store.version[:12]}")
+    finally:
+        sys.path.remove(workdir)
+        shutil.rmtree(workdir)
@@ -0,0 +1,85 @@
+"""
+LLM Cache - Response cache for the insight and planner agents
+Keys are the sha256 of the request (model, messages, sampling parameters) and
+the knowledge version the prompt was built from. Prompts that carried
+knowledge stop hitting as soon as the knowledge base is edited, while every
+other entry keeps serving; stale entries simply age out of the LRU.
+"""
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+DEFAULT_MAX_ENTRIES = int(os.getenv("LLM_CACHE_ENTRIES", "512"))
+DEFAULT_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL", str(6 * 3600)))
+
+
+class LLMCache:
+    """Thread-safe LRU of model responses with a time-to-live"""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, ttl_seconds=DEFAULT_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()  # key -> (stored_at, response)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(body, knowledge_version=None):
+        """
+        Cache key for a chat request
+
+        Args:
+            body: Request body dict (model, messages, sampling parameters)
+            knowledge_version: Version of the knowledge the prompt includes
+                (None when it includes none)
+
+        Returns:
+            str: Hex digest
+        """
+        payload = json.dumps({'body': body, 'knowledge': knowledge_version or ''},
+                             sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """Cached response or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.time() - entry[0] > self.ttl_seconds:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, response):
+        with self._lock:
+            self._entries[key] = (time.time(), response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+_default_cache = None
+
+
+def get_llm_cache():
+    """Process-wide response cache"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = LLMCache()
+    return _default_cache
@@ -0,0 +1,226 @@
+"""
+Milestones - Sorted threshold index for strength milestones on every lift
+Plate milestones (absolute weight), bodyweight multiples and strength-standard
+tiers are precomputed into one sorted array per lift and kind, so the
+milestones crossed between two states are found with two bisects per lift,
+for a single user or with np.searchsorted across a whole batch.
+"""
+from bisect import bisect_right
+
+import numpy as np
+import pandas as pd
+
+
+LIFTS = ['bench_press', 'squat', 'deadlift', 'overhead_press']
+
+# 1-5 plates (45lb) a side on a 45lb bar
+PLATE_MILESTONES = {plates: 45 + 90 * plates for plates in range(1, 6)}
+
+BODYWEIGHT_MULTIPLES = {
+    'bench_press': [1.0, 1.25, 1.5, 2.0],
+    'squat': [1.0, 1.5, 2.0, 2.5],
+    'deadlift': [1.0, 1.5, 2.0, 2.5, 3.0],
+    'overhead_press': [0.5, 0.75, 1.0, 1.25],
+}
+
+# 1RM / bodyweight needed for each tier (common strength-standard tables)
+STRENGTH_STANDARDS = {
+    'bench_press': {'novice': 0.75, 'intermediate': 1.0, 'advanced': 1.5, 'elite': 2.0},
+    'squat': {'novice': 1.0, 'intermediate': 1.5, 'advanced': 2.0, 'elite': 2.75},
+    'deadlift': {'novice': 1.25, 'intermediate': 1.75, 'advanced': 2.5, 'elite': 3.0},
+    'overhead_press': {'novice': 0.5, 'intermediate': 0.65, 'advanced': 0.9, 'elite': 1.2},
+}
+
+
+def _lift_name(lift):
+    return lift.replace('_', ' ').title()
+
+
+# Thresholds per kind: plates are in lbs, the others are 1RM/bodyweight ratios
+KINDS = ('plates', 'bodyweight', 'standard')
+RELATIVE_KINDS = ('bodyweight', 'standard')
+RATIO_DIGITS = 9
+
+
+class MilestoneIndex:
+    """
+    Sorted thresholds (and their milestone records) per (lift, kind)
+
+    A milestone is reached when the lift is >= its threshold. When the
+    previous state is unknown only the highest milestone reached of each kind
+    is reported, so a first check celebrates where the user is rather than
+    every milestone they ever passed.
+    """
+
+    def __init__(self, lifts=LIFTS):
+        self._thresholds = {}
+        self._records = {}
+        for lift in lifts:
+            name = _lift_name(lift)
+            tables = {
+                'plates': [
+                    (weight, f"plates_{plates}", f"🎉 MILESTONE UNLOCKED: {weight}lb {name}!",
+                     f"You hit {plates} plate{'s' if plates > 1 else ''}! That's serious strength. Keep pushing!")
+                    for plates, weight in PLATE_MILESTONES.items()
+                ],
+                'bodyweight': [
+                    (multiple, f"bodyweight_{multiple:g}x", f"🎉 MILESTONE UNLOCKED: {multiple:g}× Bodyweight {name}!",
+                     f"Your {name.lower()} is now {multiple:g}× your bodyweight!")
+                    for multiple in BODYWEIGHT_MULTIPLES.get(lift, [])
+                ],
+                'standard': [
+                    (ratio, f"standard_{tier}", f"🏅 {tier.title()} {name}!",
+                     f"You've reached the {tier} strength standard for {name.lower()}.")
+                    for tier, ratio in STRENGTH_STANDARDS.get(lift, {}).items()
+                ],
+            }
+            for kind, entries in tables.items():
+                entries.sort(key=lambda entry: entry[0])
+                self._thresholds[lift, kind] = np.array([entry[0] for entry in entries], dtype=float)
+                self._records[lift, kind] = [
+                    {'lift': lift, 'kind': kind, 'key': key, 'threshold': threshold,
+                     'title': title, 'message': message, 'rule': f"milestone_{lift}_{key}"}
+                    for threshold, key, title, message in entries
+                ]
+
+    def _span(self, lift, kind, old, new):
+        """Indices [lo, hi) of thresholds in (old, new]; old=None -> only the highest reached"""
+        thresholds = self._thresholds[lift, kind]
+        hi = bisect_right(thresholds, new)
+        lo = max(hi - 1, 0) if old is None else min(bisect_right(thresholds, old), hi)
+        return lo, hi
+
+    def crossed(self, lift, old, new, body_weight=None, old_body_weight=None):
+        """
+        Milestones for one lift reached at `new` but not at `old`
+
+        Args:
+            lift: Lift key, e.g. 'bench_press'
+            old: Previous max (None if unknown)
+            new: Current max
+            body_weight: Current bodyweight in lbs (bodyweight/standard milestones skipped if None)
+            old_body_weight: Bodyweight at the previous state (defaults to body_weight)
+
+        Returns:
+            list: Milestone dicts (lift, kind, key, threshold, title, message, rule)
+        """
+        if lift not in LIFTS or not new:
+            return []
+        lo, hi = self._span(lift, 'plates', old, new)
+        crossed = self._records[lift, 'plates'][lo:hi]
+        if body_weight:
+            # Rounded so a weight stored as threshold * bodyweight divides back to the threshold
+            old_ratio = None if old is None else round(old / (old_body_weight or body_weight), RATIO_DIGITS)
+            for kind in RELATIVE_KINDS:
+                lo, hi = self._span(lift, kind, old_ratio, round(new / body_weight, RATIO_DIGITS))
+                crossed = crossed + self._records[lift, kind][lo:hi]
+        return crossed
+
+    def crossed_between(self, old_lifts, new_lifts, body_weight=None, old_body_weight=None):
+        """Milestones crossed on every lift between two max_lifts dicts (old_lifts may be empty)"""
+        milestones = []
+        for lift, new in new_lifts.items():
+            old = old_lifts.get(lift, 0) if old_lifts else None
+            milestones.extend(self.crossed(lift, old, new, body_weight, old_body_weight))
+        return milestones
+
+    @staticmethod
+    def weight(milestone, body_weight=None):
+        """Lift weight (lbs) at which a milestone is reached"""
+        if milestone['kind'] == 'plates':
+            return milestone['threshold']
+        return milestone['threshold'] * body_weight if body_weight else float('inf')
+
+    def settled_lifts(self, old_lifts, new_lifts, pending, body_weight=None):
+        """
+        Max lifts to remember as celebrated when some milestones went undelivered
+
+        Each lift advances to its new max, except that a lift with pending
+        milestones stops at the highest delivered threshold below the lowest
+        pending one (or stays at its old max), so the pending milestones are
+        crossed again on the next check.
+
+        Args:
+            old_lifts: Max lifts at the previous check
+            new_lifts: Current max lifts
+            pending: Milestones from crossed_between() that were not delivered
+            body_weight: Current bodyweight in lbs
+
+        Returns:
+            dict: max_lifts to pass as previous_max_lifts next time
+        """
+        old_lifts = old_lifts or {}
+        settled = dict(old_lifts)
+        for lift, new in new_lifts.items():
+            blocked = [self.weight(m, body_weight) for m in pending if m['lift'] == lift]
+            if not blocked:
+                settled[lift] = new
+                continue
+            old = old_lifts.get(lift, 0)
+            delivered = [self.weight(m, body_weight) for m in self.crossed(lift, old, new, body_weight)]
+            settled[lift] = max([old] + [w for w in delivered if w < min(blocked)])
+        return settled
+
+    def crossed_batch(self, old, new, body_weight=None, old_body_weight=None, user_ids=None):
+        """
+        Vectorised crossed() for many users
+
+        Args:
+            old: DataFrame of previous maxes (one column per lift); a NaN means
+                 the previous state is unknown (only the highest reached is reported)
+            new: DataFrame of current maxes, aligned to old
+            body_weight, old_body_weight: Optional Series of bodyweights (lbs)
+            user_ids: Optional Series of user ids (defaults to new.index)
+
+        Returns:
+            pd.DataFrame: One row per (user, milestone) newly crossed
+        """
+        user_ids = np.asarray(new.index if user_ids is None else user_ids)
+        frames = []
+        for lift in LIFTS:
+            if lift not in new:
+                continue
+            new_values = new[lift].fillna(0).to_numpy(dtype=float)
+            old_values = old[lift].to_numpy(dtype=float) if lift in old else np.full_like(new_values, np.nan)
+            spans = [('plates', old_values, new_values)]
+            if body_weight is not None:
+                bw = np.asarray(body_weight, dtype=float)
+                old_bw = bw if old_body_weight is None else np.asarray(old_body_weight, dtype=float)
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    new_ratio = np.round(np.nan_to_num(new_values / bw), RATIO_DIGITS)
+                    old_ratio = np.round(old_values / old_bw, RATIO_DIGITS)
+                spans += [(kind, old_ratio, new_ratio) for kind in RELATIVE_KINDS]
+
+            for kind, before, after in spans:
+                thresholds = self._thresholds[lift, kind]
+                hi = np.searchsorted(thresholds, after, side='right')
+                unknown = np.isnan(before)
+                lo = np.where(unknown, np.maximum(hi - 1, 0),
+                              np.searchsorted(thresholds, np.nan_to_num(before), side='right'))
+                lo = np.minimum(lo, hi)
+                counts = hi - lo
+                if not counts.any():
+                    continue
+                rows = np.repeat(np.arange(len(counts)), counts)
+                # Position of each emitted row inside its user's [lo, hi) range
+                offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+                records = pd.DataFrame(self._records[lift, kind])
+                crossed = records.iloc[lo[rows] + offsets].reset_index(drop=True)
+                crossed.insert(0, 'user_id', user_ids[rows])
+                frames.append(crossed)
+
+        columns = ['user_id', 'lift', 'kind', 'key', 'threshold', 'title', 'message', 'rule']
+        if not frames:
+            return pd.DataFrame(columns=columns)
+        return pd.concat(frames, ignore_index=True)[columns]
+
+
+_default_index = None
+
+
+def get_milestone_index():
+    """Shared index (thresholds never change at runtime)"""
+    global _default_index
+    if _default_index is None:
+        _default_index = MilestoneIndex()
+    return _default_index
@@ -0,0 +1,277 @@
+"""
+Notification Delivery - Asynchronous delivery pipeline with pluggable transports
+send_notification() and the batch emit() only enqueue; worker threads drain the
+queue in batches and hand each batch to every transport (notification log,
+inbox store, stdout, JSONL file, webhook), retrying with exponential backoff and moving batches that
+keep failing to a dead-letter file.
+"""
+import os
+import json
+import time
+import queue
+import atexit
+import random
+import threading
+from pathlib import Path
+
+import requests
+
+from notification_log import get_notification_log
+from notification_store import get_notification_store
+
+
+# Longest close() waits at exit; batches still failing then are dead-lettered, not retried
+CLOSE_TIMEOUT = 5.0
+
+
+class StdoutTransport:
+    """Print notifications to the console (the original mock push display)"""
+
+    name = "stdout"
+
+    def send(self, batch):
+        for notification in batch:
+            action = notification.get('action', 'none')
+            print(f"\n📲 PUSH NOTIFICATION [{notification.get('priority', 'medium').upper()}]")
+            print(f"   {notification['title']}")
+            print(f"   {notification['message']}")
+            if action != "none":
+                print(f"   👆 Tap to: {action.replace('_', ' ').title()}")
+            print()
+
+
+class LogTransport:
+    """Append notifications to the segment log (one group commit per batch)"""
+
+    name = "log"
+
+    def __init__(self, log=None):
+        self.log = log
+
+    def send(self, batch):
+        (self.log or get_notification_log()).extend(batch)
+
+
+class StoreTransport:
+    """Index notifications in the SQLite inbox store (one transaction per batch)"""
+
+    name = "store"
+
+    def __init__(self, store=None):
+        self.store = store
+
+    def send(self, batch):
+        (self.store or get_notification_store()).add_many(batch)
+
+
+class FileTransport:
+    """Append notifications to a JSONL outbox file"""
+
+    name = "file"
+
+    def __init__(self, path="data/notification_outbox.jsonl"):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def send(self, batch):
+        with open(self.path, "a", encoding="utf-8") as f:
+            for notification in batch:
+                f.write(json.dumps(notification, ensure_ascii=False) + "\n")
+
+
+class WebhookTransport:
+    """POST each batch as a JSON array to a webhook URL"""
+
+    name = "webhook"
+
+    def __init__(self, url, timeout=5.0):
+        self.url = url
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def send(self, batch):
+        response = self.session.post(self.url, json=batch, timeout=self.timeout)
+        response.raise_for_status()
+
+
+class LocalWebhookTransport:
+    """
+    In-process stand-in for a webhook endpoint
+
+    Keeps delivered batches in memory and can simulate network latency and a
+    failure rate, so retries and dead-lettering can be exercised without a server.
+    """
+
+    name = "webhook"
+
+    def __init__(self, latency=0.05, failure_rate=0.0, keep=1000):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.keep = keep
+        self.received = []
+
+    def send(self, batch):
+        time.sleep(self.latency)
+        if random.random() < self.failure_rate:
+            raise ConnectionError("Simulated webhook failure")
+        self.received.extend(batch)
+        del self.received[:-self.keep]
+
+
+class DeliveryPipeline:
+    """
+    In-process queue drained by worker threads that batch notifications
+
+    Each transport gets every batch independently: a failing webhook is retried
+    (backoff, backoff*2, ...) without re-sending to transports that succeeded,
+    and after max_retries the batch is written to the dead-letter file.
+    """
+
+    def __init__(self, transports, workers=2, batch_size=50, batch_wait=0.2,
+                 max_retries=4, backoff=0.5, dead_letter_path="data/notification_dead_letter.jsonl"):
+        self.transports = list(transports)
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.dead_letter_path = Path(dead_letter_path)
+
+        self._queue = queue.Queue()
+        self._closing = threading.Event()
+        self._stats = {t.name: {'batches': 0, 'sent': 0, 'failures': 0, 'dead_lettered': 0,
+                                'total_latency': 0.0, 'max_latency': 0.0}
+                       for t in self.transports}
+        self._stats_lock = threading.Lock()
+        self._dead_letter_lock = threading.Lock()
+        self._workers = [
+            threading.Thread(target=self._worker, name=f"notification-delivery-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+        atexit.register(self.close)
+
+    def submit(self, notification):
+        """Queue a notification for delivery (never blocks on I/O)"""
+        self._queue.put(notification)
+
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.batch_wait
+        while batch[-1] is not None and len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _worker(self):
+        while True:
+            batch = self._next_batch()
+            stop = batch[-1] is None
+            notifications = [n for n in batch if n is not None]
+            if notifications:
+                for transport in self.transports:
+                    self._deliver(transport, notifications)
+            for _ in batch:
+                self._queue.task_done()
+            if stop:
+                return
+
+    def _deliver(self, transport, batch):
+        for attempt in range(self.max_retries + 1):
+            started = time.perf_counter()
+            try:
+                transport.send(batch)
+            except Exception as e:
+                self._record(transport.name, failures=1)
+                # Backoff is cut short (and the batch dead-lettered) once the pipeline closes
+                if attempt == self.max_retries or self._closing.wait(self.backoff * 2 ** attempt):
+                    self._dead_letter(transport.name, batch, e)
+                    return
+            else:
+                self._record(transport.name, batches=1, sent=len(batch),
+                             latency=time.perf_counter() - started)
+                return
+
+    def _record(self, name, batches=0, sent=0, failures=0, dead_lettered=0, latency=None):
+        with self._stats_lock:
+            stats = self._stats[name]
+            stats['batches'] += batches
+            stats['sent'] += sent
+            stats['failures'] += failures
+            stats['dead_lettered'] += dead_lettered
+            if latency is not None:
+                stats['total_latency'] += latency
+                stats['max_latency'] = max(stats['max_latency'], latency)
+
+    def _dead_letter(self, name, batch, error):
+        self._record(name, dead_lettered=len(batch))
+        self.dead_letter_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._dead_letter_lock, open(self.dead_letter_path, "a", encoding="utf-8") as f:
+            for notification in batch:
+                f.write(json.dumps({'transport': name, 'error': str(error),
+                                    'notification': notification}, ensure_ascii=False) + "\n")
+
+    def stats(self):
+        """Per-transport delivery counts and latency (seconds per batch)"""
+        with self._stats_lock:
+            return {
+                name: {**s, 'avg_latency': s['total_latency'] / s['batches'] if s['batches'] else 0.0}
+                for name, s in self._stats.items()
+            }
+
+    def pending(self):
+        return self._queue.unfinished_tasks
+
+    def drain(self):
+        """Block until everything queued so far has been delivered or dead-lettered"""
+        self._queue.join()
+
+    def close(self, timeout=CLOSE_TIMEOUT):
+        """
+        Deliver what is queued, then stop the workers
+
+        Failing batches are dead-lettered instead of retried, and the wait is
+        bounded by timeout seconds (daemon workers still running are abandoned).
+        """
+        if not any(worker.is_alive() for worker in self._workers):
+            return
+        self._closing.set()
+        for _ in self._workers:
+            self._queue.put(None)
+        deadline = time.monotonic() + timeout
+        for worker in self._workers:
+            worker.join(max(0.0, deadline - time.monotonic()))
+        atexit.unregister(self.close)
+
+
+def default_transports():
+    """
+    Transports from the environment:
+        log, inbox store and stdout always; NOTIFICATION_OUTBOX=path adds the JSONL file transport;
+        NOTIFICATION_WEBHOOK_URL=url adds a real webhook, 'local' the stand-in
+    """
+    transports = [LogTransport(), StoreTransport(), StdoutTransport()]
+    if os.getenv("NOTIFICATION_OUTBOX"):
+        transports.append(FileTransport(os.getenv("NOTIFICATION_OUTBOX")))
+    webhook_url = os.getenv("NOTIFICATION_WEBHOOK_URL")
+    if webhook_url == "local":
+        transports.append(LocalWebhookTransport())
+    elif webhook_url:
+        transports.append(WebhookTransport(webhook_url))
+    return transports
+
+
+_default_pipeline = None
+
+
+def get_delivery_pipeline():
+    """Process-wide delivery pipeline shared by every NotificationManager"""
+    global _default_pipeline
+    if _default_pipeline is None:
+        _default_pipeline = DeliveryPipeline(default_transports())
+    return _default_pipeline
@@ -0,0 +1,236 @@
+"""
+Notification Log - Append-only JSONL segment log with group commit
+Notifications are buffered and written in batches to the active segment under
+an advisory file lock, so logging cost stays constant however large the
+history grows. Full segments are sealed and can be compacted later.
+"""
+import os
+import json
+import time
+import atexit
+import threading
+from pathlib import Path
+
+try:
+    import fcntl  # POSIX advisory locks
+except ImportError:
+    fcntl = None
+
+
+FSYNC_POLICIES = ('always', 'batch', 'never')
+
+ACTIVE_SEGMENT = "active.jsonl"
+SEGMENT_PATTERN = "segment-{:08d}.jsonl"
+LEGACY_MARKER = ".legacy-imported"
+
+
+class NotificationLog:
+    """
+    Append-only notification log stored as JSONL segments in a directory
+
+    fsync policy:
+        'always' - write and fsync every entry before append() returns
+        'batch'  - group commit: write + fsync once per batch_size entries or
+                   flush_interval seconds after the oldest buffered entry
+                   (and on flush()/close())
+        'never'  - group commit without fsync (OS decides when data hits disk)
+    """
+
+    def __init__(self, directory="data/notifications", fsync=None, batch_size=32,
+                 flush_interval=1.0, segment_bytes=1_000_000):
+        fsync = fsync or os.getenv("NOTIFICATION_FSYNC", "batch")
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"fsync policy must be one of {FSYNC_POLICIES}, got {fsync!r}")
+
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.fsync = fsync
+        self.batch_size = 1 if fsync == 'always' else batch_size
+        self.flush_interval = flush_interval
+        self.segment_bytes = segment_bytes
+
+        self._buffer = []
+        self._first_buffered = None  # monotonic time the oldest buffered entry arrived
+        self._timer = None
+        self._mutex = threading.Lock()
+        self._write_order = threading.Lock()  # batches reach the file in the order they were taken
+        atexit.register(self.flush)
+
+    @property
+    def active_path(self):
+        return self.directory / ACTIVE_SEGMENT
+
+    def _lock(self, handle):
+        if fcntl:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+
+    def _unlock(self, handle):
+        if fcntl:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+    def append(self, entry):
+        """Buffer one entry; commits the batch when it is full or stale"""
+        line = json.dumps(entry, ensure_ascii=False, separators=(',', ':'))
+        with self._mutex:
+            now = time.monotonic()
+            if not self._buffer:
+                self._first_buffered = now
+            self._buffer.append(line)
+            due = (len(self._buffer) >= self.batch_size
+                   or now - self._first_buffered >= self.flush_interval)
+            if not due and self._timer is None:
+                # A quiet log still commits within flush_interval of the first buffered entry
+                self._timer = threading.Timer(self.flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if due:
+            self.flush()
+
+    def extend(self, entries):
+        """Commit many entries as a single batch (bulk producers)"""
+        lines = [json.dumps(entry, ensure_ascii=False, separators=(',', ':')) for entry in entries]
+        with self._mutex:
+            self._buffer.extend(lines)
+        self.flush()
+
+    def flush(self):
+        """Group-commit every buffered entry in a single locked write"""
+        # Appends only wait for the buffer swap; concurrent flushers queue here, so the
+        # batch taken first is written first
+        with self._write_order:
+            with self._mutex:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                if not self._buffer:
+                    return
+                payload = ("\n".join(self._buffer) + "\n").encode("utf-8")
+                self._buffer = []
+                self._first_buffered = None
+
+            with open(self.directory / ".lock", "a") as lock:
+                self._lock(lock)
+                try:
+                    with open(self.active_path, "ab") as f:
+                        f.write(payload)
+                        f.flush()
+                        if self.fsync != 'never':
+                            os.fsync(f.fileno())
+                        size = f.tell()
+                    if size >= self.segment_bytes:
+                        self._rotate()
+                finally:
+                    self._unlock(lock)
+
+    def _sealed_segments(self):
+        return sorted(self.directory.glob("segment-*.jsonl"))
+
+    def _next_segment_path(self):
+        sealed = self._sealed_segments()
+        number = int(sealed[-1].stem.split("-")[1]) + 1 if sealed else 1
+        return self.directory / SEGMENT_PATTERN.format(number)
+
+    def _rotate(self):
+        """Seal the active segment (caller holds the lock)"""
+        if self.active_path.exists() and self.active_path.stat().st_size:
+            os.replace(self.active_path, self._next_segment_path())
+
+    def segments(self):
+        """All segment paths, oldest first (active segment last)"""
+        paths = self._sealed_segments()
+        if self.active_path.exists():
+            paths.append(self.active_path)
+        return paths
+
+    def read(self):
+        """Yield every committed entry, oldest first"""
+        for path in self.segments():
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        yield json.loads(line)
+
+    def compact(self, keep=None):
+        """
+        Merge sealed segments into one, optionally dropping entries
+
+        Args:
+            keep: Optional predicate(entry) -> bool; entries it rejects are dropped
+
+        Returns:
+            int: Number of entries in the compacted segment
+        """
+        with open(self.directory / ".lock", "a") as lock:
+            self._lock(lock)
+            try:
+                sealed = self._sealed_segments()
+                if not sealed:
+                    return 0
+
+                target = sealed[-1].with_suffix(".compact")
+                count = 0
+                with open(target, "w", encoding="utf-8") as out:
+                    for path in sealed:
+                        with open(path, "r", encoding="utf-8") as f:
+                            for line in f:
+                                if not line.strip():
+                                    continue
+                                if keep is None or keep(json.loads(line)):
+                                    out.write(line if line.endswith("\n") else line + "\n")
+                                    count += 1
+                    out.flush()
+                    os.fsync(out.fileno())
+
+                # Newest sealed name keeps ordering; older segments are removed
+                os.replace(target, sealed[-1])
+                for path in sealed[:-1]:
+                    path.unlink()
+                return count
+            finally:
+                self._unlock(lock)
+
+    def import_legacy(self, legacy_path):
+        """
+        One-time migration of the old rewrite-the-whole-file JSON array log
+
+        The legacy file is left in place (it may be tracked in version control);
+        a marker file in the log directory records that it was imported.
+        """
+        legacy_path = Path(legacy_path)
+        marker = self.directory / LEGACY_MARKER
+        with open(self.directory / ".lock", "a") as lock:
+            self._lock(lock)
+            try:
+                # Re-check under the lock so concurrent processes migrate once
+                if marker.exists() or not legacy_path.exists():
+                    return 0
+                with open(legacy_path, "r") as f:
+                    entries = json.load(f)
+                with open(self.active_path, "a", encoding="utf-8") as out:
+                    for entry in entries:
+                        out.write(json.dumps(entry, ensure_ascii=False, separators=(',', ':')) + "\n")
+                    out.flush()
+                    os.fsync(out.fileno())
+                with open(marker, "w", encoding="utf-8") as f:
+                    json.dump({'source': str(legacy_path), 'entries': len(entries),
+                               'imported_at': time.time()}, f)
+                return len(entries)
+            finally:
+                self._unlock(lock)
+
+    def close(self):
+        self.flush()
+        atexit.unregister(self.flush)
+
+
+_default_log = None
+
+
+def get_notification_log():
+    """Process-wide log so every NotificationManager shares one commit buffer"""
+    global _default_log
+    if _default_log is None:
+        _default_log = NotificationLog()
+        _default_log.import_legacy("data/notifications.json")
+    return _default_log
@@ -0,0 +1,221 @@
+"""
+Notification Rule Engine - Declarative rules evaluated over whole user populations
+The same rules NotificationManager applies to one user (workout and meal windows,
+PR and rest alerts, motivation, milestones) are expressed as vectorised
+predicates over a columnar batch of users, so one pass scores every user and
+the resulting notifications are written in bulk.
+"""
+import datetime
+
+import numpy as np
+import pandas as pd
+
+from scoring import PR_READY_RECOVERY, REST_RECOMMENDED_RECOVERY, recovery_frame
+from training_load import PR_READY_LOAD
+from notification_store import DEFAULT_USER
+from notification_system import (
+    MEAL_TIMES, MEAL_WINDOW_MINUTES, MOTIVATION_QUOTES,
+    WORKOUT_TIME, WORKOUT_WINDOW_MINUTES
+)
+from reminder_scheduler import next_occurrence
+from milestones import LIFTS, get_milestone_index
+
+
+def users_frame(users):
+    """
+    Flatten a list of user_data dicts into one column per field
+
+    max_lifts become one column per lift, previous_max_lifts become
+    previous_<lift> columns and training_load readiness becomes load_readiness;
+    missing values are NaN.
+    """
+    frame = pd.DataFrame(users)
+    lifts = pd.DataFrame([u.get('max_lifts') or {} for u in users], columns=LIFTS, index=frame.index)
+    previous = pd.DataFrame([u.get('previous_max_lifts') or {} for u in users], columns=LIFTS, index=frame.index)
+    known = previous.notna().any(axis=1)
+    previous[known] = previous[known].fillna(0)  # a lift missing from a known state was 0
+    frame = pd.concat([frame.drop(columns=['max_lifts', 'previous_max_lifts'], errors='ignore'), lifts,
+                       previous.add_prefix('previous_')], axis=1)
+    frame['load_readiness'] = [(u.get('training_load') or {}).get('readiness') for u in users]
+    if 'user_id' not in frame:
+        frame['user_id'] = DEFAULT_USER
+    frame['user_id'] = frame['user_id'].fillna(DEFAULT_USER)
+    return frame
+
+
+def _minutes_until(hour, minute, now):
+    return int((next_occurrence(datetime.time(hour, minute), now) - now).total_seconds() // 60)
+
+
+def _all(frame, flag):
+    return pd.Series(flag, index=frame.index)
+
+
+def _protein_per_meal(frame):
+    body_weight = frame['body_weight'] if 'body_weight' in frame else _all(frame, 180)
+    return (body_weight.fillna(180) * 0.8 / 4).round().astype(int).astype(str)
+
+
+def _heaviest_lift(frame):
+    lifts = frame[LIFTS].fillna(-1)
+    return lifts.idxmax(axis=1), lifts.max(axis=1)
+
+
+def _pr_ready(frame, ctx):
+    _, weight = _heaviest_lift(frame)
+    load_ok = frame['load_readiness'].isna() | (frame['load_readiness'] >= PR_READY_LOAD)
+    return (ctx['recovery'] >= PR_READY_RECOVERY) & load_ok & (weight > 0)
+
+
+def _pr_message(frame, ctx):
+    lift, weight = _heaviest_lift(frame)
+    lift_name = lift.map(lambda name: name.replace('_', ' ').title())
+    attempt = (weight + 5).map('{:g}'.format)
+    return ("Recovery at " + ctx['recovery'][frame.index].round(1).astype(str) + "%! Try "
+            + attempt + "lbs on " + lift_name + " today!")
+
+
+def _meal_rule(meal_name, hour, minute):
+    return {
+        'name': f"meal_{meal_name.lower().replace(' ', '_').replace('-', '_')}",
+        'priority': 'medium',
+        'action': 'view_meal_plan',
+        'when': lambda frame, ctx: _all(frame, 0 < _minutes_until(hour, minute, ctx['now']) <= MEAL_WINDOW_MINUTES),
+        'title': lambda frame, ctx: f"🍗 {meal_name} Time",
+        'message': lambda frame, ctx: ("Time for nutrition! Aim for " + _protein_per_meal(frame)
+                                       + "g protein this meal."),
+    }
+
+
+# Each rule: when(frame, ctx) -> boolean Series; title/message(frame, ctx) -> str or Series
+RULES = [
+    {
+        'name': 'workout_reminder',
+        'priority': 'high',
+        'action': 'open_workout_plan',
+        'when': lambda frame, ctx: _all(frame, 0 < ctx['workout_minutes'] <= WORKOUT_WINDOW_MINUTES),
+        'title': lambda frame, ctx: "🏋️ Workout Time Approaching!",
+        'message': lambda frame, ctx: (f"Your workout starts in {ctx['workout_minutes']} minutes. "
+                                       "Get ready to crush it!"),
+    },
+    *[_meal_rule(*meal) for meal in MEAL_TIMES],
+    {
+        'name': 'pr_alert',
+        'priority': 'high',
+        'action': 'log_pr_attempt',
+        'when': _pr_ready,
+        'title': lambda frame, ctx: "💪 PR ALERT: You're Ready!",
+        'message': _pr_message,
+    },
+    {
+        'name': 'rest_alert',
+        'priority': 'high',
+        'action': 'view_recovery_tips',
+        'when': lambda frame, ctx: ctx['recovery'] < REST_RECOMMENDED_RECOVERY,
+        'title': lambda frame, ctx: "😴 Recovery Alert: Rest Recommended",
+        'message': lambda frame, ctx: ("Recovery at " + ctx['recovery'][frame.index].round(1).astype(str)
+                                       + "%. Consider active recovery or complete rest today."),
+    },
+    {
+        'name': 'motivation',
+        'priority': 'low',
+        'action': 'none',
+        'when': lambda frame, ctx: _all(frame, True),
+        'title': lambda frame, ctx: "💪 Daily Motivation",
+        'message': lambda frame, ctx: pd.Series(
+            np.array(MOTIVATION_QUOTES, dtype=object)[ctx['rng'].integers(len(MOTIVATION_QUOTES), size=len(frame))],
+            index=frame.index
+        ),
+    },
+]
+
+
+def evaluate(users, now=None, rules=RULES, seed=None):
+    """
+    Evaluate every rule against a batch of users in one vectorised pass
+
+    Args:
+        users: DataFrame from users_frame() (or a list of user_data dicts)
+        now: Reference time for reminder windows (defaults to now)
+        rules: Rules to apply
+        seed: Optional RNG seed for motivation quotes
+
+    Returns:
+        pd.DataFrame: One row per notification (user_id, timestamp, title,
+                      message, priority, action, read, rule)
+    """
+    frame = users if isinstance(users, pd.DataFrame) else users_frame(users)
+    now = now or datetime.datetime.now()
+    ctx = {
+        'now': now,
+        'recovery': recovery_frame(frame),  # computed once for every rule
+        'workout_minutes': _minutes_until(*WORKOUT_TIME, now),
+        'rng': np.random.default_rng(seed),
+    }
+
+    batches = []
+    for rule in rules:
+        mask = rule['when'](frame, ctx).fillna(False).astype(bool)
+        if not mask.any():
+            continue
+        matched = frame[mask]
+        batches.append(pd.DataFrame({
+            'user_id': matched['user_id'],
+            'title': rule['title'](matched, ctx),
+            'message': rule['message'](matched, ctx),
+            'priority': rule['priority'],
+            'action': rule['action'],
+            'rule': rule['name'],
+        }))
+
+    # Milestones can fire several times per user, so they come from the threshold index;
+    # users with no previous state are on their first check and have crossed nothing yet
+    previous = frame[[f"previous_{lift}" for lift in LIFTS]].set_axis(LIFTS, axis=1)
+    known = previous.notna().any(axis=1)
+    milestones = get_milestone_index().crossed_batch(
+        previous[known],
+        frame.loc[known, LIFTS],
+        frame.loc[known, 'body_weight'] if 'body_weight' in frame else None,
+        user_ids=frame.loc[known, 'user_id']
+    )
+    if len(milestones):
+        batches.append(milestones[['user_id', 'title', 'message', 'rule']].assign(
+            priority='high', action='share_achievement'))
+
+    columns = ['user_id', 'timestamp', 'title', 'message', 'priority', 'action', 'read', 'rule']
+    if not batches:
+        return pd.DataFrame(columns=columns)
+    notifications = pd.concat(batches, ignore_index=True)
+    notifications['timestamp'] = now.isoformat()
+    notifications['read'] = False
+    return notifications[columns]
+
+
+def emit(notifications, limiter=None, pipeline=None):
+    """
+    Queue a batch of notifications for delivery
+
+    Rows already sent today for the same (user, rule) or over the user's
+    priority quota are dropped first. The delivery pipeline logs the rest (one
+    log commit per delivery batch), indexes them in the inbox store and pushes
+    them to every transport, off the caller's thread.
+
+    Args:
+        notifications: DataFrame from evaluate()
+        limiter: NotificationLimiter (defaults to the process-wide limiter)
+        pipeline: DeliveryPipeline (defaults to the process-wide pipeline)
+
+    Returns:
+        int: Number of notifications queued
+    """
+    from notification_limiter import get_notification_limiter
+    from notification_delivery import get_delivery_pipeline
+
+    limiter = limiter or get_notification_limiter()
+    pipeline = pipeline or get_delivery_pipeline()
+    if len(notifications):
+        notifications = notifications[limiter.allow_many(notifications)]
+    records = notifications.to_dict('records')
+    for record in records:
+        pipeline.submit(dict(record))
+    return len(records)
@@ -0,0 +1,218 @@
+"""
+Notification Store - Indexed inbox queries over notifications (SQLite)
+Keeps every notification keyed by user, timestamp, priority and read flag so a
+user's inbox, unread count and mark-as-read never scan anyone else's history.
+The JSONL log stays the durable record; this store is a queryable index of it.
+"""
+import json
+import sqlite3
+import threading
+from pathlib import Path
+
+
+PRIORITY_RANK = {'high': 0, 'medium': 1, 'low': 2}
+DEFAULT_USER = "anonymous"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS notifications (
+    id INTEGER PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    priority TEXT NOT NULL,
+    priority_rank INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    message TEXT NOT NULL,
+    action TEXT NOT NULL DEFAULT 'none',
+    read INTEGER NOT NULL DEFAULT 0,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_user_time ON notifications (user_id, timestamp DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_user_unread ON notifications (user_id, read, timestamp DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_user_priority ON notifications (user_id, priority_rank, timestamp DESC);
+"""
+
+_COLUMNS = ('user_id', 'timestamp', 'priority', 'title', 'message', 'action', 'read')
+
+
+class NotificationStore:
+    """SQLite-backed notification index with paginated per-user queries"""
+
+    def __init__(self, path="data/notifications.db"):
+        self.path = str(path)
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._mutex = threading.Lock()
+        self._changed = threading.Condition()
+        with self._mutex, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+
+    def _row(self, notification):
+        extra = {k: v for k, v in notification.items() if k not in _COLUMNS and k != 'id'}
+        priority = notification.get('priority', 'medium')
+        return (
+            notification.get('user_id') or DEFAULT_USER,
+            notification['timestamp'],
+            priority,
+            PRIORITY_RANK.get(priority, 1),
+            notification['title'],
+            notification['message'],
+            notification.get('action', 'none'),
+            int(bool(notification.get('read', False))),
+            json.dumps(extra) if extra else None,
+        )
+
+    def add(self, notification):
+        """Index one notification; returns its id"""
+        with self._mutex, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO notifications (user_id, timestamp, priority, priority_rank, title,"
+                " message, action, read, extra) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                self._row(notification)
+            )
+        self._notify()
+        return cursor.lastrowid
+
+    def add_many(self, notifications):
+        """Bulk index notifications in one transaction"""
+        with self._mutex, self._conn:
+            self._conn.executemany(
+                "INSERT INTO notifications (user_id, timestamp, priority, priority_rank, title,"
+                " message, action, read, extra) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (self._row(n) for n in notifications)
+            )
+        self._notify()
+
+    def _notify(self):
+        with self._changed:
+            self._changed.notify_all()
+
+    def _to_dict(self, row):
+        notification = {
+            'id': row['id'],
+            'user_id': row['user_id'],
+            'timestamp': row['timestamp'],
+            'title': row['title'],
+            'message': row['message'],
+            'priority': row['priority'],
+            'action': row['action'],
+            'read': bool(row['read']),
+        }
+        if row['extra']:
+            notification.update(json.loads(row['extra']))
+        return notification
+
+    def inbox(self, user_id, unread_only=False, priority=None, limit=20, offset=0, before=None):
+        """
+        Newest-first page of a user's notifications
+
+        Args:
+            user_id: Whose inbox to read
+            unread_only: Only unread notifications
+            priority: Optional 'high' / 'medium' / 'low' filter
+            limit: Page size
+            offset: Rows to skip (simple page numbers)
+            before: Keyset cursor (timestamp, id) of the last row of the previous
+                    page; cheaper than offset for deep pages
+
+        Returns:
+            list: Notification dicts (each with its 'id')
+        """
+        clauses, params = ["user_id = ?"], [user_id]
+        if unread_only:
+            clauses.append("read = 0")
+        if priority:
+            clauses.append("priority_rank = ?")
+            params.append(PRIORITY_RANK.get(priority, 1))
+        if before:
+            clauses.append("(timestamp, id) < (?, ?)")
+            params.extend(before)
+
+        query = (f"SELECT * FROM notifications WHERE {' AND '.join(clauses)}"
+                 " ORDER BY timestamp DESC, id DESC LIMIT ? OFFSET ?")
+        with self._mutex:
+            rows = self._conn.execute(query, (*params, limit, offset)).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def since(self, user_id, after_id, limit=100):
+        """Notifications for a user added after a given id (oldest first)"""
+        with self._mutex:
+            rows = self._conn.execute(
+                "SELECT * FROM notifications WHERE user_id = ? AND id > ? ORDER BY id LIMIT ?",
+                (user_id, after_id, limit)
+            ).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def wait_since(self, user_id, after_id, timeout=15.0, limit=100):
+        """
+        Like since(), but blocks up to `timeout` seconds for something new
+
+        Writers in this process wake waiters immediately; rows added by other
+        processes are picked up when the wait times out.
+        """
+        with self._changed:
+            rows = self.since(user_id, after_id, limit)
+            if not rows:
+                self._changed.wait(timeout)
+        return rows or self.since(user_id, after_id, limit)
+
+    def latest_id(self, user_id):
+        """Highest notification id for a user (0 if none)"""
+        with self._mutex:
+            return self._conn.execute(
+                "SELECT COALESCE(MAX(id), 0) FROM notifications WHERE user_id = ?", (user_id,)
+            ).fetchone()[0]
+
+    def unread_count(self, user_id):
+        with self._mutex:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM notifications WHERE user_id = ? AND read = 0", (user_id,)
+            ).fetchone()[0]
+
+    def total_count(self, user_id):
+        with self._mutex:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM notifications WHERE user_id = ?", (user_id,)
+            ).fetchone()[0]
+
+    def mark_read(self, notification_id, read=True):
+        """Flip one notification's read flag by primary key"""
+        with self._mutex, self._conn:
+            self._conn.execute("UPDATE notifications SET read = ? WHERE id = ?",
+                               (int(read), notification_id))
+
+    def mark_all_read(self, user_id):
+        with self._mutex, self._conn:
+            self._conn.execute("UPDATE notifications SET read = 1 WHERE user_id = ? AND read = 0",
+                               (user_id,))
+
+    def rebuild_from_log(self, log):
+        """Re-index every entry of a NotificationLog (e.g. after deleting the db)"""
+        with self._mutex, self._conn:
+            self._conn.execute("DELETE FROM notifications")
+        batch = []
+        for entry in log.read():
+            batch.append(entry)
+            if len(batch) >= 1000:
+                self.add_many(batch)
+                batch = []
+        if batch:
+            self.add_many(batch)
+
+    def close(self):
+        with self._mutex:
+            self._conn.close()
+
+
+_default_store = None
+
+
+def get_notification_store():
+    """Process-wide store shared by every NotificationManager"""
+    global _default_store
+    if _default_store is None:
+        _default_store = NotificationStore()
+    return _default_store
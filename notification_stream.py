@@ -0,0 +1,169 @@
+"""
+Notification Stream - Server-Sent Events push channel fed by the notification store
+A small local HTTP server streams each user's new notifications as SSE events
+the moment they are indexed, so the Streamlit notifications tab can append new
+cards in the browser instead of polling and re-rendering the whole list.
+"""
+import os
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from notification_store import DEFAULT_USER, get_notification_store
+
+
+HEARTBEAT_SECONDS = 15.0
+
+
+class _StreamHandler(BaseHTTPRequestHandler):
+    """GET /stream?user_id=...&after=<id> -> text/event-stream"""
+
+    def log_message(self, format, *args):
+        pass  # keep the console for push notifications
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path != "/stream":
+            self.send_error(404)
+            return
+
+        query = parse_qs(url.query)
+        user_id = query.get('user_id', [DEFAULT_USER])[0]
+        # EventSource resends the last id it saw when it reconnects
+        after = self.headers.get('Last-Event-ID') or query.get('after', ['0'])[0]
+        try:
+            after_id = int(after)
+        except ValueError:
+            self.send_error(400, "after must be a notification id")
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.end_headers()
+
+        store = self.server.store
+        try:
+            while not self.server.stopping:
+                rows = store.wait_since(user_id, after_id, timeout=HEARTBEAT_SECONDS)
+                if not rows:
+                    self.wfile.write(b": ping\n\n")
+                for notification in rows:
+                    after_id = notification['id']
+                    payload = json.dumps(notification, ensure_ascii=False)
+                    self.wfile.write(f"id: {after_id}\nevent: notification\ndata: {payload}\n\n".encode("utf-8"))
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # client went away
+
+
+class NotificationStreamServer:
+    """Threaded SSE server running in a daemon thread"""
+
+    def __init__(self, store=None, host="127.0.0.1", port=8765):
+        self.httpd = ThreadingHTTPServer((host, port), _StreamHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.store = store or get_notification_store()
+        self.httpd.stopping = False
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/stream"
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.httpd.serve_forever,
+                                            name="notification-stream", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.stopping = True
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+_default_server = None
+_default_lock = threading.Lock()
+
+
+def get_notification_stream():
+    """
+    Process-wide stream server, started on first use
+
+    Binds NOTIFICATION_STREAM_PORT (8765 by default); if that port is taken
+    (e.g. by another Streamlit process) it falls back to a free port, and the
+    client snippet uses whichever port was bound.
+
+    Returns:
+        NotificationStreamServer, or None if no port could be bound
+    """
+    global _default_server
+    if _default_server is None:
+        with _default_lock:
+            if _default_server is None:
+                port = int(os.getenv("NOTIFICATION_STREAM_PORT", "8765"))
+                for candidate in dict.fromkeys((port, 0)):
+                    try:
+                        _default_server = NotificationStreamServer(port=candidate).start()
+                        break
+                    except OSError as e:
+                        print(f"Warning: Could not start notification stream on port {candidate}: {e}")
+    return _default_server
+
+
+LIVE_FEED_TEMPLATE = """
+<div id="live-feed" style="font-family: sans-serif;"></div>
+<script>
+  const colors = {high: '#ff9a9e', medium: '#a8edea', low: '#fed6e3'};
+  const feed = document.getElementById('live-feed');
+  const source = new EventSource('__URL__?user_id=' + encodeURIComponent(__USER__) + '&after=__AFTER__');
+
+  function line(tag, text, style) {
+    const el = document.createElement(tag);
+    el.textContent = text;
+    el.style.cssText = style;
+    return el;
+  }
+
+  source.addEventListener('notification', (event) => {
+    const n = JSON.parse(event.data);
+    const card = document.createElement('div');
+    card.style.cssText = 'background: linear-gradient(135deg, ' + (colors[n.priority] || '#e0e0e0') +
+      ' 0%, #fecfef 100%); padding: 1rem 1.5rem; border-radius: 10px; border-left: 5px solid #f44336;' +
+      ' margin: 0.75rem 0; box-shadow: 0 2px 8px rgba(0,0,0,0.1);';
+    card.appendChild(line('h4', n.title, 'margin: 0; color: #333;'));
+    card.appendChild(line('p', n.message, 'margin: 0.5rem 0; color: #555;'));
+    card.appendChild(line('p', 'Priority: ' + n.priority.toUpperCase(), 'margin: 0; font-size: 0.9rem; color: #666;'));
+    card.appendChild(line('p', n.timestamp.slice(0, 19), 'margin-top: 0.5rem; font-size: 0.8rem; color: #999;'));
+    feed.prepend(card);  // newest on top; existing cards are never re-rendered
+  });
+</script>
+"""
+
+
+def live_feed_html(user_id, after_id, url=None):
+    """
+    HTML/JS snippet that subscribes to the stream and prepends new cards
+
+    Args:
+        user_id: Whose notifications to stream
+        after_id: Only notifications with a larger id are shown
+        url: Stream endpoint (defaults to the process-wide server)
+
+    Returns:
+        str: Markup for streamlit.components.v1.html, or None if no stream is available
+    """
+    if url is None:
+        server = get_notification_stream()
+        if server is None:
+            return None
+        url = server.url
+    return (LIVE_FEED_TEMPLATE
+            .replace("__URL__", url)
+            .replace("__USER__", json.dumps(user_id))
+            .replace("__AFTER__", str(int(after_id))))
@@ -1,9 +1,35 @@
 """
 Push Notification System - Mock API for sending workout reminders and motivation
 """
-import json
 import datetime
-from pathlib import Path
+import random
+from scoring import PR_READY_RECOVERY, REST_RECOMMENDED_RECOVERY, recovery_from_user_data
+from training_load import PR_READY_LOAD, get_training_load_store
+from notification_store import DEFAULT_USER
+from notification_limiter import get_notification_limiter, quota_bucket
+from notification_delivery import get_delivery_pipeline
+from reminder_scheduler import next_occurrence
+from milestones import get_milestone_index
+
+
+# Default schedule used when no profile times are known
+WORKOUT_TIME = (18, 0)  # 6 PM
+WORKOUT_WINDOW_MINUTES = 60
+MEAL_TIMES = [
+    ("Breakfast", 8, 0),
+    ("Pre-Workout Snack", 17, 0),
+    ("Post-Workout Meal", 19, 30),
+    ("Dinner", 20, 0)
+]
+MEAL_WINDOW_MINUTES = 30
+
+MOTIVATION_QUOTES = [
+    "The only bad workout is the one that didn't happen. Get after it!",
+    "Progressive overload = progressive results. Add that extra 2.5lbs!",
+    "Your future self is counting on the work you do today.",
+    "Strength isn't given. It's earned, rep by rep.",
+    "The pain you feel today will be the strength you feel tomorrow."
+]
 
 
 class NotificationManager:
@@ -12,52 +38,57 @@ class NotificationManager:
     def __init__(self, user_data):
         self.user_data = user_data
         self.notifications = []
-        self.notification_log = Path("data/notifications.json")
+        self.user_id = user_data.get('user_id', DEFAULT_USER)
+        self.limiter = get_notification_limiter()
+        self.delivery = get_delivery_pipeline()
+        self._recovery_score = None
+        # Max lifts whose milestones have been delivered (pass back as previous_max_lifts)
+        self.settled_max_lifts = user_data.get('previous_max_lifts')
 
     def generate_workout_reminders(self):
         """Generate workout reminder notifications"""
         current_time = datetime.datetime.now()
-        workout_time = current_time.replace(hour=18, minute=0)  # Default 6 PM
+        workout_time = next_occurrence(datetime.time(*WORKOUT_TIME), current_time)
 
-        time_until_workout = (workout_time - current_time).seconds // 60
+        time_until_workout = int((workout_time - current_time).total_seconds() // 60)
 
-        if 0 < time_until_workout <= 60:
+        if 0 < time_until_workout <= WORKOUT_WINDOW_MINUTES:
             self.send_notification(
                 title="🏋️ Workout Time Approaching!",
                 message=f"Your workout starts in {time_until_workout} minutes. Get ready to crush it!",
                 priority="high",
-                action="open_workout_plan"
+                action="open_workout_plan",
+                rule="workout_reminder"
             )
 
     def generate_meal_reminders(self):
         """Generate meal prep reminders"""
-        meal_times = [
-            ("Breakfast", 8, 0),
-            ("Pre-Workout Snack", 17, 0),
-            ("Post-Workout Meal", 19, 30),
-            ("Dinner", 20, 0)
-        ]
-
         current_time = datetime.datetime.now()
 
-        for meal_name, hour, minute in meal_times:
-            meal_time = current_time.replace(hour=hour, minute=minute)
-            time_diff = (meal_time - current_time).seconds // 60
+        for meal_name, hour, minute in MEAL_TIMES:
+            meal_time = next_occurrence(datetime.time(hour, minute), current_time)
+            time_diff = int((meal_time - current_time).total_seconds() // 60)
 
-            if 0 < time_diff <= 30:
+            if 0 < time_diff <= MEAL_WINDOW_MINUTES:
                 protein_target = self.user_data.get('body_weight', 180) * 0.8
                 self.send_notification(
                     title=f"🍗 {meal_name} Time",
                     message=f"Time for nutrition! Aim for {protein_target/4:.0f}g protein this meal.",
                     priority="medium",
-                    action="view_meal_plan"
+                    action="view_meal_plan",
+                    rule=f"meal_{meal_name.lower().replace(' ', '_').replace('-', '_')}"
                 )
 
     def generate_pr_alerts(self):
         """Alert when ready for PR attempts based on recovery"""
         recovery_score = self._calculate_recovery_score()
 
-        if recovery_score >= 85:
+        # Training-load readiness (if tracked) must also clear the bar
+        load_readiness = (self._training_load() or {}).get('readiness')
+        if load_readiness is not None and load_readiness < PR_READY_LOAD:
+            return
+
+        if recovery_score >= PR_READY_RECOVERY:
             max_lifts = self.user_data.get('max_lifts', {})
             if max_lifts:
                 heaviest_lift = max(max_lifts.items(), key=lambda x: x[1])
@@ -69,58 +100,82 @@ class NotificationManager:
                     title="💪 PR ALERT: You're Ready!",
                     message=f"Recovery at {recovery_score}%! Try {suggested_attempt}lbs on {lift_name} today!",
                     priority="high",
-                    action="log_pr_attempt"
+                    action="log_pr_attempt",
+                    rule="pr_alert"
                 )
 
     def generate_rest_day_alerts(self):
         """Alert when recovery is poor and rest is needed"""
         recovery_score = self._calculate_recovery_score()
 
-        if recovery_score < 50:
+        if recovery_score < REST_RECOMMENDED_RECOVERY:
             self.send_notification(
                 title="😴 Recovery Alert: Rest Recommended",
                 message=f"Recovery at {recovery_score}%. Consider active recovery or complete rest today.",
                 priority="high",
-                action="view_recovery_tips"
+                action="view_recovery_tips",
+                rule="rest_alert"
             )
 
     def generate_motivation_quotes(self):
         """Send motivational notifications"""
-        quotes = [
-            "The only bad workout is the one that didn't happen. Get after it!",
-            "Progressive overload = progressive results. Add that extra 2.5lbs!",
-            "Your future self is counting on the work you do today.",
-            "Strength isn't given. It's earned, rep by rep.",
-            "The pain you feel today will be the strength you feel tomorrow."
-        ]
-
-        import random
-        quote = random.choice(quotes)
+        quote = random.choice(MOTIVATION_QUOTES)
 
         self.send_notification(
             title="💪 Daily Motivation",
             message=quote,
             priority="low",
-            action="none"
+            action="none",
+            rule="motivation"
         )
 
     def generate_progress_milestones(self):
-        """Celebrate milestones and progress"""
-        # Check for workout streaks, weight milestones, etc.
+        """Celebrate plate, bodyweight-multiple and strength-standard milestones"""
+        previous = self.user_data.get('previous_max_lifts')
         max_lifts = self.user_data.get('max_lifts', {})
+        if previous is None:
+            # First check: remember where the user is, nothing has been crossed yet
+            self.settled_max_lifts = dict(max_lifts)
+            return
+
+        index = get_milestone_index()
+        body_weight = self.user_data.get('body_weight')
+        milestones = index.crossed_between(previous, max_lifts, body_weight)
+        # Lightest first, and milestones at the same weight all or none, so what the daily
+        # quota lets through is everything below some weight and the rest waits intact
+        by_weight = {}
+        for milestone in milestones:
+            by_weight.setdefault((milestone['lift'], index.weight(milestone, body_weight)), []).append(milestone)
+        for lift_weight in sorted(by_weight, key=lambda key: key[1]):
+            group = by_weight[lift_weight]
+            remaining = self.limiter.remaining(self.user_id, quota_bucket(group[0]['rule'], "high"))
+            fresh = [m for m in group if not self.limiter.sent(self.user_id, m['rule'])]
+            if remaining is not None and len(fresh) > remaining:
+                break
+            for milestone in fresh:
+                self.send_notification(
+                    title=milestone['title'],
+                    message=milestone['message'],
+                    priority="high",
+                    action="share_achievement",
+                    rule=milestone['rule']
+                )
+        # Milestones held back by the daily quota are crossed again next check
+        pending = [m for m in milestones if not self.limiter.sent(self.user_id, m['rule'])]
+        self.settled_max_lifts = index.settled_lifts(previous, max_lifts, pending, body_weight)
 
-        # Example: Celebrate 225 bench milestone
-        if max_lifts.get('bench_press', 0) >= 225:
-            self.send_notification(
-                title="🎉 MILESTONE UNLOCKED: 225lb Bench!",
-                message="You hit two plates! That's elite level strength. Keep pushing!",
-                priority="high",
-                action="share_achievement"
-            )
+    def send_notification(self, title, message, priority="medium", action="none", rule=None):
+        """
+        Simulate sending a push notification
+
+        Skipped (returns None) if this user already got the same rule today or
+        has used up today's quota for the priority.
+        """
+        if not self.limiter.allow(self.user_id, rule or title, priority):
+            return None
 
-    def send_notification(self, title, message, priority="medium", action="none"):
-        """Simulate sending a push notification"""
         notification = {
+            "user_id": self.user_id,
             "timestamp": datetime.datetime.now().isoformat(),
             "title": title,
             "message": message,
@@ -130,47 +185,27 @@ class NotificationManager:
         }
 
         self.notifications.append(notification)
-        self._log_notification(notification)
 
-        # Simulate push notification display
-        print(f"\n📲 PUSH NOTIFICATION [{priority.upper()}]")
-        print(f"   {title}")
-        print(f"   {message}")
-        if action != "none":
-            print(f"   👆 Tap to: {action.replace('_', ' ').title()}")
-        print()
+        # Logging, indexing in the inbox store and push delivery happen on the pipeline's worker threads
+        self.delivery.submit(dict(notification))
 
         return notification
 
-    def _calculate_recovery_score(self):
-        """Calculate recovery score from 0-100"""
-        sleep = self.user_data.get('sleep_hours', 7)
-        soreness = self.user_data.get('soreness', 5)
-        energy = self.user_data.get('energy', 'moderate')
-
-        energy_scores = {'low': 60, 'moderate': 80, 'high': 100}
-
-        sleep_score = min(sleep / 8 * 100, 100)
-        soreness_score = (10 - soreness) * 10
-        energy_score = energy_scores.get(energy, 80)
-
-        return (sleep_score * 0.4 + soreness_score * 0.3 + energy_score * 0.3)
-
-    def _log_notification(self, notification):
-        """Log notification to file for persistence"""
+    def _training_load(self):
+        """Training-load summary passed in user_data, else the one saved for this user (as of today)"""
+        if self.user_data.get('training_load') is not None:
+            return self.user_data['training_load']
         try:
-            if self.notification_log.exists():
-                with open(self.notification_log, 'r') as f:
-                    logs = json.load(f)
-            else:
-                logs = []
-
-            logs.append(notification)
-
-            with open(self.notification_log, 'w') as f:
-                json.dump(logs, f, indent=2)
+            return get_training_load_store().summary(self.user_id, as_of=datetime.date.today())
         except Exception as e:
-            print(f"Warning: Could not log notification: {e}")
+            print(f"Warning: Could not load training load: {e}")
+            return None
+
+    def _calculate_recovery_score(self):
+        """Calculate recovery score from 0-100 (once per manager)"""
+        if self._recovery_score is None:
+            self._recovery_score = recovery_from_user_data(self.user_data)
+        return self._recovery_score
 
     def run_notification_check(self):
         """Run all notification checks"""
@@ -204,3 +239,5 @@ if __name__ == "__main__":
 
     notif_manager = NotificationManager(sample_user)
     notif_manager.run_notification_check()
+    notif_manager.delivery.drain()
+    print(notif_manager.delivery.stats())
@@ -0,0 +1,209 @@
+"""
+Rolling Progress Metrics - Incremental streaks, PRs and trends
+Ingests one logged day at a time and keeps every dashboard number up to date
+in O(1) per update, so reruns never rescan the workout history.
+"""
+import os
+import json
+import datetime
+from collections import deque
+from pathlib import Path
+
+
+TRACKED_LIFTS = ('bench_press', 'squat', 'deadlift', 'overhead_press')
+TREND_FIELDS = ('workout_done', 'workout_intensity', 'sleep', 'protein', 'body_weight')
+WINDOWS = (7, 28)
+PR_WINDOW_DAYS = 30
+
+DEFAULT_PATH = os.getenv("PROGRESS_METRICS_PATH", "data/progress_metrics.json")
+
+
+def _to_date(value):
+    """Normalise a date, datetime, Timestamp or ISO string to a date"""
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    if hasattr(value, 'date'):
+        return value.date()
+    return datetime.date.fromisoformat(str(value)[:10])
+
+
+class _RollingWindow:
+    """Fixed-size window with a running sum (skips missing values)"""
+
+    def __init__(self, size, values=None):
+        self.size = size
+        self.values = deque(values or [], maxlen=size)
+        self.total = sum(v for v in self.values if v is not None)
+        self.count = sum(1 for v in self.values if v is not None)
+
+    def push(self, value):
+        if len(self.values) == self.size:
+            old = self.values[0]
+            if old is not None:
+                self.total -= old
+                self.count -= 1
+        self.values.append(value)
+        if value is not None:
+            self.total += value
+            self.count += 1
+
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+
+class ProgressMetrics:
+    """
+    Incremental metrics over a stream of logged days
+
+    Keeps the current workout streak, per-lift running maxima and PR counts,
+    7/28-day rolling means and an EMA-smoothed body weight.
+    """
+
+    def __init__(self, lifts=TRACKED_LIFTS, fields=TREND_FIELDS, windows=WINDOWS, ema_alpha=0.1):
+        self.lifts = tuple(lifts)
+        self.fields = tuple(fields)
+        self.windows = tuple(windows)
+        self.ema_alpha = ema_alpha
+
+        self.days_logged = 0
+        self.last_date = None
+        self.streak = 0
+        self.best_streak = 0
+        self.lift_max = {}
+        self.pr_count = {}
+        self.last_pr_date = {}
+        self.body_weight_ema = None
+        self.rolling = {
+            (field, size): _RollingWindow(size) for field in self.fields for size in self.windows
+        }
+
+    def ingest(self, day):
+        """
+        Add one logged day
+
+        Args:
+            day: Dict (or DataFrame row) with 'date' plus any of workout_done,
+                 lift columns and trend fields
+
+        Returns:
+            list: Lifts that set a new PR on this day
+        """
+        date = _to_date(day['date'])
+        same_day = date == self.last_date
+
+        # A skipped calendar day breaks the streak; a second entry for the same day doesn't extend it
+        if self.last_date is not None and (date - self.last_date).days > 1:
+            self.streak = 0
+        if day.get('workout_done'):
+            if not same_day or self.streak == 0:
+                self.streak += 1
+            self.best_streak = max(self.best_streak, self.streak)
+        elif not same_day:
+            self.streak = 0
+
+        new_prs = []
+        for lift in self.lifts:
+            weight = day.get(lift)
+            if weight is None or weight != weight:  # missing or NaN
+                continue
+            if weight > self.lift_max.get(lift, 0):
+                self.lift_max[lift] = float(weight)
+                self.pr_count[lift] = self.pr_count.get(lift, 0) + 1
+                self.last_pr_date[lift] = date
+                new_prs.append(lift)
+
+        for (field, _), window in self.rolling.items():
+            value = day.get(field)
+            window.push(None if value is None or value != value else float(value))
+
+        weight = day.get('body_weight')
+        if weight is not None and weight == weight:
+            if self.body_weight_ema is None:
+                self.body_weight_ema = float(weight)
+            else:
+                self.body_weight_ema += self.ema_alpha * (float(weight) - self.body_weight_ema)
+
+        self.days_logged += 1
+        self.last_date = date
+        return new_prs
+
+    def rolling_mean(self, field, window=7):
+        """Mean of a field over the last `window` logged days (None if no data)"""
+        return self.rolling[(field, window)].mean()
+
+    def rolling_sum(self, field, window=7):
+        """Sum of a field over the last `window` logged days"""
+        return self.rolling[(field, window)].total
+
+    def prs_within(self, days=PR_WINDOW_DAYS):
+        """Number of lifts whose all-time max was set in the last `days` days"""
+        if self.last_date is None:
+            return 0
+        return sum(
+            1 for pr_date in self.last_pr_date.values()
+            if (self.last_date - pr_date).days < days
+        )
+
+    @classmethod
+    def from_history(cls, history, **kwargs):
+        """Build metrics by replaying a workout history DataFrame or list of dicts"""
+        metrics = cls(**kwargs)
+        rows = history.to_dict('records') if hasattr(history, 'to_dict') else history
+        for row in rows:
+            metrics.ingest(row)
+        return metrics
+
+    def to_dict(self):
+        """Serialise to a JSON-compatible dict"""
+        return {
+            'lifts': list(self.lifts),
+            'fields': list(self.fields),
+            'windows': list(self.windows),
+            'ema_alpha': self.ema_alpha,
+            'days_logged': self.days_logged,
+            'last_date': self.last_date.isoformat() if self.last_date else None,
+            'streak': self.streak,
+            'best_streak': self.best_streak,
+            'lift_max': self.lift_max,
+            'pr_count': self.pr_count,
+            'last_pr_date': {lift: d.isoformat() for lift, d in self.last_pr_date.items()},
+            'body_weight_ema': self.body_weight_ema,
+            'rolling': {
+                f"{field}:{size}": list(window.values)
+                for (field, size), window in self.rolling.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Restore metrics saved with to_dict()"""
+        metrics = cls(data['lifts'], data['fields'], data['windows'], data['ema_alpha'])
+        metrics.days_logged = data['days_logged']
+        metrics.last_date = _to_date(data['last_date']) if data['last_date'] else None
+        metrics.streak = data['streak']
+        metrics.best_streak = data['best_streak']
+        metrics.lift_max = data['lift_max']
+        metrics.pr_count = data['pr_count']
+        metrics.last_pr_date = {lift: _to_date(d) for lift, d in data['last_pr_date'].items()}
+        metrics.body_weight_ema = data['body_weight_ema']
+        for key, values in data['rolling'].items():
+            field, size = key.rsplit(':', 1)
+            metrics.rolling[(field, int(size))] = _RollingWindow(int(size), values)
+        return metrics
+
+    def save(self, path):
+        """Write metrics snapshot to a JSON file"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + '.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(self.to_dict(), f)
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path):
+        """Load a metrics snapshot written by save()"""
+        with open(path, 'r') as f:
+            return cls.from_dict(json.load(f))
@@ -0,0 +1,125 @@
+"""
+Progress Timeline - Physique analysis across N dated progress photos
+Every photo is analysed once (through the vision cache) and every adjacent
+pair is compared once (cached under both photos' hashes); analyses and then
+comparisons fan out over threads under the shared NIM rate limit. Adding a
+new monthly photo to a two-year timeline costs one new analysis and one new
+comparison; everything else is answered from cache.
+"""
+import sys
+import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+from image_preprocessing import prepare_images
+from rate_limiter import get_api_limiter
+
+
+def _to_date(value):
+    """Normalise a date, datetime or ISO string to a date"""
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    return datetime.date.fromisoformat(str(value)[:10])
+
+
+def _weeks_between(start, end):
+    return max(1, round((end - start).days / 7))
+
+
+def _normalise(photos):
+    """[(date, image)] sorted by date from (date, image) pairs or {'date', 'image'} dicts"""
+    entries = []
+    for photo in photos:
+        if isinstance(photo, dict):
+            entries.append((_to_date(photo['date']), photo['image']))
+        else:
+            date, image = photo
+            entries.append((_to_date(date), image))
+    return sorted(entries, key=lambda entry: entry[0])
+
+
+def analyze_timeline(photos, user_goals="build muscle", max_workers=None, user_id=None):
+    """
+    Analyse a series of dated progress photos
+
+    Args:
+        photos: (date, image) pairs or {'date': ..., 'image': ...} dicts; images
+            as paths, files, bytes or base64, in any order
+        user_goals: User's fitness goals
+        max_workers: Threads for model calls (defaults to the API concurrency cap)
+        user_id: Whose photos they are (cached analyses are never shared between users)
+
+    Returns:
+        dict: photos (date, analysis), comparisons (start, end, weeks,
+        assessment) and a merged markdown report
+    """
+    from agents.vision_analyzer import analyze_physique, assess_progress_from_photos
+
+    entries = _normalise(photos)
+    if not entries:
+        return {'photos': [], 'comparisons': [], 'report': "No photos to analyse."}
+    dates = [date for date, _ in entries]
+    images = prepare_images([image for _, image in entries])
+    workers = max_workers or get_api_limiter().max_concurrent
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="timeline") as pool:
+        # Per-photo analyses first: each comparison reuses its "before" analysis as context
+        analyses = list(pool.map(
+            lambda image: analyze_physique(image=image, user_goals=user_goals, user_id=user_id), images
+        ))
+        pairs = list(zip(range(len(images) - 1), range(1, len(images))))
+        assessments = list(pool.map(
+            lambda pair: assess_progress_from_photos(
+                images[pair[0]], images[pair[1]], _weeks_between(dates[pair[0]], dates[pair[1]]), user_goals,
+                user_id
+            ),
+            pairs
+        ))
+
+    timeline = {
+        'photos': [{'date': date.isoformat(), 'analysis': analysis} for date, analysis in zip(dates, analyses)],
+        'comparisons': [
+            {
+                'start': dates[i].isoformat(),
+                'end': dates[j].isoformat(),
+                'weeks': _weeks_between(dates[i], dates[j]),
+                'assessment': assessment,
+            }
+            for (i, j), assessment in zip(pairs, assessments)
+        ],
+    }
+    timeline['report'] = render_report(timeline)
+    return timeline
+
+
+def render_report(timeline):
+    """Merged markdown report: starting point, each step, current physique"""
+    photos, comparisons = timeline['photos'], timeline['comparisons']
+    if not photos:
+        return "No photos to analyse."
+    first, last = photos[0], photos[-1]
+    total_weeks = _weeks_between(_to_date(first['date']), _to_date(last['date'])) if len(photos) > 1 else 0
+
+    sections = [
+        f"# Progress Timeline: {first['date']} to {last['date']}",
+        f"{len(photos)} photos over {total_weeks} weeks",
+        f"## Starting Point ({first['date']})\n\n{first['analysis']}",
+    ]
+    for step, comparison in enumerate(comparisons, 1):
+        sections.append(
+            f"## Step {step}: {comparison['start']} to {comparison['end']} ({comparison['weeks']} weeks)"
+            f"\n\n{comparison['assessment']}"
+        )
+    if len(photos) > 1:
+        sections.append(f"## Current Physique ({last['date']})\n\n{last['analysis']}")
+    return "\n\n".join(sections)
+
+
+if __name__ == "__main__":
+    # python progress_timeline.py 2024-01-15=jan.jpg 2024-02-15=feb.jpg ...
+    if len(sys.argv) < 2:
+        print("Usage: python progress_timeline.py DATE=PHOTO [DATE=PHOTO ...]")
+        sys.exit(1)
+    args = [arg.split("=", 1) for arg in sys.argv[1:]]
+    print(analyze_timeline([(date, path) for date, path in args])['report'])
@@ -0,0 +1,170 @@
+"""
+Progression Simulator - Monte Carlo odds of hitting strength goals
+Runs many vectorised NumPy trajectories of a program from knowledge_base.PROGRAMS
+with stochastic session outcomes, missed sessions, stall resets and scheduled
+deloads, and reports the probability of reaching each goal by the target date.
+"""
+import datetime
+
+import numpy as np
+import pandas as pd
+
+from strength_engine import PROGRESSION, current_max_lifts, normalize_lift, progression_tier
+
+
+LOWER_BODY = {'squat', 'deadlift'}
+
+# Numeric models of the programs described in knowledge_base.PROGRAMS.
+# frequency = progression attempts per lift per session (0.5 = every other session)
+PROGRAM_MODELS = {
+    'Starting Strength / StrongLifts 5×5': {
+        'sessions_per_week': 3,
+        'frequency': {'squat': 1.0, 'bench_press': 0.5, 'overhead_press': 0.5, 'deadlift': 0.5},
+        'increment': {'upper': 2.5, 'lower': 5.0},
+        'deload_every_weeks': None,
+    },
+    'Texas Method': {
+        'sessions_per_week': 3,
+        'frequency': {'squat': 1 / 3, 'bench_press': 1 / 3, 'overhead_press': 1 / 3, 'deadlift': 1 / 3},
+        'increment': {'upper': 2.5, 'lower': 5.0},
+        'deload_every_weeks': 6,
+    },
+    '5/3/1': {
+        'sessions_per_week': 4,
+        'frequency': {'squat': 1 / 16, 'bench_press': 1 / 16, 'overhead_press': 1 / 16, 'deadlift': 1 / 16},
+        'increment': {'upper': 5.0, 'lower': 10.0},
+        'deload_every_weeks': None,
+    },
+    'Conjugate Method': {
+        'sessions_per_week': 4,
+        'frequency': {'squat': 1 / 4, 'bench_press': 1 / 4, 'overhead_press': 1 / 8, 'deadlift': 1 / 4},
+        'increment': {'upper': 2.5, 'lower': 5.0},
+        'deload_every_weeks': 5,
+    },
+    'Block Periodization': {
+        'sessions_per_week': 4,
+        'frequency': {'squat': 1 / 36, 'bench_press': 1 / 36, 'overhead_press': 1 / 36, 'deadlift': 1 / 36},
+        'increment': {'upper': 10.0, 'lower': 20.0},
+        'deload_every_weeks': 10,
+    },
+}
+
+# Chance a progression attempt succeeds, by progression tier
+TIER_SUCCESS = {'beginner': 0.9, 'intermediate': 0.75, 'advanced': 0.6}
+STALL_LIMIT = 3        # consecutive failed attempts before a reset
+STALL_RESET = 0.9      # reset to 90% of the stalled weight
+DIMINISHING_GAIN = 0.3  # success odds fall as gains approach 30% of the starting max
+DEFAULT_ATTENDANCE = 0.85  # used until there are at least 7 days of history
+
+
+def attendance_from_history(history, sessions_per_week, today=None):
+    """
+    Share of planned sessions a user actually trains, from their history
+
+    Args:
+        history: Logged sessions ({'date', 'exercises'} dicts, as saved by the
+                 apps), or a DataFrame with date and workout_done columns (one row per day)
+        sessions_per_week: Sessions the program plans each week
+        today: End of the history window for logged sessions (defaults to today)
+
+    Returns:
+        float: Attendance rate in [0, 1] (DEFAULT_ATTENDANCE if history is too short)
+    """
+    if isinstance(history, pd.DataFrame):
+        if len(history) < 7 or 'workout_done' not in history:
+            return DEFAULT_ATTENDANCE
+        weeks = len(history) / 7
+        return float(min(1.0, history['workout_done'].sum() / weeks / sessions_per_week))
+
+    dates = pd.to_datetime([session['date'] for session in history or []])
+    if dates.empty:
+        return DEFAULT_ATTENDANCE
+    # Weeks from the first logged session to today, so recent time off counts
+    days = (pd.Timestamp(today or datetime.date.today()) - dates.min().normalize()).days + 1
+    if days < 7:
+        return DEFAULT_ATTENDANCE
+    return float(min(1.0, len(dates) / (days / 7) / sessions_per_week))
+
+
+def simulate_progression(history, goals, days, program='Texas Method', max_lifts=None,
+                         attendance=None, n_paths=20000, seed=None):
+    """
+    Monte Carlo simulation of a program from the user's current maxes to the target date
+
+    Args:
+        history: The user's logged sessions (see attendance_from_history); starting
+                 maxes and attendance are estimated from it
+        goals: Target max per lift, e.g. {'bench_press': 200}
+        days: Days until the target date
+        program: Key of PROGRAM_MODELS
+        max_lifts: Starting max per lift, overriding the estimate from history
+        attendance: Probability each planned session happens, overriding the history
+        n_paths: Number of simulated trajectories
+        seed: Optional RNG seed
+
+    Returns:
+        dict: probability per lift, 'all' (every goal hit), the 10th/50th/90th
+              percentile final max per lift, and the start maxes and attendance used
+    """
+    model = PROGRAM_MODELS[program]
+    if max_lifts is None:
+        max_lifts = current_max_lifts(history if not isinstance(history, pd.DataFrame) else None)
+    if attendance is None:
+        attendance = attendance_from_history(history, model['sessions_per_week'])
+    lifts = [normalize_lift(lift) for lift in goals]
+    rng = np.random.default_rng(seed)
+
+    start = np.array([float(max_lifts.get(lift, 0)) for lift in lifts])
+    target = np.array([float(value) for value in goals.values()])
+    increment = np.array([
+        model['increment']['lower' if lift in LOWER_BODY else 'upper'] for lift in lifts
+    ])
+    frequency = np.array([model['frequency'].get(lift, 0.0) for lift in lifts])
+    base_success = np.array([
+        TIER_SUCCESS[progression_tier(lift, start[i])['tier']] if lift in PROGRESSION else TIER_SUCCESS['intermediate']
+        for i, lift in enumerate(lifts)
+    ])
+
+    current = np.tile(start, (n_paths, 1))
+    fails = np.zeros_like(current, dtype=np.int8)
+
+    sessions = int(days / 7 * model['sessions_per_week'])
+    deload_every = model['deload_every_weeks']
+    for session in range(sessions):
+        week = session // model['sessions_per_week']
+        if deload_every and week % deload_every == deload_every - 1:
+            continue  # scheduled deload week: no progression attempts
+
+        # Deterministic schedule: a lift is attempted when its running count ticks over
+        scheduled = np.floor((session + 1) * frequency) > np.floor(session * frequency)
+        if not scheduled.any():
+            continue
+
+        attended = rng.random(n_paths) < attendance
+        gained = np.clip((current - start) / (DIMINISHING_GAIN * np.maximum(start, 1)), 0, 0.9)
+        success = rng.random(current.shape) < base_success * (1 - gained)
+
+        attempt = attended[:, None] & scheduled[None, :]
+        win = attempt & success
+        lose = attempt & ~success
+
+        current += np.where(win, increment, 0.0)
+        fails = np.where(win, 0, fails + lose).astype(np.int8)
+        stalled = fails >= STALL_LIMIT
+        current = np.where(stalled, current * STALL_RESET, current)
+        fails[stalled] = 0
+
+    hit = current >= target
+    percentiles = np.percentile(current, [10, 50, 90], axis=0)
+    return {
+        'probability': {lift: float(hit[:, i].mean()) for i, lift in enumerate(lifts)},
+        'all': float(hit.all(axis=1).mean()),
+        'percentiles': {
+            lift: {'p10': percentiles[0, i], 'p50': percentiles[1, i], 'p90': percentiles[2, i]}
+            for i, lift in enumerate(lifts)
+        },
+        'start': {lift: float(start[i]) for i, lift in enumerate(lifts)},
+        'attendance': attendance,
+        'paths': n_paths,
+        'sessions': sessions,
+    }
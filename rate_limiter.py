@@ -0,0 +1,71 @@
+"""
+Rate Limiter - Process-wide limit on NVIDIA NIM API calls
+One token bucket (requests per minute) plus a cap on requests in flight,
+shared by every agent and vision call, so fanning work out over threads (e.g.
+a photo timeline) speeds things up without tripping the API's rate limit.
+"""
+import os
+import time
+import threading
+
+
+DEFAULT_PER_MINUTE = float(os.getenv("NIM_REQUESTS_PER_MINUTE", "40"))
+DEFAULT_MAX_CONCURRENT = int(os.getenv("NIM_MAX_CONCURRENT", "4"))
+
+
+class RateLimiter:
+    """Token bucket plus concurrency cap; use as a context manager around each call"""
+
+    def __init__(self, per_minute=DEFAULT_PER_MINUTE, max_concurrent=DEFAULT_MAX_CONCURRENT, burst=None):
+        self.rate = per_minute / 60.0
+        self.capacity = float(burst if burst is not None else max(1, max_concurrent))
+        self.max_concurrent = max_concurrent
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._active = 0
+        self._cond = threading.Condition()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self):
+        """Block until a request may start"""
+        with self._cond:
+            while True:
+                self._refill()
+                if self._tokens >= 1 and self._active < self.max_concurrent:
+                    self._tokens -= 1
+                    self._active += 1
+                    return
+                # Sleep until the next token is due, or until a slot frees up
+                wait = (1 - self._tokens) / self.rate if self._tokens < 1 and self.rate > 0 else None
+                self._cond.wait(wait)
+
+    def release(self):
+        with self._cond:
+            self._active -= 1
+            self._cond.notify()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+        return False
+
+
+_default_limiter = None
+_default_lock = threading.Lock()
+
+
+def get_api_limiter():
+    """Process-wide NIM API limiter"""
+    global _default_limiter
+    if _default_limiter is None:
+        with _default_lock:
+            if _default_limiter is None:
+                _default_limiter = RateLimiter()
+    return _default_limiter
@@ -8,6 +8,7 @@ from agents.insight import analyze_user
 from agents.planner import plan_next_day
 from agents.coach import motivate_user
 from notification_system import NotificationManager
+from scoring import recovery_from_user_data
 
 
 class ReActLoop:
@@ -174,17 +175,7 @@ class ReActLoop:
 
     def _calculate_recovery(self):
         """Calculate recovery percentage"""
-        sleep = self.user_data.get('sleep_hours', 7)
-        soreness = self.user_data.get('soreness', 5)
-        energy = self.user_data.get('energy', 'moderate')
-
-        energy_scores = {'low': 60, 'moderate': 80, 'high': 100}
-
-        sleep_score = min(sleep / 8 * 100, 100)
-        soreness_score = (10 - soreness) * 10
-        energy_score = energy_scores.get(energy, 80)
-
-        return (sleep_score * 0.4 + soreness_score * 0.3 + energy_score * 0.3)
+        return recovery_from_user_data(self.user_data)
 
     def _generate_feedback_scenarios(self):
         """Generate different user feedback scenarios"""
@@ -0,0 +1,259 @@
+"""
+Reminder Scheduler - Heap of upcoming workout and meal reminders
+Reads each user's gym_schedule, preferred_time and meal_times, keeps the next
+due time of every reminder in a min-heap and sleeps until the earliest one is
+due, so reminders fire on time without polling every user.
+"""
+import heapq
+import datetime
+import functools
+import itertools
+import threading
+
+
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+MEAL_NAMES = ["Breakfast", "Lunch", "Dinner"]
+
+WORKOUT_LEAD_MINUTES = 60
+MEAL_LEAD_MINUTES = 30
+
+_TIME_FORMATS = ("%H:%M:%S", "%H:%M", "%I:%M %p", "%I:%M%p", "%I %p")
+
+
+def parse_time(value):
+    """Parse '18:00:00', '18:00' or '6:00 PM' (or a datetime.time) into datetime.time"""
+    if isinstance(value, datetime.time):
+        return value
+    return _parse_time_string(str(value).strip().upper())
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_time_string(value):
+    for fmt in _TIME_FORMATS:
+        try:
+            return datetime.datetime.strptime(value, fmt).time()
+        except ValueError:
+            continue
+    raise ValueError(f"Unrecognised time: {value!r}")
+
+
+def next_occurrence(at, now=None, weekdays=None):
+    """
+    Next datetime at time-of-day `at` strictly after `now`
+
+    Args:
+        at: datetime.time
+        now: Reference datetime (defaults to now)
+        weekdays: Optional set of weekday numbers (Monday=0) it may fall on
+
+    Returns:
+        datetime.datetime
+    """
+    now = now or datetime.datetime.now()
+    candidate = datetime.datetime.combine(now.date(), at)
+    for _ in range(8):
+        if candidate > now and (weekdays is None or candidate.weekday() in weekdays):
+            return candidate
+        candidate += datetime.timedelta(days=1)
+    raise ValueError("weekdays must not be empty")
+
+
+class Reminder:
+    """One recurring reminder (the heap stores its next due time)"""
+
+    __slots__ = ('user_id', 'kind', 'name', 'at', 'weekdays', 'lead', 'data', 'generation')
+
+    def __init__(self, user_id, kind, name, at, weekdays, lead, data, generation):
+        self.user_id = user_id
+        self.kind = kind
+        self.name = name
+        self.at = at
+        self.weekdays = weekdays
+        self.lead = lead
+        self.data = data
+        self.generation = generation
+
+    def next_due(self, after):
+        """Next time this reminder should fire (lead minutes before the event)"""
+        event = next_occurrence(self.at, after, self.weekdays)
+        return max(event - datetime.timedelta(minutes=self.lead), after), event
+
+
+class ReminderScheduler:
+    """
+    Min-heap of (due time, reminder) for every scheduled user
+
+    Rescheduling a user bumps their generation; stale heap entries are dropped
+    lazily when they reach the top, so updates are O(log n).
+    """
+
+    def __init__(self, dispatch=None):
+        self.dispatch = dispatch or send_reminder
+        self._heap = []
+        self._counter = itertools.count()
+        self._generation = {}
+        self._live = {}
+        self._live_total = 0
+        self._wakeup = threading.Condition()
+        self._thread = None
+        self._stopped = False
+
+    def __len__(self):
+        return len(self._heap)
+
+    def _push(self, due, event, reminder):
+        heapq.heappush(self._heap, (due, next(self._counter), event, reminder))
+
+    def schedule_profile(self, user_id, profile, now=None):
+        """
+        (Re)schedule a user's reminders from their fitness profile
+
+        Args:
+            user_id: User the reminders belong to
+            profile: Dict with gym_schedule, preferred_time, meal_times and weight (kg)
+            now: Reference time (defaults to now)
+
+        Returns:
+            int: Number of reminders scheduled
+        """
+        now = now or datetime.datetime.now()
+        with self._wakeup:
+            generation = self._generation.get(user_id, 0) + 1
+            self._generation[user_id] = generation
+
+            reminders = []
+            gym_days = {WEEKDAYS.index(day) for day in profile.get('gym_schedule', []) if day in WEEKDAYS}
+            if gym_days and profile.get('preferred_time'):
+                reminders.append(Reminder(
+                    user_id, 'workout', 'Workout', parse_time(profile['preferred_time']),
+                    gym_days, WORKOUT_LEAD_MINUTES, {}, generation
+                ))
+
+            body_weight = profile.get('weight', 80) * 2.2  # kg to lbs
+            for i, meal_time in enumerate(profile.get('meal_times', [])):
+                name = MEAL_NAMES[i] if i < len(MEAL_NAMES) else f"Meal {i + 1}"
+                reminders.append(Reminder(
+                    user_id, 'meal', name, parse_time(meal_time), None,
+                    MEAL_LEAD_MINUTES, {'body_weight': body_weight}, generation
+                ))
+
+            for reminder in reminders:
+                due, event = reminder.next_due(now)
+                self._push(due, event, reminder)
+            self._live_total += len(reminders) - self._live.get(user_id, 0)
+            self._live[user_id] = len(reminders)
+            self._maybe_compact()
+            self._wakeup.notify()
+        return len(reminders)
+
+    def unschedule(self, user_id):
+        """Drop every pending reminder for a user (lazily)"""
+        with self._wakeup:
+            self._generation[user_id] = self._generation.get(user_id, 0) + 1
+            self._live_total -= self._live.pop(user_id, 0)
+            self._maybe_compact()
+
+    def _maybe_compact(self):
+        """Rebuild the heap once stale entries outnumber live ones"""
+        if len(self._heap) > 64 and len(self._heap) > 2 * self._live_total:
+            self._heap = [entry for entry in self._heap
+                          if entry[3].generation == self._generation.get(entry[3].user_id)]
+            heapq.heapify(self._heap)
+
+    def next_due(self):
+        """Due time of the earliest live reminder, or None"""
+        with self._wakeup:
+            self._drop_stale()
+            return self._heap[0][0] if self._heap else None
+
+    def _drop_stale(self):
+        while self._heap and self._heap[0][3].generation != self._generation.get(self._heap[0][3].user_id):
+            heapq.heappop(self._heap)
+
+    def run_pending(self, now=None):
+        """
+        Fire every reminder that is due and schedule its next occurrence
+
+        Returns:
+            list: (reminder, event_time) pairs that fired
+        """
+        now = now or datetime.datetime.now()
+        fired = []
+        with self._wakeup:
+            while True:
+                self._drop_stale()
+                if not self._heap or self._heap[0][0] > now:
+                    break
+                _, _, event, reminder = heapq.heappop(self._heap)
+                fired.append((reminder, event))
+                due, next_event = reminder.next_due(event)
+                self._push(due, next_event, reminder)
+
+        for reminder, event in fired:
+            try:
+                self.dispatch(reminder, event)
+            except Exception as e:
+                print(f"Warning: Could not send reminder: {e}")
+        return fired
+
+    def _loop(self):
+        while True:
+            with self._wakeup:
+                if self._stopped:
+                    return
+                due = self.next_due()
+                timeout = None if due is None else max(0.0, (due - datetime.datetime.now()).total_seconds())
+                if timeout is None or timeout > 0:
+                    # Sleep until the earliest reminder is due or the heap changes
+                    self._wakeup.wait(timeout)
+                    continue
+            self.run_pending()
+
+    def start(self):
+        """Run the scheduler in a background daemon thread"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stopped = False
+            self._thread = threading.Thread(target=self._loop, name="reminder-scheduler", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        with self._wakeup:
+            self._stopped = True
+            self._wakeup.notify()
+
+
+def send_reminder(reminder, event):
+    """Default dispatch: deliver through NotificationManager (log + store)"""
+    from notification_system import NotificationManager
+
+    minutes = max(0, round((event - datetime.datetime.now()).total_seconds() / 60))
+    manager = NotificationManager({'user_id': reminder.user_id, **reminder.data})
+    if reminder.kind == 'workout':
+        manager.send_notification(
+            title="🏋️ Workout Time Approaching!",
+            message=f"Your workout starts in {minutes} minutes. Get ready to crush it!",
+            priority="high",
+            action="open_workout_plan",
+            rule="workout_reminder"
+        )
+    else:
+        protein_target = reminder.data.get('body_weight', 180) * 0.8
+        manager.send_notification(
+            title=f"🍗 {reminder.name} Time",
+            message=f"Time for nutrition! Aim for {protein_target/4:.0f}g protein this meal.",
+            priority="medium",
+            action="view_meal_plan",
+            rule=f"meal_{reminder.name.lower().replace(' ', '_')}"
+        )
+
+
+_default_scheduler = None
+
+
+def get_reminder_scheduler():
+    """Process-wide scheduler, started on first use"""
+    global _default_scheduler
+    if _default_scheduler is None:
+        _default_scheduler = ReminderScheduler().start()
+    return _default_scheduler
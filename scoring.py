@@ -0,0 +1,161 @@
+"""
+Scoring Engine - Recovery, wellness and fitness scores shared by every app
+Each score has a scalar form for a single user_data dict and a column-wise
+form that scores a whole history or cohort in one vectorised NumPy pass.
+"""
+import numpy as np
+import pandas as pd
+
+
+# Energy level → recovery points (see RECOVERY SCORE CALCULATION in knowledge_base)
+ENERGY_SCORES = {'low': 60, 'moderate': 80, 'high': 100}
+DEFAULT_ENERGY_SCORE = 80
+
+# Defaults used when a user_data dict or column is missing a value
+DEFAULT_SLEEP_HOURS = 7
+DEFAULT_SORENESS = 5
+DEFAULT_ENERGY = 'moderate'
+
+# Recovery bands used by the notification rules and the coaching prompts
+PR_READY_RECOVERY = 85
+REST_RECOMMENDED_RECOVERY = 50
+
+
+def _energy_points(energy):
+    """Map energy labels to recovery points, element-wise"""
+    energy = np.asarray(energy, dtype=object)
+    return np.select(
+        [energy == level for level in ENERGY_SCORES],
+        list(ENERGY_SCORES.values()),
+        default=DEFAULT_ENERGY_SCORE
+    ).astype(float)
+
+
+def recovery_scores(sleep_hours, soreness, energy):
+    """
+    Vectorised recovery score (0-100) for arrays of inputs
+
+    Args:
+        sleep_hours: Array-like of hours slept
+        soreness: Array-like of soreness levels (1-10)
+        energy: Array-like of energy labels ('low', 'moderate', 'high')
+
+    Returns:
+        np.ndarray: Recovery score per element
+    """
+    sleep_hours = np.asarray(sleep_hours, dtype=float)
+    soreness = np.asarray(soreness, dtype=float)
+
+    sleep_score = np.minimum(sleep_hours / 8 * 100, 100)
+    soreness_score = (10 - soreness) * 10
+    energy_score = _energy_points(energy)
+
+    return sleep_score * 0.4 + soreness_score * 0.3 + energy_score * 0.3
+
+
+def recovery_score(sleep_hours=DEFAULT_SLEEP_HOURS, soreness=DEFAULT_SORENESS, energy=DEFAULT_ENERGY):
+    """Recovery score (0-100) for a single day"""
+    return float(recovery_scores([sleep_hours], [soreness], [energy])[0])
+
+
+def recovery_from_user_data(user_data):
+    """Recovery score (0-100) for a user_data dict"""
+    return recovery_score(
+        user_data.get('sleep_hours', DEFAULT_SLEEP_HOURS),
+        user_data.get('soreness', DEFAULT_SORENESS),
+        user_data.get('energy', DEFAULT_ENERGY)
+    )
+
+
+def recovery_frame(df, sleep_col='sleep_hours', soreness_col='soreness', energy_col='energy'):
+    """
+    Recovery score for every row of a history or cohort DataFrame
+
+    Missing columns or values fall back to the same defaults as the scalar form.
+
+    Args:
+        df: DataFrame with one row per user-day
+        sleep_col, soreness_col, energy_col: Column names to read
+
+    Returns:
+        pd.Series: Recovery score aligned to df.index
+    """
+    def column(name, default):
+        if name in df:
+            return df[name].fillna(default).to_numpy()
+        return np.full(len(df), default, dtype=object if isinstance(default, str) else float)
+
+    scores = recovery_scores(
+        column(sleep_col, DEFAULT_SLEEP_HOURS),
+        column(soreness_col, DEFAULT_SORENESS),
+        column(energy_col, DEFAULT_ENERGY)
+    )
+    return pd.Series(scores, index=df.index, name='recovery_score')
+
+
+def wellness_scores(df):
+    """
+    Vectorised digital-wellness score (0-100) for every row of a DataFrame
+
+    Args:
+        df: DataFrame with scroll_minutes, gym_done, sleep_hours,
+            water_intake and screen_time_breaks columns
+
+    Returns:
+        pd.Series: Wellness score (float) aligned to df.index
+    """
+    scroll = df['scroll_minutes'].to_numpy(dtype=float)
+    gym_done = df['gym_done'].to_numpy(dtype=bool)
+    sleep_hours = df['sleep_hours'].to_numpy(dtype=float)
+    water = df['water_intake'].to_numpy(dtype=float)
+    breaks = df['screen_time_breaks'].to_numpy(dtype=float)
+
+    score = (
+        np.maximum(0, 30 - scroll // 3)                      # Screen time (0-30 points)
+        + np.where(gym_done, 25, 0)                          # Exercise (25 points)
+        + np.clip((sleep_hours - 4) * 5, 0, 25)              # Sleep (0-25 points)
+        + np.minimum(10, water)                              # Water (0-10 points)
+        + np.minimum(10, breaks * 2)                         # Breaks (0-10 points)
+    )
+    # Float, as the per-row formula gave: half-hour sleep steps are worth 2.5 points
+    return pd.Series(np.minimum(100, score).astype(float), index=df.index, name='wellness_score')
+
+
+def wellness_score(data):
+    """Digital-wellness score (0-100) for a single day's data dict"""
+    return float(wellness_scores(pd.DataFrame([data])).iloc[0])
+
+
+def fitness_scores(history, window=7, by=None):
+    """
+    Fitness score (consistency, intensity, sleep) over the trailing window
+
+    Args:
+        history: DataFrame with workout_done, workout_intensity and sleep columns
+        window: Number of trailing days to average
+        by: Optional column to group on (e.g. 'user_id') to score a cohort at once
+
+    Returns:
+        int when by is None, otherwise pd.Series of scores indexed by group
+    """
+    recent = history.groupby(by).tail(window) if by else history.tail(window)
+    parts = pd.DataFrame({
+        'consistency': recent['workout_done'].astype(float) * 100,
+        'intensity': recent['workout_intensity'] * 10,
+        'sleep': recent['sleep'] * 12,
+    })
+    if by:
+        means = parts.groupby(recent[by]).mean()
+        return (means.sum(axis=1) / 3).astype(int).rename('fitness_score')
+
+    return int(parts.mean().sum() / 3)
+
+
+def rolling_fitness_scores(history, window=7):
+    """Fitness score for every day of a history in one pass (trailing window)"""
+    parts = (
+        history['workout_done'].astype(float).rolling(window, min_periods=1).mean() * 100
+        + history['workout_intensity'].rolling(window, min_periods=1).mean() * 10
+        + history['sleep'].rolling(window, min_periods=1).mean() * 12
+    )
+    return (parts / 3).astype(int).rename('fitness_score')
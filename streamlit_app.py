@@ -10,6 +10,7 @@ import pandas as pd
 from agents.insight import analyze_user
 from agents.coach import motivate_user
 from agents.planner import plan_next_day
+from scoring import wellness_score as calculate_wellness_score, wellness_scores
 
 # Page config
 st.set_page_config(
@@ -173,7 +174,7 @@ def analyze_and_display(user_data):
 
     col1, col2, col3, col4 = st.columns(4)
     with col1:
-        st.metric("Overall Score", f"{wellness_score}/100", f"{wellness_score-75:+d}")
+        st.metric("Overall Score", f"{wellness_score:g}/100", f"{wellness_score-75:+g}")
     with col2:
         screen_score = max(0, 100 - user_data['scroll_minutes'])
         st.metric("Screen Health", f"{screen_score}/100")
@@ -194,7 +195,7 @@ def progress_dashboard_page():
     # Convert history to DataFrame
     df = pd.DataFrame(st.session_state.user_history)
     df['date'] = pd.to_datetime(df['date'])
-    df['wellness_score'] = df.apply(calculate_wellness_score, axis=1)
+    df['wellness_score'] = wellness_scores(df)
 
     # Charts
     col1, col2 = st.columns(2)
@@ -243,31 +244,5 @@ def settings_page():
                 "application/json"
             )
 
-def calculate_wellness_score(data):
-    """Simple wellness score calculation"""
-    score = 0
-
-    # Screen time (0-30 points)
-    scroll_score = max(0, 30 - (data['scroll_minutes'] // 3))
-    score += scroll_score
-
-    # Exercise (25 points)
-    score += 25 if data['gym_done'] else 0
-
-    # Sleep (0-25 points)
-    sleep_hours = data['sleep_hours']
-    sleep_score = min(25, max(0, (sleep_hours - 4) * 5))
-    score += sleep_score
-
-    # Water (0-10 points)
-    water_score = min(10, data['water_intake'])
-    score += water_score
-
-    # Breaks (0-10 points)
-    breaks_score = min(10, data['screen_time_breaks'] * 2)
-    score += breaks_score
-
-    return min(100, score)
-
 if __name__ == "__main__":
     main()
\ No newline at end of file
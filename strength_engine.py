@@ -0,0 +1,194 @@
+"""
+Strength Engine - Estimated 1RM and progression suggestions from logged sets
+Estimates e1RM (Epley, Brzycki or RPE table) for every logged set with NumPy,
+keeps a best-e1RM index per user and lift, and suggests the next working load
+from the numeric progression tiers in exercise_registry.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+import exercise_registry
+from exercise_registry import resolve
+
+
+# Fallback maxes used until a user has logged sets for a lift
+DEFAULT_MAX_LIFTS = {
+    'bench_press': 185,
+    'squat': 225,
+    'deadlift': 275,
+    'overhead_press': 115
+}
+
+# %1RM at RPE 10 for 1..16 reps (RTS-style chart); each 0.5 RPE below 10
+# adds half a rep in reserve, so lower RPEs read further along the same curve
+RPE10_PERCENT = np.array([
+    100.0, 95.5, 92.2, 89.2, 86.3, 83.7, 81.1, 78.6,
+    76.2, 73.9, 70.7, 68.0, 65.3, 62.6, 59.9, 57.4
+]) / 100
+RPE_REPS = np.arange(1, len(RPE10_PERCENT) + 1)
+
+
+def normalize_lift(name):
+    """'Bench Press' / 'bench-press' / 'OHP' → registry key ('bench_press', 'overhead_press')"""
+    return resolve(name) or re.sub(r'[\s\-]+', '_', str(name).strip().lower())
+
+
+PROGRESSION = {}
+
+
+def refresh_progression():
+    """
+    Rebuild PROGRESSION from the registry as currently imported
+
+    Updated in place, so modules that imported PROGRESSION by name see the
+    tiers of a hot-reloaded registry (see knowledge_store).
+    """
+    progression = {exercise.key: [tier.as_dict() for tier in exercise.progression]
+                   for exercise in exercise_registry.EXERCISES}
+    PROGRESSION.update(progression)
+    for key in set(PROGRESSION) - set(progression):
+        del PROGRESSION[key]
+
+
+refresh_progression()
+
+
+def progression_tier(lift, e1rm):
+    """Progression tier dict for a lift at a given estimated max"""
+    tiers = PROGRESSION[normalize_lift(lift)]
+    index = np.searchsorted([t['upper'] for t in tiers], e1rm, side='right')
+    return tiers[min(int(index), len(tiers) - 1)]
+
+
+def estimate_e1rm(weight, reps, rpe=None, method='epley'):
+    """
+    Vectorised estimated one-rep max
+
+    Args:
+        weight: Array-like of loads lifted
+        reps: Array-like of reps completed
+        rpe: Optional array-like of RPE (NaN where not recorded); rows with
+             an RPE use the RPE table, the rest use `method`
+        method: 'epley' or 'brzycki'
+
+    Returns:
+        np.ndarray: e1RM per set (NaN for sets with no load or reps)
+    """
+    weight = np.asarray(weight, dtype=float)
+    reps = np.asarray(reps, dtype=float)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if method == 'brzycki':
+            e1rm = weight * 36 / (37 - np.minimum(reps, 36))
+        elif method == 'epley':
+            e1rm = weight * (1 + reps / 30)
+        else:
+            raise ValueError(f"Unknown e1RM method: {method}")
+        e1rm = np.where(reps == 1, weight, e1rm)
+
+        if rpe is not None:
+            rpe = np.asarray(rpe, dtype=float)
+            effective_reps = reps + (10 - np.clip(rpe, 6, 10))
+            percent = np.interp(effective_reps, RPE_REPS, RPE10_PERCENT)
+            e1rm = np.where(np.isnan(rpe), e1rm, weight / percent)
+
+    return np.where((weight > 0) & (reps > 0), e1rm, np.nan)
+
+
+def sets_frame(sessions, user_id=None):
+    """
+    Flatten logged sessions into one row per exercise entry
+
+    Args:
+        sessions: List of workout logs ({'date', 'exercises': {name: {'sets', 'reps', 'weight', 'rpe'?}}})
+        user_id: Optional user id to stamp on every row
+
+    Returns:
+        pd.DataFrame: user_id, date, lift, sets, reps, weight, rpe
+    """
+    rows = [
+        {
+            'user_id': user_id,
+            'date': session['date'],
+            'lift': normalize_lift(name),
+            'sets': data.get('sets', 1),
+            'reps': data.get('reps', 0),
+            'weight': data.get('weight', 0),
+            'rpe': data.get('rpe', np.nan),
+        }
+        for session in sessions or []
+        for name, data in session.get('exercises', {}).items()
+    ]
+    return pd.DataFrame(rows, columns=['user_id', 'date', 'lift', 'sets', 'reps', 'weight', 'rpe'])
+
+
+def best_e1rm_index(sets, method='epley', by=('user_id', 'lift')):
+    """
+    Best e1RM per user and lift over a whole set history in one pass
+
+    Args:
+        sets: DataFrame with weight, reps and optional rpe columns plus the `by` keys
+        method: Formula for sets without RPE
+
+    Returns:
+        pd.DataFrame: One row per group with best_e1rm, date of the best set and
+                      the most recent working weight
+    """
+    sets = sets.assign(e1rm=estimate_e1rm(
+        sets['weight'], sets['reps'], sets['rpe'] if 'rpe' in sets else None, method
+    )).dropna(subset=['e1rm'])
+    by = list(by)
+
+    best = sets.loc[sets.groupby(by, dropna=False)['e1rm'].idxmax(), by + ['e1rm', 'date']]
+    best = best.rename(columns={'e1rm': 'best_e1rm', 'date': 'best_date'})
+    latest = sets.sort_values('date').groupby(by, dropna=False).tail(1)[by + ['weight', 'reps']]
+    latest = latest.rename(columns={'weight': 'last_weight', 'reps': 'last_reps'})
+    return best.merge(latest, on=by, how='left').reset_index(drop=True)
+
+
+def suggest_next_loads(index):
+    """
+    Add tier, increment and next_weight columns to a best_e1rm_index() result
+
+    The increment comes from the lift's progression tier for its best e1RM and
+    is added to the most recent working weight. Lifts without PROGRESSION rules
+    keep their current weight.
+    """
+    index = index.copy()
+    index['tier'] = None
+    index['increment'] = 0.0
+    for lift, rows in index.groupby('lift').groups.items():
+        if lift not in PROGRESSION:
+            continue
+        tiers = PROGRESSION[lift]
+        position = np.minimum(
+            np.searchsorted([t['upper'] for t in tiers], index.loc[rows, 'best_e1rm'], side='right'),
+            len(tiers) - 1
+        )
+        index.loc[rows, 'tier'] = np.array([t['tier'] for t in tiers], dtype=object)[position]
+        index.loc[rows, 'increment'] = np.array([t['increment'] for t in tiers])[position]
+
+    # Round to the smallest plate pair the tier uses
+    step = np.where(index['increment'] < 2.5, 1.25, 2.5)
+    index['next_weight'] = np.round((index['last_weight'] + index['increment']) / step) * step
+    return index
+
+
+def current_max_lifts(sessions=None, defaults=DEFAULT_MAX_LIFTS):
+    """
+    Max lifts for a user's prompts and dashboards
+
+    Estimated from logged sessions where available, otherwise the defaults.
+    """
+    max_lifts = dict(defaults)
+    sets = sets_frame(sessions)
+    if not sets.empty:
+        index = best_e1rm_index(sets)
+        max_lifts.update({
+            row.lift: int(round(row.best_e1rm / 5) * 5)
+            for row in index.itertuples()
+            if row.lift in PROGRESSION
+        })
+    return max_lifts
@@ -0,0 +1,303 @@
+"""
+Training Load Model - Volume load, acute:chronic workload and fitness-fatigue
+Tracks each user's training load incrementally (O(1) per session) and
+backfills whole histories in one vectorised pass. The result is condensed to
+a single readiness number for the notification rules and agent prompts.
+"""
+import os
+import json
+import math
+import datetime
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+# Exponential time constants (days)
+ACUTE_DAYS = 7
+CHRONIC_DAYS = 28
+FITNESS_DAYS = 42
+FATIGUE_DAYS = 7
+
+# Acute:chronic "sweet spot" - outside it readiness is penalised
+ACWR_LOW = 0.8
+ACWR_HIGH = 1.3
+
+# Minimum load readiness for a PR attempt
+PR_READY_LOAD = 60
+
+DEFAULT_PATH = os.getenv("TRAINING_LOAD_PATH", "data/training_load.json")
+
+
+def _decay(days):
+    """Per-day carry-over factor for an exponential average with time constant `days`"""
+    return math.exp(-1 / days)
+
+
+def session_volume(exercises):
+    """
+    Volume load (sets × reps × weight) of one logged session
+
+    Args:
+        exercises: Dict of exercise name -> {'sets', 'reps', 'weight'}
+                   (the format saved by advanced_fitflow.log_session_tab)
+
+    Returns:
+        float: Total volume load in lbs
+    """
+    return float(sum(
+        data.get('sets', 0) * data.get('reps', 0) * data.get('weight', 0)
+        for data in exercises.values()
+    ))
+
+
+def readiness_scores(fitness, fatigue, acwr):
+    """
+    Vectorised training readiness (0-100) from fitness, fatigue and ACWR
+
+    Positive form (fitness above fatigue) raises readiness; an acute:chronic
+    ratio outside the 0.8-1.3 sweet spot lowers it.
+    """
+    fitness = np.asarray(fitness, dtype=float)
+    fatigue = np.asarray(fatigue, dtype=float)
+    acwr = np.asarray(acwr, dtype=float)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        form = np.where(fitness > 0, (fitness - fatigue) / fitness, 0.0)
+    penalty = (
+        np.clip(acwr - ACWR_HIGH, 0, None) * 100
+        + np.clip(ACWR_LOW - acwr, 0, None) * 25
+    )
+    return np.clip(70 + 60 * form - penalty, 0, 100)
+
+
+class TrainingLoad:
+    """Incremental acute:chronic workload and Banister fitness-fatigue state for one user"""
+
+    def __init__(self, user_id=None):
+        self.user_id = user_id
+        self.last_date = None
+        self.acute = 0.0
+        self.chronic = 0.0
+        self.fitness = 0.0
+        self.fatigue = 0.0
+
+    def _state(self):
+        return [self.acute, self.chronic, self.fitness, self.fatigue]
+
+    def update(self, date, volume):
+        """
+        Add one day's volume load
+
+        Days skipped since the last update count as zero-load days, so the
+        state decays in O(1) regardless of the gap. A second session on the
+        same day adds its volume to that day. Sessions must arrive in date
+        order; rebuild an out-of-order history with backfill().
+
+        Raises:
+            ValueError: date is before the last update
+        """
+        if isinstance(date, str):
+            date = datetime.date.fromisoformat(date[:10])
+        elif isinstance(date, datetime.datetime):
+            date = date.date()
+        if self.last_date is not None and date < self.last_date:
+            raise ValueError(f"Session on {date} is before the last update ({self.last_date}); use backfill()")
+
+        constants = (ACUTE_DAYS, CHRONIC_DAYS, FITNESS_DAYS, FATIGUE_DAYS)
+        if self.last_date is None:
+            # Seed every average with the first session (matches the backfill)
+            state = [float(volume)] * 4
+        else:
+            gap = (date - self.last_date).days
+            state = []
+            for value, days in zip(self._state(), constants):
+                d = _decay(days)
+                if gap == 0:
+                    state.append(value + (1 - d) * volume)  # same-day session
+                    continue
+                value *= d ** (gap - 1)                     # zero-load rest days
+                state.append(d * value + (1 - d) * volume)
+
+        self.acute, self.chronic, self.fitness, self.fatigue = state
+        self.last_date = date
+        return self
+
+    def log_session(self, date, exercises):
+        """Convenience wrapper: compute volume from logged exercises and update"""
+        return self.update(date, session_volume(exercises))
+
+    def decayed(self, as_of):
+        """
+        Copy of this state carried forward to as_of with zero load on the days
+        since the last session (the state itself is unchanged)
+        """
+        if isinstance(as_of, datetime.datetime):
+            as_of = as_of.date()
+        load = TrainingLoad.from_dict(self.to_dict())
+        gap = (as_of - self.last_date).days if self.last_date else 0
+        if gap > 0:
+            load.acute, load.chronic, load.fitness, load.fatigue = [
+                value * _decay(days) ** gap
+                for value, days in zip(self._state(), (ACUTE_DAYS, CHRONIC_DAYS, FITNESS_DAYS, FATIGUE_DAYS))
+            ]
+        return load
+
+    @property
+    def acwr(self):
+        """Acute:chronic workload ratio (1.0 before any chronic load exists)"""
+        return self.acute / self.chronic if self.chronic > 0 else 1.0
+
+    @property
+    def readiness(self):
+        """Training readiness 0-100"""
+        return int(round(float(readiness_scores(self.fitness, self.fatigue, self.acwr))))
+
+    def summary(self, as_of=None):
+        """
+        Compact signal for prompts and notification rules
+
+        Args:
+            as_of: Day the signal is for (defaults to today); rest days since
+                the last session decay fatigue and acute load up to it
+        """
+        load = self.decayed(as_of or datetime.date.today())
+        return {
+            'readiness': load.readiness,
+            'acwr': round(load.acwr, 2),
+            'fitness': round(load.fitness),
+            'fatigue': round(load.fatigue),
+        }
+
+    def to_dict(self):
+        return {
+            'user_id': self.user_id,
+            'last_date': self.last_date.isoformat() if self.last_date else None,
+            'acute': self.acute,
+            'chronic': self.chronic,
+            'fitness': self.fitness,
+            'fatigue': self.fatigue,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        load = cls(data.get('user_id'))
+        load.last_date = datetime.date.fromisoformat(data['last_date']) if data.get('last_date') else None
+        load.acute = data['acute']
+        load.chronic = data['chronic']
+        load.fitness = data['fitness']
+        load.fatigue = data['fatigue']
+        return load
+
+
+def backfill(sessions, user_col='user_id', date_col='date', volume_col='volume'):
+    """
+    Vectorised training-load history for every user at once
+
+    Args:
+        sessions: DataFrame with one row per session (user, date, volume load).
+                  Missing calendar days are filled with zero load.
+
+    Returns:
+        pd.DataFrame: One row per user-day with volume, acute, chronic, acwr,
+                      fitness, fatigue and readiness columns
+    """
+    sessions = sessions.copy()
+    if user_col not in sessions:
+        sessions[user_col] = 'default'
+    sessions[date_col] = pd.to_datetime(sessions[date_col]).dt.normalize()
+
+    # Days × users grid of daily volume (zero on rest days, NaN before a user's first session)
+    daily = sessions.pivot_table(index=date_col, columns=user_col, values=volume_col,
+                                 aggfunc='sum', dropna=False)
+    daily = daily.reindex(pd.date_range(daily.index.min(), daily.index.max(), freq='D'))
+    started = daily.notna().cummax()
+    daily = daily.fillna(0).where(started)
+
+    def ewm(days):
+        return daily.ewm(alpha=1 - _decay(days), adjust=False, ignore_na=True).mean()
+
+    acute, chronic = ewm(ACUTE_DAYS), ewm(CHRONIC_DAYS)
+    fitness, fatigue = ewm(FITNESS_DAYS), ewm(FATIGUE_DAYS)
+    acwr = (acute / chronic.where(chronic > 0)).fillna(1.0)
+    readiness = pd.DataFrame(
+        readiness_scores(fitness.to_numpy(), fatigue.to_numpy(), acwr.to_numpy()),
+        index=daily.index, columns=daily.columns
+    )
+
+    frames = {
+        'volume': daily, 'acute': acute, 'chronic': chronic, 'acwr': acwr,
+        'fitness': fitness, 'fatigue': fatigue, 'readiness': readiness,
+    }
+    result = pd.concat(frames, axis=1).stack(user_col, future_stack=True)
+    result = result[result['volume'].notna()]
+    result.index.names = [date_col, user_col]
+    return result.reset_index()
+
+
+def latest_states(backfilled, user_col='user_id', date_col='date'):
+    """Turn a backfill() result into {user_id: TrainingLoad} ready for incremental updates"""
+    states = {}
+    for row in backfilled.sort_values(date_col).groupby(user_col, dropna=False).tail(1).itertuples(index=False):
+        load = TrainingLoad(getattr(row, user_col))
+        load.last_date = getattr(row, date_col).date()
+        load.acute, load.chronic = row.acute, row.chronic
+        load.fitness, load.fatigue = row.fitness, row.fatigue
+        states[load.user_id] = load
+    return states
+
+
+class TrainingLoadStore:
+    """Per-user TrainingLoad states persisted in one JSON file"""
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = Path(path)
+        self._mutex = threading.Lock()
+
+    def _read(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            print(f"Warning: Could not read training load from {self.path}: {e}")
+            return {}
+
+    def get(self, user_id):
+        """Saved TrainingLoad for a user, or None"""
+        with self._mutex:
+            data = self._read().get(str(user_id))
+        return TrainingLoad.from_dict(data) if data else None
+
+    def summary(self, user_id, as_of=None):
+        """summary(as_of) of the user's saved load (as of today by default), or None if nothing is tracked"""
+        load = self.get(user_id)
+        return load.summary(as_of) if load and load.last_date else None
+
+    def save(self, load):
+        """Persist a user's TrainingLoad (atomic replace of the file)"""
+        with self._mutex:
+            states = self._read()
+            states[str(load.user_id)] = load.to_dict()
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(states, f)
+            os.replace(tmp, self.path)
+
+
+_default_store = None
+_default_lock = threading.Lock()
+
+
+def get_training_load_store():
+    """Process-wide training load store"""
+    global _default_store
+    if _default_store is None:
+        with _default_lock:
+            if _default_store is None:
+                _default_store = TrainingLoadStore()
+    return _default_store
@@ -0,0 +1,242 @@
+"""
+Video Frames - Keyframes for form checks from a recorded set
+Samples a set video at a low frame rate and scores motion energy between
+consecutive tiny grayscale frames. It keeps the frames at the movement's
+phases: turnarounds where the bar pauses (bottom, lockout) and peak-speed
+mid-rep positions. Near-identical frames, such as the same position on a
+later rep, are dropped by perceptual hash, and at most max_frames survive
+however long the video is.
+"""
+import io
+import os
+import math
+import tempfile
+
+import numpy as np
+
+from image_preprocessing import JPEG_QUALITY, MAX_EDGE, Image, PreparedImage, hamming_distances, perceptual_hash
+
+try:
+    import cv2
+except ImportError:  # OpenCV missing: only animated GIF/WebP clips can be read (through Pillow)
+    cv2 = None
+
+
+SAMPLE_FPS = 8          # frames per second scored for motion
+MAX_SAMPLES = 480       # cap on scored frames (long videos are sampled more sparsely)
+MOTION_EDGE = 96        # longest edge of the grayscale frames used for motion energy
+DEFAULT_MAX_FRAMES = 6  # frames sent to the model, whatever the video length
+DUPLICATE_DISTANCE = int(os.getenv("VIDEO_DUPLICATE_DISTANCE", "8"))
+
+
+class _OpenCVReader:
+    """Video file decoded with OpenCV"""
+
+    def __init__(self, path, temporary=False):
+        self._path = path if temporary else None
+        self._cap = cv2.VideoCapture(path)
+        if not self._cap.isOpened():
+            raise ValueError(f"Could not open video {path}")
+        self.fps = self._cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self.frame_count = int(self._cap.get(cv2.CAP_PROP_FRAME_COUNT))
+
+    def time(self, index):
+        return index / self.fps
+
+    def sampled(self, step):
+        """(frame index, RGB array) for every step-th frame"""
+        index = 0
+        while self._cap.grab():  # grab without converting skipped frames
+            if index % step == 0:
+                ok, frame = self._cap.retrieve()
+                if ok:
+                    yield index, cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            index += 1
+
+    def frame(self, index):
+        self._cap.set(cv2.CAP_PROP_POS_FRAMES, index)
+        ok, frame = self._cap.read()
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB) if ok else None
+
+    def close(self):
+        self._cap.release()
+        if self._path:
+            os.unlink(self._path)
+
+
+class _PillowReader:
+    """Animated GIF/WebP decoded with Pillow"""
+
+    def __init__(self, data):
+        self._image = Image.open(io.BytesIO(data))
+        self.frame_count = getattr(self._image, "n_frames", 1)
+        # Frame durations vary (encoders merge identical frames into one longer frame)
+        self._starts, elapsed = [], 0.0
+        for index in range(self.frame_count):
+            self._image.seek(index)
+            self._starts.append(elapsed)
+            elapsed += (self._image.info.get("duration") or 100) / 1000.0
+        self.fps = self.frame_count / elapsed if elapsed else 10.0
+
+    def time(self, index):
+        return self._starts[index]
+
+    def sampled(self, step):
+        for index in range(0, self.frame_count, step):
+            yield index, self.frame(index)
+
+    def frame(self, index):
+        self._image.seek(index)
+        return np.asarray(self._image.convert("RGB"))
+
+    def close(self):
+        self._image.close()
+
+
+def open_video(source):
+    """
+    Frame reader for a video path, file object or bytes
+
+    Returns:
+        reader with fps, frame_count, sampled(step), frame(index), time(index), close()
+    """
+    if isinstance(source, (str, os.PathLike)):
+        path = str(source)
+        with open(path, "rb") as f:
+            head = f.read(16)
+    else:
+        data = source.read() if hasattr(source, "read") else bytes(source)
+        head, path = data[:16], None
+
+    if head.startswith((b"GIF87a", b"GIF89a")) or (head[:4] == b"RIFF" and head[8:12] == b"WEBP"):
+        if Image is None:
+            raise ImportError("Animated image clips need Pillow: pip install Pillow")
+        if path:
+            with open(path, "rb") as f:
+                data = f.read()
+        return _PillowReader(data)
+
+    if cv2 is None:
+        raise ImportError("Video form checks need OpenCV: pip install opencv-python-headless")
+    if path:
+        return _OpenCVReader(path)
+    # OpenCV only reads from files: spool uploads to a temporary one
+    tmp = tempfile.NamedTemporaryFile(suffix=".mp4", delete=False)
+    try:
+        with tmp:
+            tmp.write(data)
+        return _OpenCVReader(tmp.name, temporary=True)
+    except Exception:
+        # The reader owns the file only once it opened; otherwise nothing else will remove it
+        os.unlink(tmp.name)
+        raise
+
+
+def _small_gray(frame):
+    height, width = frame.shape[:2]
+    step = max(1, math.ceil(max(height, width) / MOTION_EDGE))
+    return frame[::step, ::step].mean(axis=2, dtype=np.float32)
+
+
+def motion_energy(gray_frames):
+    """Mean absolute pixel change between consecutive frames (first frame copies the second)"""
+    stack = np.stack(gray_frames)
+    if len(stack) < 2:
+        return np.zeros(len(stack), dtype=np.float32)
+    energy = np.abs(np.diff(stack, axis=0)).mean(axis=(1, 2))
+    return np.concatenate([energy[:1], energy])
+
+
+def _moving_average(values, window):
+    if window <= 1 or len(values) < window:
+        return values
+    padded = np.pad(values, window // 2, mode="edge")
+    return np.convolve(padded, np.ones(window) / window, mode="valid")[:len(values)]
+
+
+def phase_candidates(energy, max_candidates):
+    """
+    Sample indices at the movement's phases, most distinctive first
+
+    Turnarounds are local minima of smoothed motion energy inside the active
+    part of the set, mid-rep positions are local maxima; both are ranked by how
+    far they stand out from the surrounding motion level.
+
+    Returns:
+        list: (sample index, phase) with phase 'turnaround' or 'mid-rep'
+    """
+    if len(energy) < 3:
+        return [(i, 'turnaround') for i in range(len(energy))][:max_candidates]
+    smooth = _moving_average(energy, 3)
+    baseline = _moving_average(smooth, 9)
+    active = np.flatnonzero(smooth > 0.2 * smooth.max()) if smooth.max() > 0 else np.array([], dtype=int)
+    if not len(active):
+        return [(0, 'turnaround')]
+    first, last = max(1, active[0]), min(len(smooth) - 2, active[-1])
+
+    inner = smooth[1:-1]
+    minima = np.flatnonzero((inner <= smooth[:-2]) & (inner < smooth[2:])) + 1
+    maxima = np.flatnonzero((inner >= smooth[:-2]) & (inner > smooth[2:])) + 1
+    candidates = [(i, 'turnaround') for i in minima if first <= i <= last]
+    candidates += [(i, 'mid-rep') for i in maxima if first <= i <= last]
+    candidates.sort(key=lambda c: -abs(smooth[c[0]] - baseline[c[0]]))
+    return candidates[:max_candidates]
+
+
+def _frame_image(frame):
+    """PreparedImage (downscaled JPEG) from an RGB frame"""
+    image = Image.fromarray(frame)
+    image.thumbnail((MAX_EDGE, MAX_EDGE), Image.LANCZOS)
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=JPEG_QUALITY, optimize=True)
+    return PreparedImage(buffer.getvalue(), "image/jpeg", *image.size, original_size=frame.nbytes)
+
+
+def extract_keyframes(source, max_frames=DEFAULT_MAX_FRAMES, sample_fps=SAMPLE_FPS,
+                      duplicate_distance=DUPLICATE_DISTANCE):
+    """
+    Distinct phase keyframes of a set video
+
+    Args:
+        source: Video path, file object or bytes (mp4/mov via OpenCV; GIF/WebP via Pillow)
+        max_frames: Most frames returned, however long the video
+        sample_fps: Frames per second scored for motion
+        duplicate_distance: Max perceptual-hash bit distance treated as the same position
+
+    Returns:
+        list: Dicts with time (seconds), phase and image (PreparedImage), in time order
+    """
+    if Image is None:
+        raise ImportError("Video form checks need Pillow: pip install Pillow")
+    reader = open_video(source)
+    try:
+        step = max(1, round(reader.fps / sample_fps))
+        if reader.frame_count > 0:
+            step = max(step, math.ceil(reader.frame_count / MAX_SAMPLES))
+        indices, grays = [], []
+        for index, frame in reader.sampled(step):
+            indices.append(index)
+            grays.append(_small_gray(frame))
+            if len(indices) >= MAX_SAMPLES:
+                break
+        if not indices:
+            return []
+
+        candidates = phase_candidates(motion_energy(grays), max_candidates=4 * max_frames)
+        kept, hashes = [], []
+        for sample, phase in candidates:
+            frame = reader.frame(indices[sample])
+            if frame is None:
+                continue
+            image = _frame_image(frame)
+            phash = perceptual_hash(image)
+            if phash is not None and hashes and hamming_distances(hashes, phash).min() <= duplicate_distance:
+                continue  # same position as a frame already kept (e.g. a later rep)
+            kept.append({'time': round(reader.time(indices[sample]), 2), 'phase': phase, 'image': image})
+            if phash is not None:
+                hashes.append(phash)
+            if len(kept) == max_frames:
+                break
+    finally:
+        reader.close()
+    return sorted(kept, key=lambda frame: frame['time'])
@@ -0,0 +1,208 @@
+"""
+Vision Cache - Reuse vision analyses for repeated and near-identical photos
+Every analysis is stored under the user, the SHA-256 of the normalised
+(preprocessed) image, the goal and the prompt version, together with the
+image's 64-bit perceptual hash. A re-upload hits the exact key; a re-crop or
+re-encode of the same photo is answered by the nearest stored perceptual hash
+within a configurable Hamming distance, instead of another ~15 s model call.
+Lookups never cross users, and near-duplicate candidates come from an index
+of the hash's bytes rather than a scan of every stored analysis.
+"""
+import os
+import time
+import sqlite3
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from image_preprocessing import hamming_distances, perceptual_hash
+
+
+DEFAULT_PATH = os.getenv("VISION_CACHE_PATH", "data/vision_cache.db")
+# Max differing pHash bits (of 64) for a near-duplicate; 0 disables near-duplicate hits
+DEFAULT_MAX_DISTANCE = int(os.getenv("VISION_CACHE_MAX_DISTANCE", "6"))
+DEFAULT_USER = "anonymous"
+
+# The pHash is indexed by its 8 bytes: two hashes less than 8 bits apart share
+# at least one byte (pigeonhole), so only rows sharing a byte are candidates
+PHASH_BANDS = 8
+SCHEMA_VERSION = 2  # bumped when the layout changes; older caches are dropped
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS vision_analyses (
+    id INTEGER PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    goal TEXT NOT NULL,
+    prompt_version TEXT NOT NULL,
+    image_sha256 TEXT NOT NULL,
+    phash INTEGER,
+    result TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    UNIQUE (user_id, kind, goal, prompt_version, image_sha256)
+);
+CREATE INDEX IF NOT EXISTS idx_vision_image ON vision_analyses (user_id, image_sha256, created_at DESC);
+CREATE TABLE IF NOT EXISTS vision_phash_bands (
+    band_key INTEGER NOT NULL,
+    analysis_id INTEGER NOT NULL,
+    PRIMARY KEY (band_key, analysis_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_vision_band_analysis ON vision_phash_bands (analysis_id);
+"""
+
+
+def _signed(value):
+    """uint64 -> int64 (SQLite integers are signed)"""
+    return value - (1 << 64) if value is not None and value >= 1 << 63 else value
+
+
+def _band_keys(phash):
+    """band * 256 + byte value for each byte of a 64-bit hash"""
+    return [band * 256 + ((phash >> (8 * band)) & 0xFF) for band in range(PHASH_BANDS)]
+
+
+class VisionCache:
+    """SQLite-backed per-user analysis cache with exact and perceptual-hash lookup"""
+
+    def __init__(self, path=DEFAULT_PATH, max_distance=DEFAULT_MAX_DISTANCE):
+        self.path = str(path)
+        self.max_distance = max_distance
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._mutex = threading.Lock()
+        self.stats = {'exact': 0, 'near': 0, 'miss': 0}
+        with self._mutex, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            if self._conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+                # Only a cache: entries from an older layout are dropped, not migrated
+                self._conn.execute("DROP TABLE IF EXISTS vision_analyses")
+                self._conn.execute("DROP TABLE IF EXISTS vision_phash_bands")
+                self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            self._conn.executescript(SCHEMA)
+
+    @staticmethod
+    def fingerprint(image):
+        """(sha256 hex, perceptual hash) of a PreparedImage"""
+        return image.sha256(), perceptual_hash(image)
+
+    @staticmethod
+    def _scope(user_id, kind, goal, prompt_version):
+        return str(user_id or DEFAULT_USER), kind, str(goal or '').strip().lower(), str(prompt_version)
+
+    def get(self, image, kind, goal, prompt_version, fingerprint=None, user_id=None):
+        """
+        Cached analysis of an image for one user, or None
+
+        Args:
+            image: PreparedImage (normalised image)
+            kind: Analysis kind, e.g. 'physique'
+            goal: User's goal the analysis was written for
+            prompt_version: Version of the prompt that produced it
+            fingerprint: Precomputed fingerprint(image), to hash only once
+            user_id: Whose analyses to search (never another user's)
+
+        Returns:
+            str or None
+        """
+        result, hit = self._lookup(image, kind, goal, prompt_version, fingerprint, user_id)
+        self.stats[hit] += 1
+        return result
+
+    def _lookup(self, image, kind, goal, prompt_version, fingerprint, user_id):
+        """(result or None, 'exact' | 'near' | 'miss') for one user, goal and prompt version"""
+        sha, phash = fingerprint or self.fingerprint(image)
+        where = "user_id = ? AND kind = ? AND goal = ? AND prompt_version = ?"
+        scope = self._scope(user_id, kind, goal, prompt_version)
+        with self._mutex:
+            row = self._conn.execute(
+                f"SELECT result FROM vision_analyses WHERE {where} AND image_sha256 = ?", (*scope, sha)
+            ).fetchone()
+            if row:
+                return row[0], 'exact'
+            rows = self._candidates(where, scope, phash)
+        result = self._nearest(rows, phash)
+        return result, 'near' if result is not None else 'miss'
+
+    def _candidates(self, where, params, phash):
+        """(phash, result) rows in scope that can be within max_distance of phash, newest first"""
+        if phash is None or self.max_distance <= 0:
+            return []
+        query = f"SELECT phash, result FROM vision_analyses WHERE {where} AND phash IS NOT NULL"
+        if self.max_distance < PHASH_BANDS:
+            keys = _band_keys(phash)
+            query += (" AND id IN (SELECT analysis_id FROM vision_phash_bands WHERE band_key IN"
+                      f" ({', '.join('?' * len(keys))}))")
+            params = (*params, *keys)
+        return self._conn.execute(query + " ORDER BY created_at DESC", params).fetchall()
+
+    def _nearest(self, rows, phash):
+        """Result of the (phash, result) row closest to phash, if within max_distance"""
+        if not rows or phash is None or self.max_distance <= 0:
+            return None
+        distances = hamming_distances(np.array([r[0] for r in rows], dtype=np.int64).view(np.uint64), phash)
+        best = int(np.argmin(distances))
+        return rows[best][1] if distances[best] <= self.max_distance else None
+
+    def find(self, image, kind, goal, prompt_version, fingerprint=None, user_id=None):
+        """
+        Existing analysis of this photo (or a near-duplicate), e.g. to reuse as
+        text context instead of analysing it again; like get() but not counted
+        in the hit statistics
+
+        Args:
+            image: PreparedImage
+            kind: Analysis kind, e.g. 'physique'
+            goal: Goal the analysis was written for
+            prompt_version: Version of the prompt that produced it (the current one)
+            fingerprint: Precomputed fingerprint(image)
+            user_id: Whose analyses to search (never another user's)
+
+        Returns:
+            str or None
+        """
+        return self._lookup(image, kind, goal, prompt_version, fingerprint, user_id)[0]
+
+    def put(self, image, kind, goal, prompt_version, result, fingerprint=None, user_id=None):
+        """Store a user's analysis (replacing any for the same image, goal and prompt version)"""
+        sha, phash = fingerprint or self.fingerprint(image)
+        scope = self._scope(user_id, kind, goal, prompt_version)
+        with self._mutex, self._conn:
+            old = self._conn.execute(
+                "SELECT id FROM vision_analyses WHERE user_id = ? AND kind = ? AND goal = ?"
+                " AND prompt_version = ? AND image_sha256 = ?", (*scope, sha)
+            ).fetchone()
+            if old:
+                self._conn.execute("DELETE FROM vision_phash_bands WHERE analysis_id = ?", old)
+                self._conn.execute("DELETE FROM vision_analyses WHERE id = ?", old)
+            cursor = self._conn.execute(
+                "INSERT INTO vision_analyses (user_id, kind, goal, prompt_version, image_sha256, phash,"
+                " result, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (*scope, sha, _signed(phash), result, time.time())
+            )
+            if phash is not None:
+                self._conn.executemany(
+                    "INSERT INTO vision_phash_bands (band_key, analysis_id) VALUES (?, ?)",
+                    [(key, cursor.lastrowid) for key in _band_keys(phash)]
+                )
+
+    def clear(self):
+        with self._mutex, self._conn:
+            self._conn.execute("DELETE FROM vision_phash_bands")
+            self._conn.execute("DELETE FROM vision_analyses")
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def get_vision_cache():
+    """Process-wide vision cache"""
+    global _default_cache
+    if _default_cache is None:
+        with _default_lock:
+            if _default_cache is None:
+                _default_cache = VisionCache()
+    return _default_cache